@@ -5,10 +5,15 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
+try:
+    from apps.api.db_routing import RoutingSession
+except ImportError:
+    from db_routing import RoutingSession
+
 __version__ = '1.0.0'
 
 # Initialize extensions (will be initialized with app in create_app)
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # reads may go to replicas
 migrate = Migrate()
 jwt = JWTManager()
 
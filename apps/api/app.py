@@ -39,7 +39,84 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    
+
+    # Auth rate limiter (memory or shared SQLite backend)
+    try:
+        from apps.api.utils.rate_limit import init_rate_limiter
+    except ImportError:
+        from utils.rate_limit import init_rate_limiter
+    init_rate_limiter(app)
+
+    # Incremental keyword index for issues/announcements
+    try:
+        from apps.api.utils.search_index import init_search_index
+    except ImportError:
+        from utils.search_index import init_search_index
+    init_search_index(app)
+
+    # Geohash maintenance for issue location queries
+    try:
+        from apps.api.utils.geo import init_geo_index
+    except ImportError:
+        from utils.geo import init_geo_index
+    init_geo_index(app)
+
+    # Audit rows are buffered per request and bulk-inserted at teardown
+    try:
+        from apps.api.utils.audit_writer import init_audit_writer
+    except ImportError:
+        from utils.audit_writer import init_audit_writer
+    init_audit_writer(app)
+
+    # Query count / DB time headers and the slow-query log
+    try:
+        from apps.api.utils.query_stats import init_query_stats
+    except ImportError:
+        from utils.query_stats import init_query_stats
+    init_query_stats(app)
+
+    # Request/DB pool/PDF/email metrics exposed at GET /metrics
+    try:
+        from apps.api.utils.metrics import init_metrics
+    except ImportError:
+        from utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Idle-based connection liveness pings and pool overflow telemetry
+    try:
+        from apps.api.utils.db_pool import init_db_pool
+    except ImportError:
+        from utils.db_pool import init_db_pool
+    init_db_pool(app)
+
+    # Read replica engines for GET requests and use_replica() blocks
+    try:
+        from apps.api.db_routing import init_db_routing
+    except ImportError:
+        from db_routing import init_db_routing
+    init_db_routing(app)
+
+    # Opt-in per-request profiles (admin X-Profile header or sampling)
+    try:
+        from apps.api.utils.profiler import init_profiler
+    except ImportError:
+        from utils.profiler import init_profiler
+    init_profiler(app)
+
+    # Pre-serialized marketplace browse pages, invalidated on item commits
+    try:
+        from apps.api.utils.feed_cache import init_feed_cache
+    except ImportError:
+        from utils.feed_cache import init_feed_cache
+    init_feed_cache(app)
+
+    # orjson-backed jsonify (falls back to the stdlib provider)
+    try:
+        from apps.api.utils.json_provider import init_json_provider
+    except ImportError:
+        from utils.json_provider import init_json_provider
+    init_json_provider(app)
+
     # CORS configuration - cover all routes including /health and /uploads
     cors_origins = [
         app.config['WEB_URL'],
@@ -53,6 +130,7 @@ def create_app(config_class=Config):
         "allow_headers": ["Content-Type", "Authorization"],
         "supports_credentials": True
     }
+    app.extensions['cors_origins'] = cors_origins  # also used by the async routes in asgi.py
     # Note: Flask-CORS uses regex patterns, so use .* not * for wildcards
     CORS(app, resources={
         r"/api/.*": cors_settings,
@@ -66,10 +144,14 @@ def create_app(config_class=Config):
     def check_if_token_revoked(jwt_header, jwt_payload):
         try:
             from apps.api.models.token_blacklist import TokenBlacklist
+            from apps.api.db_routing import use_primary
         except ImportError:
             from models.token_blacklist import TokenBlacklist
+            from db_routing import use_primary
         jti = jwt_payload['jti']
-        return TokenBlacklist.is_token_revoked(jti)
+        # A lagging replica would still accept a token revoked moments ago
+        with use_primary():
+            return TokenBlacklist.is_token_revoked(jti)
     
     # Register blueprints
     try:
@@ -137,10 +219,29 @@ def create_app(config_class=Config):
     
     return app
 
-# Create app instance
-app = create_app()
+
+# The process-wide app, built on first use rather than at import time so that
+# scripts and tests importing this module don't construct an app and engine
+_app = None
+
+
+def get_app():
+    """Return this process's app (default config), creating it once"""
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+
+def __getattr__(name):
+    # Keep `from apps.api.app import app` and `gunicorn app:app` working
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
+    app = get_app()
     app.run(
         host='0.0.0.0',
         port=5000,
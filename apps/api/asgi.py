@@ -0,0 +1,13 @@
+"""
+MunLink Region III - ASGI entry point (optional async serving mode)
+Builds the app once per worker process: uvicorn asgi:app --workers 2
+The WSGI entry (gunicorn wsgi:app) keeps working unchanged.
+"""
+try:
+    from apps.api.app import get_app
+    from apps.api.utils.asgi import AsyncApp
+except ImportError:
+    from app import get_app
+    from utils.asgi import AsyncApp
+
+app = AsyncApp(get_app())
@@ -11,13 +11,14 @@ from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 BASE_DIR = Path(__file__).parent.parent.parent.resolve()
 
 
-def get_database_url():
+def get_database_url(url=None):
     """
     Get and process the database URL for proper connection handling.
     - Ensures SSL is enabled for PostgreSQL connections (required by Supabase)
     - Handles URL scheme conversion (postgres:// -> postgresql://)
+    Processes ``url`` instead of DATABASE_URL when given (e.g. a replica URL).
     """
-    url = os.getenv('DATABASE_URL', f'sqlite:///{BASE_DIR}/munlink_region3.db')
+    url = url or os.getenv('DATABASE_URL', f'sqlite:///{BASE_DIR}/munlink_region3.db')
     
     # Handle Heroku/Render style postgres:// URLs (SQLAlchemy requires postgresql://)
     if url.startswith('postgres://'):
@@ -46,37 +47,106 @@ def get_database_url():
     return url
 
 
-def get_engine_options():
+def get_pool_settings(db_url=None):
+    """
+    Size the connection pool from the serving topology.
+    Every gunicorn worker has its own pool, so the server-wide budget
+    (DB_MAX_CONNECTIONS, e.g. the Supabase pooler's client limit) is split
+    across WEB_CONCURRENCY workers. A worker keeps one connection per request
+    thread (WEB_THREADS) plus DB_POOL_EXTRA for background workers, and may
+    overflow up to its share of the budget. DB_POOL_SIZE / DB_MAX_OVERFLOW
+    override the computed values.
+    """
+    workers = max(1, int(os.getenv('WEB_CONCURRENCY', 2)))
+    threads = max(1, int(os.getenv('WEB_THREADS', 1)))
+    max_connections = max(1, int(os.getenv('DB_MAX_CONNECTIONS', 16)))
+    per_worker = max(1, max_connections // workers)
+    pool_size = int(os.getenv('DB_POOL_SIZE') or min(per_worker, threads + int(os.getenv('DB_POOL_EXTRA', 2))))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW') or max(0, per_worker - pool_size))
+
+    # 'transaction' for PgBouncer/Supavisor transaction pooling (Supabase port 6543):
+    # connections are shared between clients, so no server-side prepared statements
+    mode = os.getenv('DB_POOLER_MODE', 'auto')
+    if mode == 'auto':
+        mode = 'transaction' if urlparse(db_url or get_database_url()).port == 6543 else 'session'
+
+    return {
+        'workers': workers,
+        'threads': threads,
+        'max_connections': max_connections,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 60)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+        # Ping a connection on checkout only after it sat idle this long; 0 = every checkout
+        'ping_idle': float(os.getenv('DB_POOL_PING_IDLE', 60)),
+        'pooler_mode': mode,
+    }
+
+
+def get_replica_urls():
+    """Read replica URLs from DB_REPLICA_URLS (comma-separated), processed like DATABASE_URL."""
+    urls = os.getenv('DB_REPLICA_URLS', '')
+    return [get_database_url(url.strip()) for url in urls.split(',') if url.strip()]
+
+
+def get_engine_options(db_url=None):
     """
     Get SQLAlchemy engine options based on the database type.
     PostgreSQL requires specific connection settings for Supabase pooler.
     """
-    db_url = get_database_url()
+    db_url = db_url or get_database_url()
+    pool = get_pool_settings(db_url)
     
-    # Base options for all databases
+    # Base options for all databases. Per-checkout pre-ping is only used with
+    # DB_POOL_PING_IDLE=0; otherwise utils/db_pool.py pings idle connections.
     options = {
-        'pool_pre_ping': True,  # Verify connections before use (handles stale connections)
+        'pool_pre_ping': pool['ping_idle'] <= 0,
     }
     
     # PostgreSQL-specific options for Supabase connection
-    if db_url.startswith('postgresql://'):
+    if db_url.startswith('postgresql'):
+        driver = db_url.split('://', 1)[0]
         options.update({
-            'pool_recycle': 300,    # Recycle connections every 5 minutes
-            'pool_timeout': 60,     # Wait up to 60 seconds for a connection from pool
-            'pool_size': 3,         # Keep 3 connections in the pool (fewer for free tier)
-            'max_overflow': 5,      # Allow up to 5 additional connections
-            'connect_args': {
+            'pool_recycle': pool['pool_recycle'],
+            'pool_timeout': pool['pool_timeout'],
+            'pool_size': pool['pool_size'],
+            'max_overflow': pool['max_overflow'],
+            'pool_use_lifo': True,  # reuse the warmest connection; spare ones go idle and get recycled
+        })
+        if driver == 'postgresql+asyncpg':
+            connect_args = {'timeout': 60}
+        else:
+            connect_args = {
                 'connect_timeout': 60,      # 60 second connection timeout (increased for Supabase)
                 'keepalives': 1,            # Enable TCP keepalives
                 'keepalives_idle': 30,      # Seconds before sending keepalive
                 'keepalives_interval': 10,  # Seconds between keepalives
                 'keepalives_count': 5,      # Number of keepalives before giving up
             }
-        })
+        if pool['pooler_mode'] == 'transaction':
+            # psycopg2 never prepares server-side; psycopg 3 and asyncpg must be told not to
+            if driver == 'postgresql+psycopg':
+                connect_args['prepare_threshold'] = None
+            elif driver == 'postgresql+asyncpg':
+                connect_args['statement_cache_size'] = 0
+                connect_args['prepared_statement_cache_size'] = 0
+        options['connect_args'] = connect_args
     
     return options
 
 
+class _Resolved:
+    """Class attribute computed each time it is read, so importing this module
+    doesn't resolve it (and a .env loaded after import is still honoured)."""
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+
+    def __get__(self, instance, owner):
+        return self.resolve()
+
+
 class Config:
     """Base configuration"""
     
@@ -86,12 +156,16 @@ class Config:
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     
     # Database
-    SQLALCHEMY_DATABASE_URI = get_database_url()
+    SQLALCHEMY_DATABASE_URI = _Resolved(get_database_url)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = DEBUG
     
     # SQLAlchemy Engine Options - dynamically configured based on database type
-    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options()
+    SQLALCHEMY_ENGINE_OPTIONS = _Resolved(get_engine_options)
+    # Pool sizing/liveness settings behind those options (see get_pool_settings)
+    DB_POOL = _Resolved(get_pool_settings)
+    # Read replicas for GET/HEAD requests and use_replica() blocks (see db_routing.py)
+    DB_REPLICA_URLS = _Resolved(get_replica_urls)
     
     # Supabase Configuration (optional - for Supabase features like auth, storage, real-time)
     SUPABASE_URL = os.getenv('SUPABASE_URL', '')
@@ -131,7 +205,92 @@ class Config:
     SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
     FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@munlink-region3.gov.ph')
-    
+    SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 10))
+
+    # Email outbox (queued delivery over a reused SMTP session)
+    EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', 'True') == 'True'
+    EMAIL_OUTBOX_WORKER = os.getenv('EMAIL_OUTBOX_WORKER', 'True') == 'True'  # in-process background sender
+    EMAIL_OUTBOX_INTERVAL = float(os.getenv('EMAIL_OUTBOX_INTERVAL', 15))  # seconds between idle polls
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 60))  # doubled per retry
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', 600))
+
+    # Rate limiting for auth endpoints ("<attempts>/<seconds>" sliding windows)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True') == 'True'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # memory | sqlite (shared across workers)
+    RATE_LIMIT_STORAGE_PATH = os.getenv('RATE_LIMIT_STORAGE_PATH', str(BASE_DIR / 'instance' / 'rate_limits.db'))
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '0'))  # proxies appending X-Forwarded-For (Render: 1)
+    LOGIN_RATE_LIMIT_IP = os.getenv('LOGIN_RATE_LIMIT_IP', '30/300')
+    LOGIN_RATE_LIMIT_ACCOUNT = os.getenv('LOGIN_RATE_LIMIT_ACCOUNT', '10/900')
+    REGISTER_RATE_LIMIT_IP = os.getenv('REGISTER_RATE_LIMIT_IP', '10/3600')
+    REGISTER_RATE_LIMIT_ACCOUNT = os.getenv('REGISTER_RATE_LIMIT_ACCOUNT', '5/3600')
+    RESEND_VERIFICATION_RATE_LIMIT_IP = os.getenv('RESEND_VERIFICATION_RATE_LIMIT_IP', '10/3600')
+    RESEND_VERIFICATION_RATE_LIMIT_ACCOUNT = os.getenv('RESEND_VERIFICATION_RATE_LIMIT_ACCOUNT', '3/3600')
+
+    # Keyword search for issues/announcements (trigram index, typo tolerant)
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True') == 'True'
+    SEARCH_MIN_SIMILARITY = float(os.getenv('SEARCH_MIN_SIMILARITY', 0.5))  # share of query trigrams a match needs
+    SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 500))  # cap for search_entity_ids(); list routes page through all hits
+
+    # Audit trail writer (per-request buffer, optional append-only spool file)
+    AUDIT_BUFFER_ENABLED = os.getenv('AUDIT_BUFFER_ENABLED', 'True') == 'True'
+    AUDIT_SPOOL_PATH = os.getenv('AUDIT_SPOOL_PATH', '')  # e.g. instance/audit.spool; empty = write at teardown
+    AUDIT_SPOOL_WORKER = os.getenv('AUDIT_SPOOL_WORKER', 'True') == 'True'  # in-process spool ingester
+    AUDIT_SPOOL_INTERVAL = float(os.getenv('AUDIT_SPOOL_INTERVAL', 5))
+    AUDIT_SPOOL_BATCH_SIZE = int(os.getenv('AUDIT_SPOOL_BATCH_SIZE', 500))
+    AUDIT_HOT_MONTHS = int(os.getenv('AUDIT_HOT_MONTHS', 3))  # months (current included) served by default
+    AUDIT_ARCHIVE_AFTER_MONTHS = int(os.getenv('AUDIT_ARCHIVE_AFTER_MONTHS', 12))  # older months go to gzip JSONL
+    AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv('AUDIT_PARTITION_MONTHS_AHEAD', 2))
+    AUDIT_PARTITION_WORKER = os.getenv('AUDIT_PARTITION_WORKER', 'True') == 'True'  # PostgreSQL: create upcoming partitions in-process
+    AUDIT_PARTITION_INTERVAL = float(os.getenv('AUDIT_PARTITION_INTERVAL', 21600))  # seconds between checks
+    AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', '')  # default: <UPLOAD_FOLDER>/archives/audit
+
+    # Admin cleanup jobs (batched purge + gzip JSONL archive)
+    CLEANUP_BATCH_SIZE = int(os.getenv('CLEANUP_BATCH_SIZE', 500))  # rows deleted per commit
+    CLEANUP_YIELD_PER = int(os.getenv('CLEANUP_YIELD_PER', 100))  # rows fetched per DB round trip
+    CLEANUP_WORKER = os.getenv('CLEANUP_WORKER', 'True') == 'True'  # in-process runner for background jobs
+    CLEANUP_WORKER_INTERVAL = float(os.getenv('CLEANUP_WORKER_INTERVAL', 60))
+    CLEANUP_STALE_SECONDS = int(os.getenv('CLEANUP_STALE_SECONDS', 300))  # resume 'running' jobs idle this long
+
+    # Marketplace item view counters (coalesced in memory / local log, flushed in batches)
+    VIEW_COUNT_WORKER = os.getenv('VIEW_COUNT_WORKER', 'True') == 'True'  # in-process flusher
+    VIEW_COUNT_FLUSH_INTERVAL = float(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 10))
+    VIEW_COUNT_SPOOL_PATH = os.getenv('VIEW_COUNT_SPOOL_PATH', '')  # e.g. instance/views.log, shared by workers
+
+    # Marketplace browse feed cache (first pages of GET /api/marketplace/items, per process)
+    FEED_CACHE_ENABLED = os.getenv('FEED_CACHE_ENABLED', 'True') == 'True'
+    FEED_CACHE_PAGES = int(os.getenv('FEED_CACHE_PAGES', 3))  # pages cached per filter combination
+    FEED_CACHE_MAX_PER_PAGE = int(os.getenv('FEED_CACHE_MAX_PER_PAGE', 50))
+    FEED_CACHE_TTL = float(os.getenv('FEED_CACHE_TTL', 30))  # staleness bound for other workers
+    FEED_CACHE_MAX_ENTRIES = int(os.getenv('FEED_CACHE_MAX_ENTRIES', 1000))
+
+    # Per-request query count + DB time (X-Query-Count / Server-Timing) and slow-query log
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', 'True') == 'True'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))  # logged to 'munlink.slow_query' as JSON
+
+    # Prometheus text-format metrics at GET /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+    METRICS_DIR = os.getenv('METRICS_DIR', '')  # shared by gunicorn workers; clear on restart
+    METRICS_WRITE_INTERVAL = float(os.getenv('METRICS_WRITE_INTERVAL', 2))  # seconds between snapshots
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # bearer token for scrapes; without it /metrics is DEBUG-only
+
+    # Request profiler: admins send X-Profile: 1|cprofile, or sample a share of requests
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'True') == 'True'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # 0..1, 0 = header only
+    PROFILE_ENDPOINTS = os.getenv('PROFILE_ENDPOINTS', '')  # comma-separated endpoint names; empty = all
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))  # stack sampling interval
+    PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'instance' / 'profiles'))
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+
+    # Async serving mode (uvicorn asgi:app): threads for the sync Flask routes per process,
+    # and whether upload downloads / cached feed pages are answered on the event loop
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 32))
+    ASGI_NATIVE_ROUTES = os.getenv('ASGI_NATIVE_ROUTES', 'True') == 'True'
+
+    # API responses: 'orjson' (fast path, needs orjson installed) or 'default' (stdlib)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
     # QR Codes
     QR_BASE_URL = os.getenv('QR_BASE_URL', 'http://localhost:3000/verify')
     QR_EXPIRY_DAYS = int(os.getenv('QR_EXPIRY_DAYS', 30))
@@ -192,6 +351,9 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}  # SQLite doesn't need PostgreSQL options
     WTF_CSRF_ENABLED = False
+    EMAIL_OUTBOX_WORKER = False  # tests flush the outbox explicitly
+    CLEANUP_WORKER = False
+    VIEW_COUNT_WORKER = False
 
 
 # Config dictionary
@@ -0,0 +1,115 @@
+"""
+MunLink Region 3 - Read replica routing for db.session
+
+With DB_REPLICA_URLS set, the session sends a statement to a read replica when
+all of these hold:
+
+* it is a SELECT (not SELECT ... FOR UPDATE), issued outside a flush;
+* it runs in a GET/HEAD request or inside a ``use_replica()`` block (reads
+  explicitly marked as safe to serve from a replica, e.g. in a report job);
+* the session has not written yet. After the first flush or
+  INSERT/UPDATE/DELETE, the rest of the request reads from the primary
+  (read-your-writes).
+
+Everything else goes to the primary, including raw ``text()`` statements and
+``use_primary()`` blocks. Each session (one per request) sticks to one
+replica. Replicas lag the primary, so a read in the request after a write may
+not see it yet. Wrap such reads in ``use_primary()``.
+
+Try it locally with two SQLite files (or two local Postgres databases):
+
+    DATABASE_URL=sqlite:////tmp/munlink-primary.db \\
+    DB_REPLICA_URLS=sqlite:////tmp/munlink-replica.db python app.py
+"""
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+
+READ_METHODS = ('GET', 'HEAD')
+
+_route = ContextVar('munlink_db_route', default=None)
+_next_replica = itertools.count()
+
+
+@contextmanager
+def use_replica():
+    """Serve the reads in this block from a replica, even outside GET requests."""
+    token = _route.set('replica')
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Serve every read in this block from the primary."""
+    token = _route.set('primary')
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends safe reads to a replica engine."""
+
+    _wrote = False
+    _replica = None
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self._wrote = True
+            elif self._reads_from_replica(clause):
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if self._wrote or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+        route = _route.get()
+        if route == 'primary' or not has_app_context():
+            return False
+        if route != 'replica' and not (has_request_context() and request.method in READ_METHODS):
+            return False
+        if self._replica is None:
+            replicas = current_app.extensions.get('db_replicas')
+            if not replicas:
+                return False
+            self._replica = replicas[next(_next_replica) % len(replicas)]
+        return True
+
+
+def init_db_routing(app):
+    """Create the replica engines listed in DB_REPLICA_URLS."""
+    try:
+        from apps.api.config import get_engine_options
+        from apps.api.utils.db_pool import install_liveness_check
+        from apps.api.utils.metrics import instrument_engine
+    except ImportError:
+        from config import get_engine_options
+        from utils.db_pool import install_liveness_check
+        from utils.metrics import instrument_engine
+
+    urls = app.config.get('DB_REPLICA_URLS') or []
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(',') if url.strip()]
+    engines = []
+    for url in urls:
+        options = get_engine_options(url)
+        engine = create_engine(url, **options)
+        ping_idle = (app.config.get('DB_POOL') or {}).get('ping_idle', 0)
+        if not options.get('pool_pre_ping') and ping_idle > 0:
+            install_liveness_check(engine, ping_idle)
+        if app.config.get('METRICS_ENABLED', True):
+            instrument_engine(engine)
+        engines.append(engine)
+    app.extensions['db_replicas'] = engines
@@ -0,0 +1,39 @@
+"""add audit_facets counters for the audit filter dropdowns
+
+Revision ID: 20261019_audit_facets
+Revises: 20261019_audit_partitions
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_audit_facets'
+down_revision = '20261019_audit_partitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'audit_facets',
+        sa.Column('municipality_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=False),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_seen', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('municipality_id', 'entity_type', 'action', name='pk_audit_facets'),
+    )
+    # Backfill from existing rows (all partitions on PostgreSQL)
+    op.execute(
+        "INSERT INTO audit_facets (municipality_id, entity_type, action, count, last_seen) "
+        "SELECT municipality_id, entity_type, action, COUNT(*), MAX(created_at) FROM audit_logs "
+        "WHERE municipality_id IS NOT NULL AND entity_type IS NOT NULL AND action IS NOT NULL "
+        "GROUP BY municipality_id, entity_type, action"
+    )
+
+
+def downgrade():
+    op.drop_table('audit_facets')
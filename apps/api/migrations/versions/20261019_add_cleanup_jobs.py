@@ -0,0 +1,47 @@
+"""add cleanup_jobs for resumable batched admin cleanup
+
+Revision ID: 20261019_cleanup_jobs
+Revises: 20261019_audit_facets
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_cleanup_jobs'
+down_revision = '20261019_audit_facets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'cleanup_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('municipality_id', sa.Integer(), sa.ForeignKey('municipalities.id'), nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('cutoff', sa.DateTime(), nullable=True),
+        sa.Column('archive', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('deleted_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('batches', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('archive_path', sa.String(length=255), nullable=True),
+        sa.Column('archive_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_cleanup_job_status', 'cleanup_jobs', ['status', 'updated_at'])
+    op.create_index('idx_cleanup_job_muni', 'cleanup_jobs', ['municipality_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_cleanup_job_muni', table_name='cleanup_jobs')
+    op.drop_index('idx_cleanup_job_status', table_name='cleanup_jobs')
+    op.drop_table('cleanup_jobs')
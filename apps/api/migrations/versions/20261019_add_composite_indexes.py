@@ -0,0 +1,99 @@
+"""composite and partial indexes for the hot list and stats queries
+
+List and stats endpoints filter on municipality_id (+ status) and order by
+created_at DESC; these indexes match those shapes so the page is read in
+index order instead of sorting every matching row. Single-column indexes
+that are now a leading prefix of a composite index are dropped.
+
+On PostgreSQL the indexes are built CONCURRENTLY, outside the migration
+transaction, so the tables stay writable while they build.
+
+Revision ID: 20261019_composite_indexes
+Revises: 20261019_cleanup_jobs
+Create Date: 2026-10-19
+"""
+
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_composite_indexes'
+down_revision = '20261019_cleanup_jobs'
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, columns, partial-index flag column or None)
+INDEXES = {
+    'idx_item_muni_status_created': ('items', ['municipality_id', 'status', 'created_at'], None),
+    'idx_item_active_status_created': ('items', ['status', 'created_at'], 'is_active'),
+    'idx_item_user_created': ('items', ['user_id', 'created_at'], None),
+    'idx_transaction_buyer_created': ('transactions', ['buyer_id', 'created_at'], None),
+    'idx_transaction_seller_created': ('transactions', ['seller_id', 'created_at'], None),
+    'idx_transaction_status_created': ('transactions', ['status', 'created_at'], None),
+    'idx_issue_muni_status_created': ('issues', ['municipality_id', 'status', 'created_at'], None),
+    'idx_issue_muni_created': ('issues', ['municipality_id', 'created_at'], None),
+    'idx_issue_public_created': ('issues', ['created_at'], 'is_public'),
+    'idx_issue_user_created': ('issues', ['user_id', 'created_at'], None),
+    'idx_doc_request_muni_status_created': ('document_requests', ['municipality_id', 'status', 'created_at'], None),
+    'idx_doc_request_muni_created': ('document_requests', ['municipality_id', 'created_at'], None),
+    'idx_doc_request_user_created': ('document_requests', ['user_id', 'created_at'], None),
+    'idx_announcement_muni_active_created': ('announcements', ['municipality_id', 'is_active', 'created_at'], None),
+    'idx_announcement_muni_created': ('announcements', ['municipality_id', 'created_at'], None),
+    'idx_announcement_active_created': ('announcements', ['created_at'], 'is_active'),
+    'idx_user_muni_role_verified': ('users', ['municipality_id', 'role', 'admin_verified', 'created_at'], None),
+}
+
+# Covered by a composite index above
+REDUNDANT = {
+    'idx_item_municipality': ('items', ['municipality_id']),
+    'idx_transaction_buyer': ('transactions', ['buyer_id']),
+    'idx_transaction_seller': ('transactions', ['seller_id']),
+    'idx_transaction_status': ('transactions', ['status']),
+    'idx_issue_municipality': ('issues', ['municipality_id']),
+    'idx_doc_request_user': ('document_requests', ['user_id']),
+    'idx_doc_request_municipality': ('document_requests', ['municipality_id']),
+    'idx_announcement_municipality': ('announcements', ['municipality_id']),
+    'idx_user_municipality': ('users', ['municipality_id']),
+}
+
+
+def _create(name, table, columns, flag, postgres):
+    kwargs = {}
+    if flag:
+        kwargs['postgresql_where'] = sa.text(f'{flag} = true')
+        kwargs['sqlite_where'] = sa.text(f'{flag} = 1')
+    if postgres:
+        kwargs['postgresql_concurrently'] = True
+    op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+
+def _drop(name, table, postgres):
+    kwargs = {'postgresql_concurrently': True} if postgres else {}
+    op.drop_index(name, table_name=table, if_exists=True, **kwargs)
+
+
+def _outside_transaction(postgres):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    return op.get_context().autocommit_block() if postgres else nullcontext()
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with _outside_transaction(postgres):
+        for name, (table, columns, flag) in INDEXES.items():
+            _create(name, table, columns, flag, postgres)
+        for name, (table, _) in REDUNDANT.items():
+            _drop(name, table, postgres)
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with _outside_transaction(postgres):
+        for name, (table, columns) in REDUNDANT.items():
+            _create(name, table, columns, None, postgres)
+        for name, (table, _, _) in INDEXES.items():
+            _drop(name, table, postgres)
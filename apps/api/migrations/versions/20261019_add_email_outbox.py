@@ -0,0 +1,42 @@
+"""add email_outbox table
+
+Revision ID: 20261019_email_outbox
+Revises: 20260102_bp_img
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_email_outbox'
+down_revision = '20260102_bp_img'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('to_email', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_email_outbox_status_next', 'email_outbox', ['status', 'next_attempt_at'])
+    op.create_index('idx_email_outbox_claim', 'email_outbox', ['claim_token'])
+
+
+def downgrade():
+    op.drop_index('idx_email_outbox_claim', table_name='email_outbox')
+    op.drop_index('idx_email_outbox_status_next', table_name='email_outbox')
+    op.drop_table('email_outbox')
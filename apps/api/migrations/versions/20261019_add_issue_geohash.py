@@ -0,0 +1,69 @@
+"""add geohash column to issues for location queries
+
+Revision ID: 20261019_issue_geohash
+Revises: 20261019_search_index
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_issue_geohash'
+down_revision = '20261019_search_index'
+branch_labels = None
+depends_on = None
+
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def _geohash(lat, lon, precision=9):
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            value = (value << 1) | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = (value << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def upgrade():
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.create_index('idx_issue_geohash', ['geohash'])
+
+    # Backfill existing rows
+    bind = op.get_bind()
+    issues = sa.table('issues', sa.column('id'), sa.column('latitude'), sa.column('longitude'), sa.column('geohash'))
+    rows = bind.execute(
+        sa.select(issues.c.id, issues.c.latitude, issues.c.longitude)
+        .where(issues.c.latitude.isnot(None), issues.c.longitude.isnot(None))
+    ).fetchall()
+    updates = [
+        {'row_id': r.id, 'gh': _geohash(float(r.latitude), float(r.longitude))}
+        for r in rows
+        if -90 <= float(r.latitude) <= 90 and -180 <= float(r.longitude) <= 180
+    ]
+    if updates:
+        bind.execute(
+            issues.update().where(issues.c.id == sa.bindparam('row_id')).values(geohash=sa.bindparam('gh')),
+            updates,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.drop_index('idx_issue_geohash')
+        batch_op.drop_column('geohash')
@@ -0,0 +1,72 @@
+"""add full-text search index for marketplace items
+
+PostgreSQL: generated tsvector column + GIN index.
+SQLite: external-content FTS5 table kept in sync by triggers.
+
+Revision ID: 20261019_item_fts
+Revises: 20261019_email_outbox
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_item_fts'
+down_revision = '20261019_email_outbox'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        title, description, content='items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF title, description ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS items_fts_au',
+    'DROP TRIGGER IF EXISTS items_fts_ad',
+    'DROP TRIGGER IF EXISTS items_fts_ai',
+    'DROP TABLE IF EXISTS items_fts',
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            """
+            ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED
+            """
+        )
+        op.execute('CREATE INDEX IF NOT EXISTS idx_item_search_vector ON items USING GIN (search_vector)')
+    elif dialect == 'sqlite':
+        for stmt in SQLITE_UPGRADE:
+            op.execute(stmt)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS idx_item_search_vector')
+        op.execute('ALTER TABLE items DROP COLUMN IF EXISTS search_vector')
+    elif dialect == 'sqlite':
+        for stmt in SQLITE_DOWNGRADE:
+            op.execute(stmt)
@@ -0,0 +1,45 @@
+"""add trigram search index tables for issues and announcements
+
+Run apps/api/scripts/rebuild_search_index.py afterwards to index existing rows.
+
+Revision ID: 20261019_search_index
+Revises: 20261019_item_fts
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_search_index'
+down_revision = '20261019_item_fts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entity_type', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('municipality_id', sa.Integer(), nullable=True),
+        sa.Column('content_hash', sa.String(length=40), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('entity_type', 'entity_id', name='uq_search_document_entity'),
+    )
+    op.create_table(
+        'search_trigrams',
+        sa.Column('document_id', sa.Integer(), sa.ForeignKey('search_documents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('trigram', sa.String(length=3), primary_key=True),
+        sa.Column('entity_type', sa.String(length=30), nullable=False),
+        sa.Column('municipality_id', sa.Integer(), nullable=True),
+    )
+    op.create_index('idx_search_trigram_lookup', 'search_trigrams', ['entity_type', 'trigram', 'municipality_id'])
+
+
+def downgrade():
+    op.drop_index('idx_search_trigram_lookup', table_name='search_trigrams')
+    op.drop_table('search_trigrams')
+    op.drop_table('search_documents')
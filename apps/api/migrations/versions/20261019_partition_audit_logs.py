@@ -0,0 +1,122 @@
+"""partition audit_logs and transaction_audit_logs by month (PostgreSQL)
+
+Both tables become RANGE (created_at) partitioned tables with one partition
+per month holding data, partitions for the next two months and a DEFAULT
+partition. The primary key becomes (id, created_at), as PostgreSQL requires
+the partition key in unique constraints; ids keep coming from the same
+sequence.
+
+SQLite keeps plain tables; month tables are managed at runtime by
+apps/api/utils/audit_partitions.py.
+
+Revision ID: 20261019_audit_partitions
+Revises: 20261019_issue_geohash
+Create Date: 2026-10-19
+"""
+
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_audit_partitions'
+down_revision = '20261019_issue_geohash'
+branch_labels = None
+depends_on = None
+
+
+TABLES = {
+    'audit_logs': {
+        'foreign_keys': [('user_id', 'users'), ('municipality_id', 'municipalities')],
+        'indexes': {
+            'idx_audit_muni': ['municipality_id'],
+            'idx_audit_entity': ['entity_type', 'entity_id'],
+            'idx_audit_created_at': ['created_at'],
+        },
+    },
+    'transaction_audit_logs': {
+        'foreign_keys': [('transaction_id', 'transactions'), ('actor_id', 'users')],
+        'indexes': {
+            'idx_audit_tx': ['transaction_id'],
+            'idx_audit_created': ['created_at'],
+        },
+    },
+}
+
+MONTHS_AHEAD = 2
+
+
+def _months(bind, table):
+    """First day of every month from the oldest row through MONTHS_AHEAD."""
+    row = bind.execute(sa.text(
+        f"SELECT date_trunc('month', COALESCE(MIN(created_at), now()))::date, "
+        f"(date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date FROM {table}"
+    )).first()
+    start, end = row
+    months = []
+    while start <= end:
+        months.append(start)
+        start = _next_month(start)
+    return months
+
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _swap(bind, table, partitioned):
+    spec = TABLES[table]
+    old = f'{table}_old'
+    seq = bind.execute(sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {'t': table}).scalar()
+    if seq:
+        op.execute(f'ALTER SEQUENCE {seq} OWNED BY NONE')
+    for name in spec['indexes']:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    op.execute(f'UPDATE {table} SET created_at = now() WHERE created_at IS NULL')
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+
+    if partitioned:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)')
+        for month in _months(bind, old):
+            nxt = _next_month(month)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{nxt:%Y-%m-%d}')"
+            )
+        op.execute(f'CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT')
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    for column, target in spec['foreign_keys']:
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey '
+            f'FOREIGN KEY ({column}) REFERENCES {target} (id)'
+        )
+    for name, columns in spec['indexes'].items():
+        op.execute(f'CREATE INDEX {name} ON {table} ({", ".join(columns)})')
+    op.execute(f'DROP TABLE {old} CASCADE')
+    if seq:
+        op.execute(f'ALTER SEQUENCE {seq} OWNED BY {table}.id')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        _swap(bind, table, partitioned=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        _swap(bind, table, partitioned=False)
@@ -20,7 +20,10 @@ try:
     from apps.api.models.issue import IssueCategory, Issue, IssueUpdate
     from apps.api.models.benefit import BenefitProgram, BenefitApplication
     from apps.api.models.token_blacklist import TokenBlacklist
-    from apps.api.models.audit import AuditLog
+    from apps.api.models.audit import AuditLog, AuditFacet
+    from apps.api.models.email_outbox import EmailOutbox
+    from apps.api.models.search import SearchDocument, SearchTrigram
+    from apps.api.models.cleanup_job import CleanupJob
 except ImportError:
     from .user import User
     from .province import Province
@@ -30,7 +33,10 @@ except ImportError:
     from .issue import IssueCategory, Issue, IssueUpdate
     from .benefit import BenefitProgram, BenefitApplication
     from .token_blacklist import TokenBlacklist
-    from .audit import AuditLog
+    from .audit import AuditLog, AuditFacet
+    from .email_outbox import EmailOutbox
+    from .search import SearchDocument, SearchTrigram
+    from .cleanup_job import CleanupJob
 
 __all__ = [
     'User',
@@ -49,5 +55,10 @@ __all__ = [
     'BenefitApplication',
     'TokenBlacklist',
     'AuditLog',
+    'AuditFacet',
+    'EmailOutbox',
+    'SearchDocument',
+    'SearchTrigram',
+    'CleanupJob',
 ]
 
@@ -7,7 +7,7 @@ try:
 except ImportError:
     from __init__ import db
 from datetime import datetime
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 
 class Announcement(db.Model):
     """Announcement model for municipality communications."""
@@ -32,10 +32,14 @@ class Announcement(db.Model):
     
     # Indexes
     __table_args__ = (
-        Index('idx_announcement_municipality', 'municipality_id'),
         Index('idx_announcement_active', 'is_active'),
         Index('idx_announcement_priority', 'priority'),
         Index('idx_announcement_created', 'created_at'),
+        # Composite/partial indexes matching the hot list and stats queries
+        Index('idx_announcement_muni_active_created', 'municipality_id', 'is_active', 'created_at'),
+        Index('idx_announcement_muni_created', 'municipality_id', 'created_at'),
+        Index('idx_announcement_active_created', 'created_at',
+              postgresql_where=text('is_active = true'), sqlite_where=text('is_active = 1')),
     )
     
     def __repr__(self):
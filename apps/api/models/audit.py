@@ -11,7 +11,7 @@ try:
 except Exception:  # pragma: no cover
     from __init__ import db
 
-from sqlalchemy import Index
+from sqlalchemy import Index, PrimaryKeyConstraint
 
 
 class AuditLog(db.Model):
@@ -56,3 +56,30 @@ class AuditLog(db.Model):
         }
 
 
+
+
+class AuditFacet(db.Model):
+    """Per-municipality (entity_type, action) counters behind /admin/audit/meta.
+
+    Maintained incrementally by the audit writer (``utils.audit_facets``);
+    counts cover every event recorded, including months since archived.
+    """
+    __tablename__ = 'audit_facets'
+
+    municipality_id = db.Column(db.Integer, nullable=False)
+    entity_type = db.Column(db.String(50), nullable=False)
+    action = db.Column(db.String(50), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    last_seen = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('municipality_id', 'entity_type', 'action', name='pk_audit_facets'),
+    )
+
+    def to_dict(self):
+        return {
+            'entity_type': self.entity_type,
+            'action': self.action,
+            'count': self.count,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+        }
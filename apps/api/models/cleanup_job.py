@@ -0,0 +1,70 @@
+"""Resumable admin cleanup (purge + archive) jobs.
+
+Each job deletes one entity's rows for a municipality in id order. The
+cursor (``last_id``) and the archive's byte length advance in the same
+commit as each deleted batch, so an interrupted job resumes exactly where
+it stopped.
+"""
+from datetime import datetime
+try:
+    from apps.api import db
+except ImportError:
+    from __init__ import db
+from sqlalchemy import Index
+
+
+class CleanupJob(db.Model):
+    __tablename__ = 'cleanup_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    municipality_id = db.Column(db.Integer, db.ForeignKey('municipalities.id'), nullable=False)
+    entity = db.Column(db.String(30), nullable=False)  # announcements | requests
+    cutoff = db.Column(db.DateTime, nullable=True)  # delete rows created at or before; None = all
+    archive = db.Column(db.Boolean, nullable=False, default=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+    # pending -> running -> completed | failed (failed/stale jobs can be resumed)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)  # matching rows when the job started
+    deleted_count = db.Column(db.Integer, nullable=False, default=0)
+    batches = db.Column(db.Integer, nullable=False, default=0)
+    archive_path = db.Column(db.String(255), nullable=True)  # relative to UPLOAD_FOLDER
+    archive_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_cleanup_job_status', 'status', 'updated_at'),
+        Index('idx_cleanup_job_muni', 'municipality_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<CleanupJob {self.id} {self.entity} ({self.status})>'
+
+    def to_dict(self):
+        progress = None
+        if self.total:
+            progress = round(min(1.0, self.deleted_count / self.total) * 100, 1)
+        elif self.status == 'completed':
+            progress = 100.0
+        return {
+            'id': self.id,
+            'municipality_id': self.municipality_id,
+            'entity': self.entity,
+            'before': self.cutoff.isoformat() if self.cutoff else None,
+            'archive': self.archive,
+            'status': self.status,
+            'total': self.total,
+            'deleted_count': self.deleted_count,
+            'batches': self.batches,
+            'progress': progress,
+            'archived_url': self.archive_path if self.archive and self.archive_path else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
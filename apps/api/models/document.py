@@ -125,10 +125,12 @@ class DocumentRequest(db.Model):
     
     # Indexes
     __table_args__ = (
-        Index('idx_doc_request_user', 'user_id'),
-        Index('idx_doc_request_municipality', 'municipality_id'),
         Index('idx_doc_request_status', 'status'),
         Index('idx_doc_request_number', 'request_number'),
+        # Composite indexes matching the hot list and stats queries
+        Index('idx_doc_request_muni_status_created', 'municipality_id', 'status', 'created_at'),
+        Index('idx_doc_request_muni_created', 'municipality_id', 'created_at'),
+        Index('idx_doc_request_user_created', 'user_id', 'created_at'),
     )
     
     def __repr__(self):
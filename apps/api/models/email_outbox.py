@@ -0,0 +1,54 @@
+"""Persistent outbox for outgoing emails.
+
+Routes queue messages here instead of talking to SMTP inline; a background
+sender drains the table over a single authenticated SMTP session.
+"""
+from datetime import datetime
+try:
+    from apps.api import db
+except ImportError:
+    from __init__ import db
+from sqlalchemy import Index
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # pending -> sending -> sent | failed (pending again between retries)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Claim marker so concurrent workers never send the same row twice
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_email_outbox_status_next', 'status', 'next_attempt_at'),
+        Index('idx_email_outbox_claim', 'claim_token'),
+    )
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} to {self.to_email} ({self.status})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'to_email': self.to_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+        }
@@ -4,7 +4,7 @@ try:
     from apps.api import db
 except ImportError:
     from __init__ import db
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 
 class IssueCategory(db.Model):
     __tablename__ = 'issue_categories'
@@ -65,6 +65,7 @@ class Issue(db.Model):
     specific_location = db.Column(db.String(200), nullable=True)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)  # derived from lat/long (utils/geo.py)
     
     # Evidence (photos/videos)
     attachments = db.Column(db.JSON, nullable=True)  # Array of file paths
@@ -106,11 +107,17 @@ class Issue(db.Model):
     
     # Indexes
     __table_args__ = (
-        Index('idx_issue_municipality', 'municipality_id'),
         Index('idx_issue_category', 'category_id'),
         Index('idx_issue_status', 'status'),
         Index('idx_issue_priority', 'priority'),
         Index('idx_issue_number', 'issue_number'),
+        Index('idx_issue_geohash', 'geohash'),
+        # Composite/partial indexes matching the hot list and stats queries
+        Index('idx_issue_muni_status_created', 'municipality_id', 'status', 'created_at'),
+        Index('idx_issue_muni_created', 'municipality_id', 'created_at'),
+        Index('idx_issue_public_created', 'created_at',
+              postgresql_where=text('is_public = true'), sqlite_where=text('is_public = 1')),
+        Index('idx_issue_user_created', 'user_id', 'created_at'),
     )
     
     def __repr__(self):
@@ -4,7 +4,7 @@ try:
     from apps.api import db
 except ImportError:
     from __init__ import db
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 
 class Item(db.Model):
     __tablename__ = 'items'
@@ -66,11 +66,15 @@ class Item(db.Model):
     
     # Indexes
     __table_args__ = (
-        Index('idx_item_municipality', 'municipality_id'),
         Index('idx_item_category', 'category'),
         Index('idx_item_transaction_type', 'transaction_type'),
         Index('idx_item_status', 'status'),
         Index('idx_item_created_at', 'created_at'),
+        # Composite/partial indexes matching the hot list and stats queries
+        Index('idx_item_muni_status_created', 'municipality_id', 'status', 'created_at'),
+        Index('idx_item_active_status_created', 'status', 'created_at',
+              postgresql_where=text('is_active = true'), sqlite_where=text('is_active = 1')),
+        Index('idx_item_user_created', 'user_id', 'created_at'),
     )
     
     def __repr__(self):
@@ -165,9 +169,9 @@ class Transaction(db.Model):
     
     # Indexes
     __table_args__ = (
-        Index('idx_transaction_buyer', 'buyer_id'),
-        Index('idx_transaction_seller', 'seller_id'),
-        Index('idx_transaction_status', 'status'),
+        Index('idx_transaction_buyer_created', 'buyer_id', 'created_at'),
+        Index('idx_transaction_seller_created', 'seller_id', 'created_at'),
+        Index('idx_transaction_status_created', 'status', 'created_at'),
     )
     
     def __repr__(self):
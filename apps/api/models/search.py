@@ -0,0 +1,46 @@
+"""Trigram search index shared by issues and announcements.
+
+One ``SearchDocument`` per indexed row and one ``SearchTrigram`` posting per
+distinct trigram of its folded text. Postings carry ``entity_type`` and
+``municipality_id`` so scoped lookups never touch other municipalities.
+"""
+from datetime import datetime
+try:
+    from apps.api import db
+except ImportError:
+    from __init__ import db
+from sqlalchemy import Index, UniqueConstraint
+
+
+class SearchDocument(db.Model):
+    __tablename__ = 'search_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(30), nullable=False)  # 'issue' | 'announcement'
+    entity_id = db.Column(db.Integer, nullable=False)
+    municipality_id = db.Column(db.Integer, nullable=True)
+    content_hash = db.Column(db.String(40), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('entity_type', 'entity_id', name='uq_search_document_entity'),
+    )
+
+    def __repr__(self):
+        return f'<SearchDocument {self.entity_type}:{self.entity_id}>'
+
+
+class SearchTrigram(db.Model):
+    __tablename__ = 'search_trigrams'
+
+    document_id = db.Column(db.Integer, db.ForeignKey('search_documents.id', ondelete='CASCADE'), primary_key=True)
+    trigram = db.Column(db.String(3), primary_key=True)
+    entity_type = db.Column(db.String(30), nullable=False)
+    municipality_id = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        Index('idx_search_trigram_lookup', 'entity_type', 'trigram', 'municipality_id'),
+    )
+
+    def __repr__(self):
+        return f'<SearchTrigram {self.trigram!r} doc={self.document_id}>'
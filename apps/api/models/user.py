@@ -69,8 +69,9 @@ class User(db.Model):
     __table_args__ = (
         Index('idx_user_email', 'email'),
         Index('idx_user_username', 'username'),
-        Index('idx_user_municipality', 'municipality_id'),
         Index('idx_user_role', 'role'),
+        # Resident lists and verification counts per municipality
+        Index('idx_user_muni_role_verified', 'municipality_id', 'role', 'admin_verified', 'created_at'),
     )
     
     def __repr__(self):
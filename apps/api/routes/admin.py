@@ -4,7 +4,7 @@ Admin-specific operations with municipality scoping
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, update
 from datetime import datetime, timedelta
 import os
 import jwt
@@ -22,9 +22,21 @@ from apps.api.models.announcement import Announcement
 from apps.api.models.transfer import TransferRequest
 from apps.api.utils.file_handler import save_announcement_image
 from apps.api.utils.validators import ValidationError
-from apps.api.utils.email_sender import send_user_status_email, send_document_request_status_email
-from apps.api.models.audit import AuditLog
-from apps.api.utils.audit import log_action as log_generic_action
+from apps.api.utils.email_sender import send_user_status_email, send_document_request_status_email, user_status_email_content
+from apps.api.utils.email_outbox import queue_email, wake_sender as wake_email_sender
+from apps.api.utils.search_index import apply_text_search
+from apps.api.models.audit import AuditLog, AuditFacet
+from apps.api.models.cleanup_job import CleanupJob
+from apps.api.utils.audit import log_action as log_generic_action, log_actions_bulk as log_generic_actions_bulk
+from apps.api.utils.audit_partitions import audit_entity, hot_window_start
+from apps.api.utils.cleanup import (
+    CLEANUP_ENTITIES,
+    claim_job as claim_cleanup_job,
+    create_job as create_cleanup_job,
+    is_active as cleanup_job_active,
+    run_job as run_cleanup_job,
+    start_in_background as start_cleanup_worker,
+)
 from apps.api.utils.qr_utils import (
     generate_pickup_code,
     hash_code,
@@ -176,6 +188,14 @@ def verify_user(user_id):
         user.updated_at = datetime.utcnow()
         
         db.session.commit()
+        log_generic_action(
+            user_id=get_jwt_identity(),
+            municipality_id=municipality_id,
+            entity_type='user',
+            entity_id=user.id,
+            action='verify',
+            new_values={'admin_verified': True},
+        )
 
         # Send approval email (best-effort)
         try:
@@ -220,6 +240,15 @@ def reject_user(user_id):
         user.updated_at = datetime.utcnow()
         
         db.session.commit()
+        log_generic_action(
+            user_id=get_jwt_identity(),
+            municipality_id=municipality_id,
+            entity_type='user',
+            entity_id=user.id,
+            action='reject',
+            new_values={'is_active': False},
+            notes=reason,
+        )
 
         # Send rejection email (best-effort)
         try:
@@ -237,6 +266,133 @@ def reject_user(user_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to reject user', 'details': str(e)}), 500
 
+BULK_USER_ACTION_LIMIT = 500
+
+
+def _bulk_update_user_status(approve: bool):
+    """Verify or reject many residents in one transaction.
+
+    Loads all targets with one IN query, updates them with one UPDATE, writes
+    audit rows with a bulk INSERT and queues the notification emails in the
+    same commit.
+    """
+    municipality_id = require_admin_municipality()
+    if isinstance(municipality_id, tuple):  # Error response
+        return municipality_id
+
+    data = request.get_json(silent=True) or {}
+    raw_ids = data.get('user_ids')
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({'error': 'user_ids must be a non-empty list'}), 400
+    try:
+        user_ids = list(dict.fromkeys(int(x) for x in raw_ids))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'user_ids must contain integers'}), 400
+    if len(user_ids) > BULK_USER_ACTION_LIMIT:
+        return jsonify({'error': f'At most {BULK_USER_ACTION_LIMIT} users can be processed per request'}), 400
+    reason = data.get('reason', 'Verification rejected')
+
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids)).all()}
+    targets, skipped = [], []
+    for uid in user_ids:
+        user = users.get(uid)
+        if not user:
+            skipped.append({'id': uid, 'reason': 'not_found'})
+        elif user.municipality_id != municipality_id:
+            skipped.append({'id': uid, 'reason': 'not_in_municipality'})
+        elif user.role != 'resident':
+            skipped.append({'id': uid, 'reason': 'not_resident'})
+        elif approve and user.admin_verified:
+            skipped.append({'id': uid, 'reason': 'already_verified'})
+        elif not approve and not user.is_active:
+            skipped.append({'id': uid, 'reason': 'already_rejected'})
+        else:
+            targets.append(user)
+
+    if not targets:
+        return jsonify({'message': 'No users updated', 'processed': [], 'skipped': skipped, 'count': 0}), 200
+
+    now = datetime.utcnow()
+    target_ids = [u.id for u in targets]
+    if approve:
+        values = {'admin_verified': True, 'admin_verified_at': now, 'updated_at': now}
+    else:
+        values = {'is_active': False, 'updated_at': now}
+    db.session.execute(
+        update(User).where(User.id.in_(target_ids)).values(**values),
+        execution_options={'synchronize_session': 'evaluate'},
+    )
+
+    try:
+        actor_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        actor_id = None
+    log_generic_actions_bulk([
+        {
+            'user_id': actor_id,
+            'municipality_id': municipality_id,
+            'entity_type': 'user',
+            'entity_id': u.id,
+            'action': 'verify' if approve else 'reject',
+            'old_values': None,
+            'new_values': {'admin_verified': True} if approve else {'is_active': False},
+            'notes': None if approve else reason,
+            'created_at': now,
+        }
+        for u in targets
+    ])
+
+    # Notifications ride on the same commit via the outbox
+    recipients = [u.email for u in targets if u.email]
+    queued = bool(current_app.config.get('EMAIL_OUTBOX_ENABLED'))
+    if queued:
+        subject, body = user_status_email_content(approve, None if approve else reason)
+        for email in recipients:
+            queue_email(email, subject, body, commit=False)
+
+    db.session.commit()
+
+    if queued and recipients:
+        try:
+            wake_email_sender()
+        except Exception:
+            pass
+    elif recipients:
+        for email in recipients:
+            try:
+                send_user_status_email(email, approved=approve, reason=None if approve else reason)
+            except Exception:
+                pass
+
+    return jsonify({
+        'message': f"{len(targets)} user(s) {'verified' if approve else 'rejected'}",
+        'processed': target_ids,
+        'skipped': skipped,
+        'count': len(targets),
+    }), 200
+
+
+@admin_bp.route('/users/bulk-verify', methods=['POST'])
+@jwt_required()
+def bulk_verify_users():
+    """Verify a list of residents: {"user_ids": [...]}"""
+    try:
+        return _bulk_update_user_status(approve=True)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to verify users', 'details': str(e)}), 500
+
+
+@admin_bp.route('/users/bulk-reject', methods=['POST'])
+@jwt_required()
+def bulk_reject_users():
+    """Reject a list of residents: {"user_ids": [...], "reason": "..."}"""
+    try:
+        return _bulk_update_user_status(approve=False)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to reject users', 'details': str(e)}), 500
+
 @admin_bp.route('/users/<int:user_id>/suspend', methods=['POST'])
 @jwt_required()
 def suspend_user(user_id: int):
@@ -425,6 +581,7 @@ def get_issues():
             # Get filter parameters
             status = request.args.get('status')
             category = request.args.get('category')
+            q = (request.args.get('q') or '').strip()
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 20, type=int)
             
@@ -450,9 +607,10 @@ def get_issues():
                     if cat:
                         query = query.filter(Issue.category_id == cat.id)
             
-            issues = query.order_by(Issue.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            query, ranked = apply_text_search(query, 'issue', q, municipality_id=municipality_id)
+            if not ranked:
+                query = query.order_by(Issue.created_at.desc())
+            issues = query.paginate(page=page, per_page=per_page, error_out=False)
             
             issues_data = []
             for issue in issues.items:
@@ -1358,11 +1516,14 @@ def admin_list_transfers():
         base = base.order_by(sort_col.asc() if order == 'asc' else sort_col.desc())
 
         p = base.paginate(page=page, per_page=per_page, error_out=False)
+        # One query for every resident on the page instead of one per row
+        user_ids = {t.user_id for t in p.items if t.user_id}
+        users = {u.id: u for u in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
         items = []
         for t in p.items:
             d = t.to_dict()
             try:
-                u = User.query.get(t.user_id)
+                u = users.get(t.user_id)
                 if u:
                     d['resident_name'] = (f"{getattr(u,'first_name','') or ''} {getattr(u,'last_name','') or ''}").strip() or getattr(u,'username', None) or getattr(u,'email', None)
                     d['email'] = getattr(u, 'email', None)
@@ -1436,9 +1597,8 @@ def admin_update_transfer(transfer_id: int):
                 old_values={'status': prev_status},
                 new_values={'status': new_status},
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Transfer updated', 'transfer': t.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -1508,9 +1668,8 @@ def admin_update_benefit_application_status(application_id: int):
                 new_values={'status': new_status},
                 notes=notes,
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
 
         # Email notifications (best-effort)
         try:
@@ -1877,6 +2036,7 @@ def generate_document_request_pdf(request_id: int):
     """Generate PDF for a digital document request using dynamic ReportLab generator."""
     try:
         from apps.api.utils.pdf_generator import generate_document_pdf
+        from apps.api.utils.metrics import PDF_SECONDS
 
         municipality_id = require_admin_municipality()
         if isinstance(municipality_id, tuple):
@@ -1902,7 +2062,8 @@ def generate_document_request_pdf(request_id: int):
         except Exception:
             admin_user = None
 
-        abs_path, rel_path = generate_document_pdf(req, doc_type, user, admin_user=admin_user)
+        with PDF_SECONDS.time():
+            abs_path, rel_path = generate_document_pdf(req, doc_type, user, admin_user=admin_user)
 
         req.document_file = rel_path
         # Retain existing behavior for digital requests: set ready after generation,
@@ -2036,9 +2197,8 @@ def update_document_request_status(request_id: int):
                 new_values={'status': new_status},
                 notes=notes or rejection_reason,
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
 
         # Email notifications (best-effort)
         try:
@@ -2110,9 +2270,8 @@ def admin_ready_for_pickup(request_id: int):
                 new_values={'status': 'ready'},
                 notes=None,
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         try:
             user = User.query.get(req.user_id)
             doc_type = DocumentType.query.get(req.document_type_id)
@@ -2125,7 +2284,7 @@ def admin_ready_for_pickup(request_id: int):
         return jsonify({
             'message': 'Marked ready for pickup',
             'claim': {
-                'qr_path': f"/uploads/{str(req.qr_code).replace('\\','/')}" if req.qr_code else None,
+                'qr_path': "/uploads/" + str(req.qr_code).replace('\\', '/') if req.qr_code else None,
                 'code_masked': (req.qr_data or {}).get('code_masked'),
                 'window_start': (req.qr_data or {}).get('window_start'),
                 'window_end': (req.qr_data or {}).get('window_end'),
@@ -2205,9 +2364,8 @@ def admin_generate_claim_token(request_id: int):
                 new_values={'qr_code': req.qr_code, 'code_masked': (req.qr_data or {}).get('code_masked')},
                 notes=None,
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
 
         return jsonify({
             'message': 'Claim token generated',
@@ -2352,9 +2510,8 @@ def update_document_request_content(request_id: int):
                 new_values={k: updates.get(k) for k in ['purpose','remarks','civil_status','age'] if k in updates},
                 notes=None,
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
 
         return jsonify({'message': 'Content updated', 'request': req.to_dict(include_user=True, include_audit=True)}), 200
     except Exception as e:
@@ -2461,38 +2618,48 @@ def admin_list_audit():
         municipality_id = require_admin_municipality()
         if isinstance(municipality_id, tuple):
             return municipality_id
-        q = AuditLog.query.filter(AuditLog.municipality_id == municipality_id)
         entity_type = request.args.get('entity_type')
         entity_id = request.args.get('entity_id')
         actor_role = request.args.get('actor_role')
         action = request.args.get('action')
         from_date = request.args.get('from')
         to_date = request.args.get('to')
+        # Without an explicit 'from' only the hot partitions are read
+        since = hot_window_start()
+        if from_date:
+            try:
+                since = datetime.fromisoformat(from_date)
+            except Exception:
+                pass
+        Log = audit_entity(AuditLog, since)
+        q = db.session.query(Log).filter(Log.municipality_id == municipality_id, Log.created_at >= since)
         if entity_type:
-            q = q.filter(AuditLog.entity_type == entity_type)
+            q = q.filter(Log.entity_type == entity_type)
         if entity_id:
             try:
-                q = q.filter(AuditLog.entity_id == int(entity_id))
+                q = q.filter(Log.entity_id == int(entity_id))
             except Exception:
                 pass
         if actor_role:
-            q = q.filter(AuditLog.actor_role == actor_role)
+            q = q.filter(Log.actor_role == actor_role)
         if action:
-            q = q.filter(AuditLog.action == action)
-        if from_date:
-            try:
-                q = q.filter(AuditLog.created_at >= datetime.fromisoformat(from_date))
-            except Exception:
-                pass
+            q = q.filter(Log.action == action)
         if to_date:
             try:
-                q = q.filter(AuditLog.created_at <= datetime.fromisoformat(to_date))
+                q = q.filter(Log.created_at <= datetime.fromisoformat(to_date))
             except Exception:
                 pass
         page = int(request.args.get('page', 1))
         per_page = min(100, int(request.args.get('per_page', 20)))
-        p = q.order_by(AuditLog.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        return jsonify({'logs': [l.to_dict() for l in p.items], 'page': p.page, 'pages': p.pages, 'per_page': p.per_page, 'total': p.total}), 200
+        p = q.order_by(Log.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        return jsonify({
+            'logs': [l.to_dict() for l in p.items],
+            'page': p.page,
+            'pages': p.pages,
+            'per_page': p.per_page,
+            'total': p.total,
+            'from': since.isoformat(),
+        }), 200
     except Exception as e:
         return jsonify({'error': 'Failed to list audit logs', 'details': str(e)}), 500
 
@@ -2505,13 +2672,27 @@ def admin_audit_meta():
         municipality_id = require_admin_municipality()
         if isinstance(municipality_id, tuple):
             return municipality_id
-        # Distinct entity types and actions scoped to municipality
-        et_rows = db.session.query(AuditLog.entity_type).filter(AuditLog.municipality_id == municipality_id).distinct().all()
-        ac_rows = db.session.query(AuditLog.action).filter(AuditLog.municipality_id == municipality_id).distinct().all()
-        entity_types = [r[0] for r in et_rows if r and r[0]]
-        actions = [r[0] for r in ac_rows if r and r[0]]
+        # Facet counters are maintained by the audit writer; no scan of audit_logs
+        facets = (
+            AuditFacet.query.filter(AuditFacet.municipality_id == municipality_id)
+            .order_by(AuditFacet.entity_type, AuditFacet.action)
+            .all()
+        )
+        entity_counts = {}
+        action_counts = {}
+        for f in facets:
+            entity_counts[f.entity_type] = entity_counts.get(f.entity_type, 0) + f.count
+            action_counts[f.action] = action_counts.get(f.action, 0) + f.count
+        entity_types = list(entity_counts)
+        actions = sorted(action_counts)
         roles = ['admin', 'resident', 'system']
-        return jsonify({'entity_types': entity_types, 'actions': actions, 'actor_roles': roles}), 200
+        return jsonify({
+            'entity_types': entity_types,
+            'actions': actions,
+            'actor_roles': roles,
+            'counts': {'entity_types': entity_counts, 'actions': action_counts},
+            'facets': [f.to_dict() for f in facets],
+        }), 200
     except Exception as e:
         return jsonify({'error': 'Failed to load audit meta', 'details': str(e)}), 500
 
@@ -2616,6 +2797,11 @@ def admin_export_entity(entity: str, fmt: str):
 @admin_bp.route('/cleanup', methods=['POST'])
 @jwt_required()
 def admin_cleanup():
+    """Purge (and optionally archive) old rows in batches.
+
+    Runs inline by default; with ``background: true`` the job is handed to the
+    cleanup worker and 202 is returned with the job for progress polling.
+    """
     try:
         municipality_id = require_admin_municipality()
         if isinstance(municipality_id, tuple):
@@ -2627,6 +2813,8 @@ def admin_cleanup():
         before = payload.get('before')
         if confirm != 'DELETE':
             return jsonify({'error': 'Confirmation required'}), 400
+        if entity not in CLEANUP_ENTITIES:
+            return jsonify({'error': 'Unsupported entity for cleanup'}), 400
 
         cutoff = None
         try:
@@ -2635,69 +2823,100 @@ def admin_cleanup():
         except Exception:
             cutoff = None
 
-        deleted = 0
-        archived_url = None
-
-        from pathlib import Path
-        base = Path(current_app.config.get('UPLOAD_FOLDER', 'uploads'))
-        out_dir = base / 'archives'
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        def _write_json(path, items):
-            import json
-            path.write_text(json.dumps(items, default=str, ensure_ascii=False, indent=2), encoding='utf-8')
-
-        if entity == 'announcements':
-            q = Announcement.query.filter(Announcement.municipality_id == municipality_id)
-            if cutoff:
-                q = q.filter(Announcement.created_at <= cutoff)
-            items = q.all()
-            if archive and items:
-                zpath = out_dir / f"announcements-{municipality_id}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
-                _write_json(zpath, [getattr(i,'to_dict',lambda: {})() if hasattr(i,'to_dict') else {'id': i.id, 'title': i.title} for i in items])
-                archived_url = str(zpath.relative_to(base)).replace('\\','/')
-            for i in items:
-                db.session.delete(i)
-            deleted = len(items)
-        elif entity == 'requests':
-            q = DocumentRequest.query.filter(DocumentRequest.municipality_id == municipality_id)
-            if cutoff:
-                q = q.filter(DocumentRequest.created_at <= cutoff)
-            items = q.all()
-            if archive and items:
-                zpath = out_dir / f"requests-{municipality_id}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
-                _write_json(zpath, [r.to_dict() for r in items])
-                archived_url = str(zpath.relative_to(base)).replace('\\','/')
-            for i in items:
-                db.session.delete(i)
-            deleted = len(items)
-        else:
-            return jsonify({'error': 'Unsupported entity for cleanup'}), 400
+        try:
+            actor_id = int(get_jwt_identity())
+        except (TypeError, ValueError):
+            actor_id = None
+        job = create_cleanup_job(municipality_id, entity, cutoff, archive, created_by=actor_id)
 
-        db.session.commit()
+        if payload.get('background') and start_cleanup_worker():
+            return jsonify({'job': job.to_dict()}), 202
+        if not claim_cleanup_job(job):
+            job = CleanupJob.query.get(job.id)
+            return jsonify({'error': 'Cleanup job was taken by the background worker', 'job': job.to_dict()}), 409
 
         try:
-            log_generic_action(
-                user_id=get_jwt_identity(),
-                municipality_id=municipality_id,
-                entity_type=entity,
-                entity_id=None,
-                action='cleanup_delete',
-                actor_role='admin',
-                old_values=None,
-                new_values={'deleted': deleted, 'before': before},
-                notes='Archive saved' if archived_url else None,
-            )
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
+            job = run_cleanup_job(job.id)
+        except Exception as e:
+            job = CleanupJob.query.get(job.id)
+            return jsonify({'error': 'Cleanup interrupted', 'details': str(e), 'job': job.to_dict() if job else None}), 500
 
-        return jsonify({'deleted_count': deleted, 'archived_url': archived_url}), 200
+        return jsonify({'deleted_count': job.deleted_count, 'archived_url': job.to_dict()['archived_url'], 'job': job.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to cleanup', 'details': str(e)}), 500
 
 
+@admin_bp.route('/cleanup/jobs', methods=['GET'])
+@jwt_required()
+def admin_list_cleanup_jobs():
+    try:
+        municipality_id = require_admin_municipality()
+        if isinstance(municipality_id, tuple):
+            return municipality_id
+        jobs = (
+            CleanupJob.query.filter(CleanupJob.municipality_id == municipality_id)
+            .order_by(CleanupJob.id.desc())
+            .limit(50)
+            .all()
+        )
+        return jsonify({'jobs': [j.to_dict() for j in jobs]}), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to list cleanup jobs', 'details': str(e)}), 500
+
+
+@admin_bp.route('/cleanup/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def admin_get_cleanup_job(job_id: int):
+    try:
+        municipality_id = require_admin_municipality()
+        if isinstance(municipality_id, tuple):
+            return municipality_id
+        job = CleanupJob.query.get(job_id)
+        if not job or job.municipality_id != municipality_id:
+            return jsonify({'error': 'Cleanup job not found'}), 404
+        return jsonify({'job': job.to_dict()}), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to get cleanup job', 'details': str(e)}), 500
+
+
+@admin_bp.route('/cleanup/jobs/<int:job_id>/resume', methods=['POST'])
+@jwt_required()
+def admin_resume_cleanup_job(job_id: int):
+    """Resume a failed or interrupted job from its last committed batch."""
+    try:
+        municipality_id = require_admin_municipality()
+        if isinstance(municipality_id, tuple):
+            return municipality_id
+        job = CleanupJob.query.get(job_id)
+        if not job or job.municipality_id != municipality_id:
+            return jsonify({'error': 'Cleanup job not found'}), 404
+        if job.status == 'completed':
+            return jsonify({'job': job.to_dict()}), 200
+        if cleanup_job_active(job):
+            return jsonify({'error': 'Cleanup job is already running', 'job': job.to_dict()}), 409
+        payload = request.get_json(silent=True) or {}
+        if payload.get('background'):
+            # The worker picks up pending and stale running jobs; only a failed one needs re-queueing
+            if job.status == 'failed':
+                claim_cleanup_job(job, status='pending')
+            if start_cleanup_worker():
+                return jsonify({'job': CleanupJob.query.get(job_id).to_dict()}), 202
+            job = CleanupJob.query.get(job_id)
+        if not claim_cleanup_job(job):
+            job = CleanupJob.query.get(job_id)
+            return jsonify({'error': 'Cleanup job is already running', 'job': job.to_dict()}), 409
+        try:
+            job = run_cleanup_job(job.id)
+        except Exception as e:
+            job = CleanupJob.query.get(job_id)
+            return jsonify({'error': 'Cleanup interrupted', 'details': str(e), 'job': job.to_dict() if job else None}), 500
+        return jsonify({'job': job.to_dict()}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to resume cleanup job', 'details': str(e)}), 500
+
+
 @admin_bp.route('/transactions/<int:tx_id>', methods=['GET'])
 @jwt_required()
 def admin_get_transaction(tx_id: int):
@@ -2740,7 +2959,8 @@ def admin_get_transaction(tx_id: int):
 
         audit = []
         try:
-            audit = [l.to_dict() for l in MarketplaceTransactionAuditLog.query.filter_by(transaction_id=tx.id).order_by(MarketplaceTransactionAuditLog.created_at.asc()).all()]
+            TxLog = audit_entity(MarketplaceTransactionAuditLog)
+            audit = [l.to_dict() for l in db.session.query(TxLog).filter(TxLog.transaction_id == tx.id).order_by(TxLog.created_at.asc()).all()]
         except Exception:
             audit = []
         return jsonify({'transaction': txd, 'audit': audit}), 200
@@ -2808,3 +3028,52 @@ def admin_update_transaction_status(tx_id: int):
         db.session.rollback()
         return jsonify({'error': 'Failed to update transaction status', 'details': str(e)}), 500
 
+
+@admin_bp.route('/system/rate-limits', methods=['GET'])
+@jwt_required()
+def admin_rate_limit_stats():
+    """Auth rate limiter counters (allowed/blocked attempts per scope) for monitoring."""
+    try:
+        from apps.api.utils.rate_limit import get_rate_limiter
+        return jsonify(get_rate_limiter().stats()), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to get rate limit stats', 'details': str(e)}), 500
+
+
+@admin_bp.route('/system/db-pool', methods=['GET'])
+@jwt_required()
+def admin_db_pool_status():
+    """DB connection pool usage in this worker (size, checked out, overflow, checkout wait, pings)."""
+    try:
+        from apps.api.utils.db_pool import pool_status
+        return jsonify(pool_status(db.engine, current_app.config.get('DB_POOL'))), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to get DB pool status', 'details': str(e)}), 500
+
+
+@admin_bp.route('/system/profiles', methods=['GET'])
+@jwt_required()
+def admin_list_profiles():
+    """Recently captured request profiles (see utils/profiler.py), newest first."""
+    try:
+        from apps.api.utils.profiler import list_profiles
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        return jsonify({'profiles': list_profiles(limit)}), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to list profiles', 'details': str(e)}), 500
+
+
+@admin_bp.route('/system/profiles/<string:name>', methods=['GET'])
+@jwt_required()
+def admin_download_profile(name: str):
+    """Download one profile (collapsed stacks or pstats dump)."""
+    try:
+        from flask import send_file
+        from apps.api.utils.profiler import profile_path
+        path = profile_path(name)
+        if not path:
+            return jsonify({'error': 'Profile not found'}), 404
+        mimetype = 'text/plain' if name.endswith('.folded') else 'application/octet-stream'
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=name)
+    except Exception as e:
+        return jsonify({'error': 'Failed to download profile', 'details': str(e)}), 500
@@ -7,13 +7,26 @@ import sqlite3
 try:
     from apps.api import db
     from apps.api.models.announcement import Announcement
+    from apps.api.utils.search_index import apply_text_search
+    from apps.api.utils.fieldsets import Derived, Fieldset, FieldsetError
 except ImportError:
     from __init__ import db
     from models.announcement import Announcement
+    from utils.search_index import apply_text_search
+    from utils.fieldsets import Derived, Fieldset, FieldsetError
 
 
 announcements_bp = Blueprint('announcements', __name__, url_prefix='/api/announcements')
 
+# ?fields= for GET /api/announcements: any Announcement.to_dict key
+ANNOUNCEMENT_FIELDS = Fieldset(Announcement, derived={
+    'municipality_name': Derived(lambda a: a.municipality.name if a.municipality else None,
+                                 relation='municipality', relation_columns=('name',)),
+    'creator_name': Derived(lambda a: f"{a.creator.first_name} {a.creator.last_name}" if a.creator else None,
+                            relation='creator', relation_columns=('first_name', 'last_name')),
+    'images': Derived(lambda a: a.images or [], columns=('images',)),
+})
+
 
 @announcements_bp.route('', methods=['GET'])
 def list_announcements():
@@ -22,6 +35,8 @@ def list_announcements():
     Query params:
       - municipality_id: int (optional)
       - active: bool (default true)
+      - q: keyword search over title/content (typo tolerant)
+      - fields: comma-separated keys to return (default: all)
       - page: int (default 1)
       - per_page: int (default 20)
     """
@@ -29,8 +44,10 @@ def list_announcements():
         municipality_id = request.args.get('municipality_id', type=int)
         active_param = request.args.get('active', 'true').lower()
         is_active = True if active_param in ['true', '1', 'yes'] else False if active_param in ['false', '0', 'no'] else True
+        q = (request.args.get('q') or '').strip()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        fields = ANNOUNCEMENT_FIELDS.parse(request.args.get('fields'))
 
         # Build filters
         filters = []
@@ -43,11 +60,17 @@ def list_announcements():
         if filters:
             query = query.filter(and_(*filters))
 
-        query = query.order_by(Announcement.created_at.desc())
+        query, ranked = apply_text_search(query, 'announcement', q, municipality_id=municipality_id)
+        if not ranked:
+            query = query.order_by(Announcement.created_at.desc())
+        if fields:
+            query = ANNOUNCEMENT_FIELDS.apply(query, fields)
         paginated = query.paginate(page=page, per_page=per_page, error_out=False)
 
         return jsonify({
-            'announcements': [a.to_dict() for a in paginated.items],
+            'announcements': [
+                ANNOUNCEMENT_FIELDS.render(a, fields) if fields else a.to_dict() for a in paginated.items
+            ],
             'count': len(paginated.items),
             'pagination': {
                 'page': page,
@@ -57,6 +80,8 @@ def list_announcements():
             }
         }), 200
 
+    except FieldsetError as e:
+        return jsonify({'error': 'Invalid fields', 'details': str(e)}), 400
     except (sqlite3.OperationalError, SAOperationalError, SAProgrammingError):
         # Likely missing table in SQLite; return safe empty shape instead of 500
         # Re-parse paging so we can respond consistently
@@ -38,6 +38,10 @@ try:
     from apps.api.models.token_blacklist import TokenBlacklist
 except ImportError:
     from models.token_blacklist import TokenBlacklist
+try:
+    from apps.api.db_routing import use_primary
+except ImportError:
+    from db_routing import use_primary
 try:
     from apps.api.utils import (
         validate_email,
@@ -65,6 +69,11 @@ except ImportError:
         save_verification_document,
     )
 
+try:
+    from apps.api.utils.rate_limit import check_rate_limits, reset_account_limit, rate_limited_response
+except ImportError:
+    from utils.rate_limit import check_rate_limits, reset_account_limit, rate_limited_response
+
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
@@ -74,6 +83,11 @@ def register():
     try:
         is_multipart = request.content_type and 'multipart/form-data' in request.content_type
         data = request.form.to_dict() if is_multipart else request.get_json()
+
+        # Throttle before any validation, DB lookup or password hashing
+        retry_after = check_rate_limits('register', (data or {}).get('email'))
+        if retry_after:
+            return rate_limited_response(retry_after)
         
         # Validate required fields
         required_fields = ['username', 'email', 'password', 'first_name', 'last_name', 'date_of_birth']
@@ -213,6 +227,11 @@ def login():
         
         if not username_or_email or not password:
             return jsonify({'error': 'Username/email and password are required'}), 400
+
+        # Throttle per IP and per account before the user lookup and bcrypt check
+        retry_after = check_rate_limits('login', username_or_email)
+        if retry_after:
+            return rate_limited_response(retry_after)
         
         # Find user by username or email (case-insensitive)
         ue = (username_or_email or '').lower()
@@ -235,6 +254,7 @@ def login():
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
+        reset_account_limit('login', username_or_email)
         
         # Create access and refresh tokens (subject must be a string) with role claim
         access_token = create_access_token(
@@ -248,7 +268,6 @@ def login():
             additional_claims={"role": user.role}
         )
         
-        from flask import jsonify
         resp = jsonify({
             'message': 'Login successful',
             'access_token': access_token,
@@ -440,7 +459,9 @@ def verify_email(token):
             uid = int(user_id) if isinstance(user_id, str) else user_id
         except Exception:
             uid = user_id
-        user = User.query.get(uid)
+        # The link is often opened right after register; the replica may not have the user yet
+        with use_primary():
+            user = User.query.get(uid)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -511,6 +532,10 @@ def resend_verification_email_public():
         if not email:
             return jsonify({'error': 'Email is required'}), 400
 
+        retry_after = check_rate_limits('resend_verification', email)
+        if retry_after:
+            return rate_limited_response(retry_after)
+
         user = User.query.filter_by(email=email).first()
         if not user:
             return jsonify({'message': 'If an account exists, a verification email has been sent'}), 200
@@ -211,7 +211,7 @@ def get_claim_ticket(request_id: int):
         # Build public URL to QR image if stored
         qr_url = None
         if r.qr_code:
-            qr_url = f"/uploads/{str(r.qr_code).replace('\\', '/')}"
+            qr_url = "/uploads/" + str(r.qr_code).replace('\\', '/')
         # Resolve names
         muni_name = getattr(getattr(r, 'municipality', None), 'name', None)
         doc_name = getattr(getattr(r, 'document_type', None), 'name', None)
@@ -257,7 +257,7 @@ def public_verify_document(request_number: str):
             'muni_name': muni_name,
             'doc_name': doc_name,
             'issued_at': issued_at,
-            'url': f"/uploads/{str(r.document_file).replace('\\', '/')}"
+            'url': "/uploads/" + str(r.document_file).replace('\\', '/')
         }), 200
     except Exception as e:
         return jsonify({'valid': False, 'error': str(e)}), 500
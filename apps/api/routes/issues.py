@@ -1,7 +1,7 @@
 """Public/resident Issue reporting routes."""
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 
 try:
     from apps.api import db
@@ -14,6 +14,12 @@ try:
         fully_verified_required,
         save_issue_attachment,
     )
+    from apps.api.utils.search_index import apply_text_search
+    from apps.api.utils.fieldsets import Derived, Fieldset, FieldsetError
+    from apps.api.utils.geo import (
+        GEOHASH_PRECISION, approx_distance, cover_bbox, decode_bounds, haversine_m, parse_bbox,
+        precision_for_zoom, prefix_filter, radius_bbox,
+    )
 except ImportError:
     from __init__ import db
     from models.issue import Issue, IssueCategory
@@ -25,10 +31,21 @@ except ImportError:
         fully_verified_required,
         save_issue_attachment,
     )
+    from utils.search_index import apply_text_search
+    from utils.fieldsets import Derived, Fieldset, FieldsetError
+    from utils.geo import (
+        GEOHASH_PRECISION, approx_distance, cover_bbox, decode_bounds, haversine_m, parse_bbox,
+        precision_for_zoom, prefix_filter, radius_bbox,
+    )
 
 
 issues_bp = Blueprint('issues', __name__, url_prefix='/api/issues')
 
+# ?fields= for GET /api/issues: any Issue.to_dict key
+ISSUE_FIELDS = Fieldset(Issue, hidden=('geohash',), derived={
+    'category': Derived(lambda issue: issue.category.to_dict() if issue.category else None, relation='category'),
+})
+
 
 @issues_bp.route('/categories', methods=['GET'])
 def list_categories():
@@ -46,8 +63,10 @@ def list_issues():
         municipality_id = request.args.get('municipality_id', type=int)
         status = request.args.get('status')
         category = request.args.get('category')
+        q = (request.args.get('q') or '').strip()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        fields = ISSUE_FIELDS.parse(request.args.get('fields'))
 
         query = Issue.query.filter_by(is_public=True)
         if municipality_id:
@@ -64,17 +83,24 @@ def list_issues():
                 if cat:
                     query = query.filter(Issue.category_id == cat.id)
 
-        # Manual pagination to avoid paginate() edge cases
-        total = query.count()
+        # Keyword search orders by relevance; otherwise newest first
+        query, ranked = apply_text_search(query, 'issue', q, municipality_id=municipality_id)
+        if not ranked:
+            query = query.order_by(Issue.created_at.desc())
+
+        # Manual pagination to avoid paginate() edge cases; count(id) lets the
+        # planner answer from an index instead of a full-row subquery
+        total = query.order_by(None).with_entities(func.count(Issue.id)).scalar()
+        if fields:
+            query = ISSUE_FIELDS.apply(query, fields)
         items = (
-            query.order_by(Issue.created_at.desc())
-                 .limit(per_page)
+            query.limit(per_page)
                  .offset((page - 1) * per_page)
                  .all()
         )
         pages = (total + per_page - 1) // per_page if per_page else 1
         return jsonify({
-            'issues': [i.to_dict() for i in items],
+            'issues': [ISSUE_FIELDS.render(i, fields) if fields else i.to_dict() for i in items],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -82,10 +108,145 @@ def list_issues():
                 'pages': pages,
             }
         }), 200
+    except FieldsetError as e:
+        return jsonify({'error': 'Invalid fields', 'details': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get issues', 'details': str(e)}), 500
 
 
+MAX_NEARBY_RADIUS_M = 50000
+NEARBY_CANDIDATE_LIMIT = 2000
+
+
+def _apply_public_issue_filters(query):
+    """Shared status/category/municipality filters for the map endpoints."""
+    query = query.filter(Issue.is_public == True, Issue.geohash.isnot(None))
+    municipality_id = request.args.get('municipality_id', type=int)
+    status = request.args.get('status')
+    category = request.args.get('category')
+    if municipality_id:
+        query = query.filter(Issue.municipality_id == municipality_id)
+    if status:
+        query = query.filter(Issue.status == status)
+    if category:
+        try:
+            query = query.filter(Issue.category_id == int(category))
+        except (TypeError, ValueError):
+            cat = IssueCategory.query.filter(or_(IssueCategory.slug == category, IssueCategory.name == category)).first()
+            query = query.filter(Issue.category_id == (cat.id if cat else -1))
+    return query
+
+
+def _within_bbox(query, bbox, max_precision=GEOHASH_PRECISION):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return query.filter(
+        prefix_filter(Issue.geohash, cover_bbox(*bbox, max_precision=max_precision)),
+        Issue.latitude.between(min_lat, max_lat),
+        Issue.longitude.between(min_lon, max_lon),
+    )
+
+
+@issues_bp.route('/nearby', methods=['GET'])
+def nearby_issues():
+    """Public issues within ``radius`` meters of ``lat``/``lng`` (nearest first),
+    or inside ``bbox=minLng,minLat,maxLng,maxLat`` (newest first)."""
+    try:
+        limit = max(1, min(request.args.get('limit', 50, type=int) or 50, 200))
+        try:
+            bbox = parse_bbox(request.args.get('bbox'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid bbox', 'details': str(e)}), 400
+
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        radius = None
+        if bbox is None:
+            if lat is None or lng is None:
+                return jsonify({'error': 'lat and lng (or bbox) are required'}), 400
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                return jsonify({'error': 'lat/lng out of range'}), 400
+            radius = max(1.0, min(request.args.get('radius', 1000, type=float) or 1000, MAX_NEARBY_RADIUS_M))
+            bbox = radius_bbox(lat, lng, radius)
+
+        query = _within_bbox(_apply_public_issue_filters(Issue.query), bbox)
+        if radius is None:
+            issues = query.order_by(Issue.created_at.desc()).limit(limit).all()
+            return jsonify({
+                'issues': [i.to_dict() for i in issues],
+                'count': len(issues),
+                'bbox': [bbox[1], bbox[0], bbox[3], bbox[2]],
+            }), 200
+
+        hits = []
+        # Nearest candidates first, so the cap drops the farthest rows rather than arbitrary ones
+        nearest = query.order_by(approx_distance(Issue.latitude, Issue.longitude, lat, lng), Issue.id)
+        for issue in nearest.limit(NEARBY_CANDIDATE_LIMIT).all():
+            distance = haversine_m(lat, lng, issue.latitude, issue.longitude)
+            if distance <= radius:
+                hits.append((distance, issue))
+        hits.sort(key=lambda h: h[0])
+        data = []
+        for distance, issue in hits[:limit]:
+            d = issue.to_dict()
+            d['distance_m'] = round(distance, 1)
+            data.append(d)
+        return jsonify({
+            'issues': data,
+            'count': len(data),
+            'center': {'lat': lat, 'lng': lng},
+            'radius_m': radius,
+        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to get nearby issues', 'details': str(e)}), 500
+
+
+@issues_bp.route('/clusters', methods=['GET'])
+def issue_clusters():
+    """Server-side map clusters: public issues in ``bbox`` grouped by a geohash
+    prefix sized for ``zoom`` (0-22)."""
+    try:
+        try:
+            bbox = parse_bbox(request.args.get('bbox'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid bbox', 'details': str(e)}), 400
+        if bbox is None:
+            return jsonify({'error': 'bbox is required (minLng,minLat,maxLng,maxLat)'}), 400
+        zoom = max(0, min(request.args.get('zoom', 12, type=int) or 0, 22))
+        precision = precision_for_zoom(zoom)
+
+        cell = func.substr(Issue.geohash, 1, precision)
+        query = db.session.query(
+            cell.label('cell'),
+            func.count(Issue.id).label('count'),
+            func.avg(Issue.latitude).label('lat'),
+            func.avg(Issue.longitude).label('lng'),
+            func.min(Issue.id).label('first_id'),
+        )
+        query = _within_bbox(_apply_public_issue_filters(query), bbox, max_precision=precision)
+        rows = query.group_by(cell).all()
+
+        clusters = []
+        for row in rows:
+            min_lat, min_lon, max_lat, max_lon = decode_bounds(row.cell)
+            clusters.append({
+                'geohash': row.cell,
+                'count': row.count,
+                'latitude': row.lat,
+                'longitude': row.lng,
+                'bounds': [min_lon, min_lat, max_lon, max_lat],
+                'issue_id': row.first_id if row.count == 1 else None,
+            })
+        clusters.sort(key=lambda c: c['count'], reverse=True)
+        return jsonify({
+            'clusters': clusters,
+            'total': sum(c['count'] for c in clusters),
+            'zoom': zoom,
+            'precision': precision,
+        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to get issue clusters', 'details': str(e)}), 500
+
+
 @issues_bp.route('/<int:issue_id>', methods=['GET'])
 def get_issue(issue_id: int):
     """Public issue detail if issue is public; otherwise 404."""
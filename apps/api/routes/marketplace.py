@@ -1,12 +1,13 @@
 """Marketplace routes for items, transactions, and messages."""
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timezone, timedelta
 import sqlite3
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import OperationalError as SAOperationalError, ProgrammingError as SAProgrammingError
 from apps.api import db
 from apps.api.models.user import User
-from apps.api.models.marketplace import Item, Transaction, Message
+from apps.api.models.marketplace import Item, Transaction, Message, TransactionAuditLog
 from apps.api.models.municipality import Municipality
 from apps.api.utils import (
     verified_resident_required,
@@ -23,10 +24,38 @@ from apps.api.utils import (
     TransitionError,
 )
 from apps.api.utils.file_handler import save_marketplace_image
+from apps.api.utils.item_search import apply_item_search
+from apps.api.utils.audit_partitions import audit_entity
+from apps.api.utils.fieldsets import Derived, Fieldset, FieldsetError
+from apps.api.utils.view_counter import pending_views, record_view
+from apps.api.utils.feed_cache import feed_key, get_cache as get_feed_cache
 
 marketplace_bp = Blueprint('marketplace', __name__, url_prefix='/api/marketplace')
 
 
+def _seller(item):
+    user = item.user
+    if user is None:
+        return None
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'username': user.username,
+        'email': user.email,
+    }
+
+
+# ?fields= for GET /items: any to_dict key plus the list-only extras
+ITEM_FIELDS = Fieldset(Item, hidden=('completed_at',), derived={
+    'seller': Derived(_seller, relation='user',
+                      relation_columns=('id', 'first_name', 'last_name', 'username', 'email')),
+    'user': Derived(lambda item: item.user.to_dict() if item.user else None, relation='user'),
+    'municipality_name': Derived(lambda item: item.municipality.name if item.municipality else None,
+                                 relation='municipality', relation_columns=('name',)),
+})
+
+
 @marketplace_bp.route('/items', methods=['GET'])
 def list_items():
     """Get list of marketplace items with optional filters."""
@@ -36,8 +65,20 @@ def list_items():
         category = request.args.get('category')
         transaction_type = request.args.get('transaction_type')
         status = request.args.get('status', 'available')
+        q = (request.args.get('q') or '').strip()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        fields = ITEM_FIELDS.parse(request.args.get('fields'))
+        
+        # Default browse pages are served pre-serialized from the feed cache
+        cache_key = feed_key(request.args)
+        if cache_key is not None:
+            feed_cache = get_feed_cache()
+            body = feed_cache.get(cache_key)
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json', headers={'X-Feed-Cache': 'hit'})
+            # Read before querying: a commit invalidating this page meanwhile makes put() skip it
+            generation = feed_cache.generation
         
         # Build query
         query = Item.query.filter_by(is_active=True)
@@ -54,8 +95,15 @@ def list_items():
         if status:
             query = query.filter_by(status=status)
         
-        # Order by most recent
-        query = query.order_by(Item.created_at.desc())
+        # Full-text search ranks by relevance; otherwise most recent first
+        query, ranked = apply_item_search(query, q)
+        if not ranked:
+            query = query.order_by(Item.created_at.desc())
+        if fields:
+            # Only SELECT the columns (and joins) the requested fields need
+            query = ITEM_FIELDS.apply(query, fields)
+        else:
+            query = query.options(joinedload(Item.user), joinedload(Item.municipality))
         
         # Paginate
         paginated = query.paginate(page=page, per_page=per_page, error_out=False)
@@ -63,6 +111,9 @@ def list_items():
         # Include municipality_name for each item
         items_data = []
         for item in paginated.items:
+            if fields:
+                items_data.append(ITEM_FIELDS.render(item, fields))
+                continue
             d = item.to_dict(include_user=True)
             try:
                 d['municipality_name'] = item.municipality.name if item.municipality else None
@@ -70,14 +121,21 @@ def list_items():
                 d['municipality_name'] = None
             items_data.append(d)
 
-        return jsonify({
+        payload = {
             'items': items_data,
             'total': paginated.total,
             'page': page,
             'per_page': per_page,
             'pages': paginated.pages
-        }), 200
+        }
+        if cache_key is not None:
+            body = current_app.json.dumps(payload)
+            feed_cache.put(cache_key, body, generation=generation)
+            return current_app.response_class(body, mimetype='application/json', headers={'X-Feed-Cache': 'miss'})
+        return jsonify(payload), 200
     
+    except FieldsetError as e:
+        return jsonify({'error': 'Invalid fields', 'details': str(e)}), 400
     except (sqlite3.OperationalError, SAOperationalError, SAProgrammingError):
         # SQLite missing table/column; return empty consistent shape
         return jsonify({
@@ -103,11 +161,12 @@ def get_item(item_id):
         if not item.is_active:
             return jsonify({'error': 'Item is no longer available'}), 404
         
-        # Increment view count
-        item.view_count += 1
-        db.session.commit()
+        # Views are coalesced and flushed in batches; this request stays read-only
+        record_view(item.id)
+        data = item.to_dict(include_user=True)
+        data['view_count'] = (item.view_count or 0) + pending_views(item.id)
         
-        return jsonify(item.to_dict(include_user=True)), 200
+        return jsonify(data), 200
     
     except Exception as e:
         return jsonify({'error': 'Failed to get item', 'details': str(e)}), 500
@@ -698,9 +757,8 @@ def tx_handover_seller(transaction_id: int):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Handover marked by seller', 'transaction': tx.to_dict()}), 200
     except TransitionError as e:
         return jsonify({'error': str(e)}), 400
@@ -740,9 +798,8 @@ def tx_handover_buyer(transaction_id: int):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Buyer confirmed receipt', 'transaction': tx.to_dict()}), 200
     except TransitionError as e:
         return jsonify({'error': str(e)}), 400
@@ -783,9 +840,8 @@ def tx_return_buyer(transaction_id: int):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Return marked by buyer', 'transaction': tx.to_dict()}), 200
     except TransitionError as e:
         return jsonify({'error': str(e)}), 400
@@ -834,9 +890,8 @@ def tx_return_seller(transaction_id: int):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Return confirmed by seller', 'transaction': tx.to_dict()}), 200
     except TransitionError as e:
         return jsonify({'error': str(e)}), 400
@@ -885,9 +940,8 @@ def tx_complete(transaction_id: int):
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Transaction completed', 'transaction': tx.to_dict()}), 200
     except TransitionError as e:
         return jsonify({'error': str(e)}), 400
@@ -936,9 +990,8 @@ def tx_dispute(transaction_id: int):
                     'reported_user_id': (reported_user_id if reported_user_id in (tx.buyer_id, tx.seller_id) else (tx.seller_id if int(user_id) == int(tx.buyer_id) else tx.buyer_id))
                 },
             )
-            db.session.commit()
         except Exception:
-            db.session.rollback()
+            pass
         return jsonify({'message': 'Transaction disputed', 'transaction': tx.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -970,8 +1023,9 @@ def tx_audit(transaction_id: int):
             except Exception:
                 return jsonify({'error': 'Forbidden'}), 403
 
-        # Sort by created_at ascending
-        logs = [l.to_dict() for l in sorted(tx.audit_logs, key=lambda x: x.created_at or datetime.utcnow())]
+        # Sort by created_at ascending (month partitions included)
+        TxLog = audit_entity(TransactionAuditLog)
+        logs = [l.to_dict() for l in db.session.query(TxLog).filter(TxLog.transaction_id == tx.id).order_by(TxLog.created_at.asc()).all()]
         return jsonify({'transaction': tx.to_dict(), 'audit': logs}), 200
     except Exception as e:
         return jsonify({'error': 'Failed to get audit timeline', 'details': str(e)}), 500
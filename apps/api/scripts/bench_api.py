@@ -0,0 +1,256 @@
+"""
+Benchmark the API hot paths on a synthetic Region III dataset.
+
+Seeds a scratch database with scripts/bench_dataset.py at the chosen scale,
+then times each case in-process (Flask test client, no network):
+
+  list_items                      GET  /api/marketplace/items (feed cache off)
+  list_issues                     GET  /api/issues?municipality_id=<admin's>
+  get_document_requests           GET  /api/admin/documents/requests
+  admin_municipality_performance  GET  /api/admin/municipalities/performance
+  login                           POST /api/auth/login (one bcrypt check)
+  generate_document_pdf           one document request PDF
+  generate_table_pdf              requests export report as PDF (--export-rows rows)
+  generate_workbook               same report as an .xlsx workbook, saved in memory
+
+Results (p50/p95/mean/min/max per case plus the git commit, scale and
+database) are written with --json; pass an earlier file to --compare to see
+the change per case and, with --fail-on-regression, exit non-zero when a p50
+got slower than --threshold.
+
+Usage:
+  python apps/api/scripts/bench_api.py --scale tiny
+  python apps/api/scripts/bench_api.py --scale small --repeat 30 --json bench-$(git rev-parse --short HEAD).json
+  python apps/api/scripts/bench_api.py --json new.json --compare base.json --threshold 0.15 --fail-on-regression
+  python apps/api/scripts/bench_api.py --case list_items --case login --items 200000
+
+Never point --database-url at a real database: tables are dropped first.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import Config
+from apps.api.models.document import DocumentRequest
+from apps.api.models.municipality import Municipality
+from apps.api.models.user import User
+from apps.api.scripts.bench_dataset import add_scale_arguments, scale_from_args, seed_region
+
+
+CASES = (
+    'list_items', 'list_issues', 'get_document_requests', 'admin_municipality_performance', 'login',
+    'generate_document_pdf', 'generate_table_pdf', 'generate_workbook',
+)
+
+
+def bench_config(database_url, upload_folder):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+        SQLALCHEMY_ECHO = False
+        UPLOAD_FOLDER = Path(upload_folder)
+        RATE_LIMIT_ENABLED = False  # login is timed repeatedly
+        FEED_CACHE_ENABLED = False  # time the query path, not the cache
+        EMAIL_OUTBOX_WORKER = False
+        CLEANUP_WORKER = False
+        VIEW_COUNT_WORKER = False
+        PROFILER_ENABLED = False
+        SLOW_QUERY_MS = None
+    return BenchConfig
+
+
+def _expect(resp, status=200):
+    if resp.status_code != status:
+        raise RuntimeError(f'{resp.request.path} returned {resp.status_code}: {resp.get_data(as_text=True)[:200]}')
+    return resp
+
+
+def build_cases(app, summary, export_rows=1000):
+    """Map case name -> zero-argument callable, run inside an app context."""
+    client = app.test_client()
+    muni_id = summary['admin_municipality_id']
+    admin = User.query.filter_by(username=summary['admin_username']).one()
+    token = create_access_token(identity=str(admin.id), additional_claims={'role': admin.role})
+    auth = {'Authorization': f'Bearer {token}'}
+    login_body = {'username': summary['resident_username'], 'password': summary['password']}
+
+    def document_pdf():
+        from apps.api.utils.pdf_generator import generate_document_pdf
+        req = DocumentRequest.query.filter_by(municipality_id=muni_id).first()
+        generate_document_pdf(req, req.document_type, req.user, admin_user=admin)
+
+    def export_rows_for_admin():
+        rows = (db.session.query(DocumentRequest, User)
+                .join(User, DocumentRequest.user_id == User.id)
+                .filter(DocumentRequest.municipality_id == muni_id)
+                .order_by(DocumentRequest.created_at.desc())
+                .limit(export_rows).all())
+        return [[r.id, r.request_number, f'{u.first_name} {u.last_name}', r.document_type_id, r.status,
+                 r.created_at.isoformat()[:19].replace('T', ' ')] for r, u in rows]
+
+    headers = ['ID', 'Req No', 'User', 'Type', 'Status', 'Created']
+    municipality_name = db.session.get(Municipality, muni_id).name
+    out_dir = Path(app.config['UPLOAD_FOLDER']) / 'exports' / 'bench'
+
+    def table_pdf():
+        from apps.api.utils.pdf_table_report import generate_table_pdf
+        generate_table_pdf(out_path=out_dir / 'requests.pdf', title=f'{municipality_name} – Requests Report',
+                           municipality_name=municipality_name, headers=headers, rows=export_rows_for_admin())
+
+    def workbook():
+        from apps.api.utils.excel_generator import generate_workbook
+        wb = generate_workbook({'Requests': {
+            'headers': headers, 'rows': export_rows_for_admin(), 'municipality_name': municipality_name,
+            'title': f'{municipality_name} – Requests Report',
+            'gov_lines': ['Republic of the Philippines', f'Municipality of {municipality_name}'],
+        }})
+        wb.save(io.BytesIO())
+
+    return {
+        'list_items': lambda: _expect(client.get('/api/marketplace/items')),
+        'list_issues': lambda: _expect(client.get('/api/issues', query_string={'municipality_id': muni_id})),
+        'get_document_requests': lambda: _expect(client.get('/api/admin/documents/requests', headers=auth)),
+        'admin_municipality_performance': lambda: _expect(
+            client.get('/api/admin/municipalities/performance', headers=auth)),
+        'login': lambda: _expect(client.post('/api/auth/login', json=login_body)),
+        'generate_document_pdf': document_pdf,
+        'generate_table_pdf': table_pdf,
+        'generate_workbook': workbook,
+    }
+
+
+def time_case(fn, repeat, warmup):
+    # Admin routes print debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+            db.session.remove()
+    samples.sort()
+    return {
+        'runs': len(samples),
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+def run(app, summary, cases=CASES, repeat=10, warmup=2, export_rows=1000):
+    """Time the selected cases; returns ``{case: stats}``."""
+    results = {}
+    with app.app_context():
+        available = build_cases(app, summary, export_rows=export_rows)
+        for name in cases:
+            results[name] = time_case(available[name], repeat, warmup)
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print p50 changes against a baseline; returns the regressed case names."""
+    regressions = []
+    print(f"\n{'case':<32}{'base p50':>12}{'p50':>12}{'change':>10}")
+    for name, stats in current['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            print(f'{name:<32}{"-":>12}{stats["p50_ms"]:>12}{"new":>10}')
+            continue
+        change = (stats['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0.0
+        flag = '  REGRESSION' if change > threshold else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<32}{base['p50_ms']:>12}{stats['p50_ms']:>12}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--case', action='append', choices=CASES, help='Run only these cases (repeatable)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--export-rows', type=int, default=1000, help='Rows in the PDF/xlsx report cases')
+    parser.add_argument('--database-url', help='Scratch database (default: temporary SQLite file)')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Earlier --json results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p50 slowdown counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='munlink-bench-')
+    url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    app = create_app(bench_config(url, os.path.join(tmpdir, 'uploads')))
+    try:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            summary = seed_region(scale_from_args(args), seed=args.seed)
+        print(f"Seeded {args.scale} dataset in {summary['load_s']}s: {summary['counts']}")
+
+        cases = run(app, summary, cases=args.case or CASES, repeat=args.repeat, warmup=args.warmup,
+                    export_rows=args.export_rows)
+        print(f"\n{'case':<32}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'max ms':>10}")
+        for name, stats in cases.items():
+            print(f"{name:<32}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['mean_ms']:>10}{stats['max_ms']:>10}")
+
+        results = {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': url.split(':', 1)[0],
+            'scale': args.scale,
+            'counts': summary['counts'],
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'cases': cases,
+        }
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as fh:
+                json.dump(results, fh, indent=2)
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as fh:
+                regressions = compare(results, json.load(fh), args.threshold)
+            if regressions and args.fail_on_regression:
+                return 1
+    finally:
+        if args.database_url:
+            with app.app_context():
+                db.session.remove()
+                db.drop_all()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,283 @@
+"""
+Synthetic Region III dataset for benchmarks and load tests.
+
+seed_region() fills an empty database with the seven Region III provinces,
+municipalities and barangays, residents and one municipal admin per
+municipality, plus
+marketplace items and transactions, issues, document requests and audit
+logs. Rows are bulk-inserted with Core and a fixed random seed, so the same
+scale and seed always produce the same data.
+
+Every seeded account shares BENCH_PASSWORD. Admins are ``admin<municipality id>``,
+residents ``resident<N>``; every fifth resident (N % 5 == 0) is not yet
+admin-verified, the rest can file issues and document requests.
+
+Usage (standalone, e.g. to prepare a database for scripts/load_test.py):
+  python apps/api/scripts/bench_dataset.py --scale small --database-url sqlite:////tmp/munlink-bench.db
+  python apps/api/scripts/bench_dataset.py --scale medium --issues 500000 --database-url postgresql://...
+
+Never point --database-url at a real database: tables are dropped first.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+import bcrypt
+from sqlalchemy import insert, text
+
+from apps.api import db
+from apps.api.models.audit import AuditLog
+from apps.api.models.document import DocumentRequest, DocumentType
+from apps.api.models.issue import Issue, IssueCategory
+from apps.api.models.marketplace import Item, Transaction
+from apps.api.models.municipality import Barangay, Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.geo import encode as geohash_encode
+
+
+BENCH_PASSWORD = 'bench-pass-2026'
+BARANGAYS_PER_MUNICIPALITY = 5
+
+# Rows per table; --<table> flags override individual counts
+SCALES = {
+    'tiny': {'municipalities': 7, 'users': 200, 'items': 300, 'issues': 300, 'document_requests': 300,
+             'transactions': 100, 'audit_logs': 500},
+    'small': {'municipalities': 28, 'users': 5_000, 'items': 10_000, 'issues': 10_000,
+              'document_requests': 10_000, 'transactions': 3_000, 'audit_logs': 20_000},
+    'medium': {'municipalities': 70, 'users': 50_000, 'items': 100_000, 'issues': 100_000,
+               'document_requests': 100_000, 'transactions': 30_000, 'audit_logs': 250_000},
+    'large': {'municipalities': 130, 'users': 250_000, 'items': 1_000_000, 'issues': 500_000,
+              'document_requests': 500_000, 'transactions': 200_000, 'audit_logs': 2_000_000},
+}
+
+PROVINCES = ['Aurora', 'Bataan', 'Bulacan', 'Nueva Ecija', 'Pampanga', 'Tarlac', 'Zambales']
+TOWNS = ['San Jose', 'San Luis', 'Santa Rosa', 'Santa Cruz', 'San Miguel', 'Santo Tomas', 'Concepcion',
+         'Mabalacat', 'Orion', 'Iba', 'Baler', 'Malolos', 'Guagua', 'Capas', 'Dinalupihan', 'Gapan',
+         'Hagonoy', 'Masinloc', 'Dingalan', 'Paniqui']
+ITEM_NOUNS = ['electric fan', 'rice cooker', 'bisikleta', 'laptop', 'study table', 'school uniform',
+              'sewing machine', 'water dispenser', 'guitar', 'textbook', 'stroller', 'kalan']
+ITEM_CATEGORIES = ['electronics', 'furniture', 'clothing', 'books', 'appliances', 'sports', 'others']
+ITEM_STATUSES = ['available'] * 6 + ['pending', 'reserved', 'completed', 'rejected']
+ISSUE_CATEGORIES = [('Roads', 'roads'), ('Streetlights', 'streetlights'), ('Flooding', 'flooding'),
+                    ('Garbage', 'garbage'), ('Water Supply', 'water-supply')]
+ISSUE_STATUSES = ['submitted', 'submitted', 'under_review', 'in_progress', 'resolved', 'closed']
+DOC_TYPES = [('Barangay Clearance', 'BRGY-CLR', 'barangay'), ('Certificate of Residency', 'residency', 'barangay'),
+             ('Business Permit', 'BUS-PERMIT', 'municipal'), ('Certificate of Indigency', 'indigency', 'barangay')]
+DOC_STATUSES = ['pending', 'pending', 'processing', 'ready', 'completed', 'rejected']
+AUDIT_ENTITIES = ['document_request', 'issue', 'item', 'announcement', 'user', 'transaction']
+AUDIT_ACTIONS = ['create', 'update', 'status_processing', 'status_ready', 'delete']
+
+
+def resolve_scale(name='small', **overrides):
+    counts = dict(SCALES[name])
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return counts
+
+
+def admin_usernames(counts):
+    return [f'admin{i}' for i in range(1, counts['municipalities'] + 1)]
+
+
+def verified_resident_usernames(counts, limit=None):
+    names = (f'resident{i}' for i in range(counts['users']) if i % 5 != 0)
+    return [name for _, name in zip(range(limit or counts['users']), names)]
+
+
+def _batched(conn, model, rows, batch):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch:
+            conn.execute(insert(model), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(insert(model), chunk)
+
+
+def seed_region(counts, seed=3, batch=5_000, now=None):
+    """Insert the dataset into the current app's (empty) database.
+
+    Returns a summary with row counts and the credentials used by the
+    benchmarks: ``admin_username``, ``admin_municipality_id`` and
+    ``resident_username``.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    started = time.perf_counter()
+    span = timedelta(days=365).total_seconds()
+
+    def recent():
+        return now - timedelta(seconds=rng.random() * span)
+
+    provinces = [Province(name=name, slug=name.lower().replace(' ', '-'), psgc_code=f'03{i:02d}')
+                 for i, name in enumerate(PROVINCES, start=1)]
+    db.session.add_all(provinces)
+    db.session.flush()
+    municipalities = []
+    for i in range(counts['municipalities']):
+        province = provinces[i % len(provinces)]
+        name = f'{TOWNS[i % len(TOWNS)]} {province.name}' + (f' {i // len(TOWNS)}' if i >= len(TOWNS) else '')
+        municipalities.append(Municipality(name=name, slug=name.lower().replace(' ', '-'),
+                                           psgc_code=f'03{i:06d}', province_id=province.id))
+    db.session.add_all(municipalities)
+    db.session.flush()
+    barangays = [Barangay(name=f'Poblacion {b}', slug=f'poblacion-{b}', municipality_id=m.id,
+                          psgc_code=f'03{m.id:06d}{b:03d}')
+                 for m in municipalities for b in range(1, BARANGAYS_PER_MUNICIPALITY + 1)]
+    db.session.add_all(barangays)
+    db.session.add_all([IssueCategory(name=name, slug=slug) for name, slug in ISSUE_CATEGORIES])
+    db.session.add_all([DocumentType(name=name, code=code, authority_level=level) for name, code, level in DOC_TYPES])
+    db.session.commit()
+
+    muni_ids = [m.id for m in municipalities]
+    barangays_by_muni = {}
+    for b in barangays:
+        barangays_by_muni.setdefault(b.municipality_id, []).append(b.id)
+    category_ids = [c.id for c in IssueCategory.query.all()]
+    doc_type_ids = [d.id for d in DocumentType.query.all()]
+    # One bcrypt hash for everyone keeps seeding fast; login still pays the full check
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    conn = db.session.connection()
+
+    _batched(conn, User, ({
+        'username': f'admin{m.id}', 'email': f'admin{m.id}@bench.example.com',
+        'password_hash': password_hash, 'first_name': 'Admin', 'last_name': m.name[:50],
+        'role': 'municipal_admin', 'admin_municipality_id': m.id, 'municipality_id': m.id,
+        'email_verified': True, 'admin_verified': True, 'is_active': True, 'created_at': recent(),
+    } for m in municipalities), batch)
+    first_resident = len(municipalities) + 1
+    user_muni = [rng.choice(muni_ids) for _ in range(counts['users'])]
+    _batched(conn, User, ({
+        'username': f'resident{i}', 'email': f'resident{i}@bench.example.com', 'password_hash': password_hash,
+        'first_name': 'Juan', 'last_name': f'Dela Cruz {i}', 'role': 'resident', 'municipality_id': user_muni[i],
+        'barangay_id': rng.choice(barangays_by_muni[user_muni[i]]),
+        'email_verified': True, 'admin_verified': i % 5 != 0, 'is_active': True, 'created_at': recent(),
+    } for i in range(counts['users'])), batch)
+
+    def resident():
+        i = rng.randrange(counts['users'])
+        return first_resident + i, user_muni[i]
+
+    def item_row(i):
+        user_id, muni_id = resident()
+        ts = recent()
+        noun = rng.choice(ITEM_NOUNS)
+        return {
+            'user_id': user_id, 'municipality_id': muni_id, 'title': f'{noun.title()} #{i}',
+            'description': f'Slightly used {noun}, pickup sa plaza.', 'category': rng.choice(ITEM_CATEGORIES),
+            'condition': rng.choice(['new', 'like_new', 'good', 'fair']),
+            'transaction_type': rng.choice(['sell', 'donate', 'lend']), 'price': rng.randint(100, 20_000),
+            'status': rng.choice(ITEM_STATUSES), 'is_active': rng.random() < 0.95, 'view_count': rng.randint(0, 500),
+            'created_at': ts, 'updated_at': ts,
+        }
+
+    def issue_row(i):
+        user_id, muni_id = resident()
+        ts = recent()
+        lat, lon = 14.8 + rng.random() * 1.2, 120.2 + rng.random() * 1.0
+        return {
+            'issue_number': f'ISS-BENCH-{i:07d}', 'user_id': user_id, 'category_id': rng.choice(category_ids),
+            'municipality_id': muni_id, 'title': f'Reported problem #{i}', 'description': 'Madilim ang kanto tuwing gabi.',
+            'status': rng.choice(ISSUE_STATUSES), 'is_public': rng.random() < 0.85,
+            'latitude': lat, 'longitude': lon, 'geohash': geohash_encode(lat, lon),
+            'created_at': ts, 'updated_at': ts,
+        }
+
+    def document_row(i):
+        user_id, muni_id = resident()
+        ts = recent()
+        return {
+            'request_number': f'DOC-BENCH-{i:07d}', 'user_id': user_id, 'document_type_id': rng.choice(doc_type_ids),
+            'municipality_id': muni_id, 'delivery_method': rng.choice(['digital', 'physical']),
+            'purpose': rng.choice(['Employment requirement', 'Scholarship', 'Bank account opening']),
+            'status': rng.choice(DOC_STATUSES), 'created_at': ts, 'updated_at': ts,
+        }
+
+    def transaction_row(i):
+        buyer_id, _ = resident()
+        seller_id, _ = resident()
+        return {
+            'item_id': 1 + rng.randrange(max(counts['items'], 1)), 'buyer_id': buyer_id, 'seller_id': seller_id,
+            'transaction_type': rng.choice(['sell', 'donate', 'lend']),
+            'status': rng.choice(['pending', 'accepted', 'completed', 'cancelled', 'disputed']),
+            'created_at': recent(),
+        }
+
+    def audit_row(i):
+        user_id, muni_id = resident()
+        return {
+            'user_id': user_id, 'municipality_id': muni_id, 'entity_type': rng.choice(AUDIT_ENTITIES),
+            'entity_id': rng.randint(1, 100_000), 'action': rng.choice(AUDIT_ACTIONS),
+            'actor_role': rng.choice(['admin', 'resident', 'system']),
+            'new_values': {'status': rng.choice(DOC_STATUSES)}, 'created_at': recent(),
+        }
+
+    _batched(conn, Item, (item_row(i) for i in range(counts['items'])), batch)
+    _batched(conn, Issue, (issue_row(i) for i in range(counts['issues'])), batch)
+    _batched(conn, DocumentRequest, (document_row(i) for i in range(counts['document_requests'])), batch)
+    if counts['items']:
+        _batched(conn, Transaction, (transaction_row(i) for i in range(counts['transactions'])), batch)
+    _batched(conn, AuditLog, (audit_row(i) for i in range(counts['audit_logs'])), batch)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+    busiest = Counter(user_muni).most_common(1)[0][0] if user_muni else muni_ids[0]
+    admin = User.query.filter_by(role='municipal_admin', admin_municipality_id=busiest).first()
+    return {
+        'counts': counts,
+        'seed': seed,
+        'load_s': round(time.perf_counter() - started, 2),
+        'admin_username': admin.username,
+        'admin_municipality_id': busiest,
+        'resident_username': f'resident{user_muni.index(busiest)}' if user_muni else admin.username,
+        'password': BENCH_PASSWORD,
+    }
+
+
+def add_scale_arguments(parser):
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for table in SCALES['small']:
+        parser.add_argument(f"--{table.replace('_', '-')}", dest=table, type=int,
+                            help=f'Override the number of {table.replace("_", " ")}')
+    parser.add_argument('--seed', type=int, default=3)
+
+
+def scale_from_args(args):
+    return resolve_scale(args.scale, **{table: getattr(args, table) for table in SCALES['small']})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--database-url', required=True, help='Scratch database to (re)create')
+    args = parser.parse_args()
+
+    from apps.api.app import create_app
+    from apps.api.config import Config
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+        SQLALCHEMY_ECHO = False
+        EMAIL_OUTBOX_WORKER = False
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        summary = seed_region(scale_from_args(args), seed=args.seed)
+    print(f"Seeded {args.scale} dataset in {summary['load_s']}s: {summary['counts']}")
+    print(f"Admin login: {summary['admin_username']} / {summary['password']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,197 @@
+"""
+Benchmark marketplace item search on a synthetic table.
+
+Loads N synthetic items (default 1,000,000) into a scratch database, builds the
+search index, then compares the indexed full-text query used by
+GET /api/marketplace/items?q=... against a naive LIKE scan.
+
+Usage:
+  python apps/api/scripts/bench_item_search.py                  # 1M rows, temp SQLite file
+  python apps/api/scripts/bench_item_search.py --rows 100000 --repeat 20
+  python apps/api/scripts/bench_item_search.py --database-url postgresql://... --keep
+  python apps/api/scripts/bench_item_search.py --json results.json
+
+Never point --database-url at a real database: the items table is filled
+with synthetic rows.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from sqlalchemy import insert, or_, text
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import Config
+from apps.api.models.marketplace import Item
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.item_search import apply_item_search, ensure_search_index
+
+
+NOUNS = [
+    'bisikleta', 'bicycle', 'electric fan', 'rice cooker', 'laptop', 'cellphone', 'textbook',
+    'school uniform', 'sofa', 'study table', 'wardrobe', 'refrigerator', 'washing machine',
+    'guitar', 'basketball', 'stroller', 'crib', 'printer', 'monitor', 'sewing machine',
+    'kalan', 'banig', 'payong', 'electric kettle', 'water dispenser', 'tricycle sidecar',
+]
+ADJECTIVES = ['used', 'slightly used', 'brand new', 'second hand', 'vintage', 'working', 'bago', 'luma']
+PHRASES = [
+    'pickup only', 'meet up sa plaza', 'complete with charger', 'no issues', 'minor scratches',
+    'negotiable', 'for donation', 'for lending to neighbors', 'comes with box', 'well maintained',
+]
+CATEGORIES = ['electronics', 'furniture', 'clothing', 'books', 'appliances', 'sports', 'others']
+QUERIES = ['fan', 'rice cooker', 'bisikleta', 'laptop charger', 'study', 'sewing machine negotiable', 'zzzz-not-found']
+
+
+def _random_item(rng, user_id, municipality_id, idx):
+    noun = rng.choice(NOUNS)
+    return {
+        'user_id': user_id,
+        'municipality_id': municipality_id,
+        'title': f"{rng.choice(ADJECTIVES)} {noun} #{idx}",
+        'description': '. '.join(rng.sample(PHRASES, 3)) + f'. {noun} in good condition.',
+        'category': rng.choice(CATEGORIES),
+        'condition': 'good',
+        'transaction_type': rng.choice(['sell', 'donate', 'lend']),
+        'status': 'available',
+        'is_active': True,
+        'view_count': 0,
+    }
+
+
+def _load(rows, batch, seed):
+    rng = random.Random(seed)
+    province = Province(name='Bench Province', slug='bench-province', psgc_code='BENCH-P')
+    db.session.add(province)
+    db.session.flush()
+    muni = Municipality(name='Bench Town', slug='bench-town', psgc_code='BENCH-M', province_id=province.id)
+    db.session.add(muni)
+    db.session.flush()
+    user = User(username='bench', email='bench@example.com', password_hash='x', first_name='Bench', last_name='User')
+    db.session.add(user)
+    db.session.commit()
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        chunk = [_random_item(rng, user.id, muni.id, i) for i in range(offset, min(rows, offset + batch))]
+        db.session.execute(insert(Item), chunk)
+        db.session.commit()
+    return time.perf_counter() - started
+
+
+def _build_index():
+    started = time.perf_counter()
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text(
+            "ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED"
+        ))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_item_search_vector ON items USING GIN (search_vector)'))
+        db.session.execute(text('ANALYZE items'))
+        db.session.commit()
+    else:
+        ensure_search_index(rebuild=True)
+    return time.perf_counter() - started
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        'max_ms': round(samples[-1], 2),
+    }
+
+
+def _indexed(q, per_page=20):
+    query, ranked = apply_item_search(Item.query.filter_by(is_active=True, status='available'), q)
+    if not ranked:
+        query = query.order_by(Item.created_at.desc())
+    return query.paginate(page=1, per_page=per_page, error_out=False)
+
+
+def _like(q, per_page=20):
+    query = Item.query.filter_by(is_active=True, status='available')
+    for term in q.split():
+        pattern = f'%{term}%'
+        query = query.filter(or_(Item.title.ilike(pattern), Item.description.ilike(pattern)))
+    return query.order_by(Item.created_at.desc()).paginate(page=1, per_page=per_page, error_out=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=3)
+    parser.add_argument('--database-url', help='Scratch database (default: temporary SQLite file)')
+    parser.add_argument('--skip-like', action='store_true', help='Skip the LIKE baseline (slow on large tables)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch SQLite file')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix='munlink-bench-')
+        url = f"sqlite:///{os.path.join(tmpdir, 'items.db')}"
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+        SQLALCHEMY_ECHO = False
+        EMAIL_OUTBOX_WORKER = False
+
+    app = create_app(BenchConfig)
+    results = {'rows': args.rows, 'database': url.split(':', 1)[0], 'queries': {}}
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        results['load_s'] = round(_load(args.rows, args.batch, args.seed), 2)
+        print(f"Loaded {args.rows:,} items in {results['load_s']}s")
+        results['index_build_s'] = round(_build_index(), 2)
+        print(f"Built search index in {results['index_build_s']}s")
+
+        for q in QUERIES:
+            hits = _indexed(q).total
+            entry = {'hits': hits, 'indexed': _time(lambda: _indexed(q), args.repeat)}
+            if not args.skip_like:
+                entry['like'] = _time(lambda: _like(q), max(1, args.repeat // 5))
+            results['queries'][q] = entry
+            line = f"{q!r:32} hits={hits:<8} indexed p50={entry['indexed']['p50_ms']}ms p95={entry['indexed']['p95_ms']}ms"
+            if 'like' in entry:
+                line += f"  like p50={entry['like']['p50_ms']}ms"
+            print(line)
+
+        db.session.remove()
+        if not args.keep and not tmpdir:
+            db.drop_all()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if tmpdir and not args.keep:
+        import shutil
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    elif tmpdir:
+        print(f"Scratch database kept at {url}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
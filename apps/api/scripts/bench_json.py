@@ -0,0 +1,128 @@
+"""
+Benchmark JSON serialization of API list pages.
+
+Builds 100-row pages of MarketplaceItem.to_dict(include_user=True),
+Issue.to_dict() and DocumentRequest.to_dict() from a scratch in-memory
+database, then times to_dict() itself and encoding of the resulting page
+with the stdlib provider versus the orjson provider that jsonify now uses.
+
+Usage:
+  python apps/api/scripts/bench_json.py
+  python apps/api/scripts/bench_json.py --rows 100 --repeat 500 --json results.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from flask.json.provider import DefaultJSONProvider
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.document import DocumentRequest, DocumentType
+from apps.api.models.issue import Issue, IssueCategory
+from apps.api.models.marketplace import Item
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.json_provider import OrjsonProvider, orjson
+
+
+def _load(rows):
+    province = Province(name='Bench Province', slug='bench-province', psgc_code='BENCH-P')
+    db.session.add(province)
+    db.session.flush()
+    muni = Municipality(name='Bench Town', slug='bench-town', psgc_code='BENCH-M', province_id=province.id)
+    db.session.add(muni)
+    db.session.flush()
+    users = [
+        User(username=f'bench{i}', email=f'bench{i}@example.com', password_hash='x',
+             first_name='Juan', last_name=f'Dela Cruz {i}', municipality_id=muni.id)
+        for i in range(rows)
+    ]
+    db.session.add_all(users)
+    category = IssueCategory(name='Roads', slug='roads')
+    doc_type = DocumentType(name='Barangay Clearance', code='BRGY-CLR', authority_level='barangay')
+    db.session.add_all([category, doc_type])
+    db.session.flush()
+    start = datetime(2026, 1, 1)
+    for i, user in enumerate(users):
+        ts = start + timedelta(minutes=i)
+        db.session.add(Item(
+            user_id=user.id, municipality_id=muni.id, title=f'Electric fan #{i}',
+            description='Slightly used, complete with box. Pickup sa plaza.', category='appliances',
+            condition='good', transaction_type='sell', price=1500 + i, status='available',
+            created_at=ts, updated_at=ts,
+        ))
+        db.session.add(Issue(
+            issue_number=f'ISS-BENCH-{i}', user_id=user.id, category_id=category.id, municipality_id=muni.id,
+            title=f'Sirang poste #{i}', description='Madilim ang kanto tuwing gabi.',
+            latitude=15.0286 + i / 10000, longitude=120.6898, created_at=ts, updated_at=ts,
+        ))
+        db.session.add(DocumentRequest(
+            request_number=f'DOC-BENCH-{i}', user_id=user.id, document_type_id=doc_type.id,
+            municipality_id=muni.id, delivery_method='digital', purpose='Employment requirement',
+            created_at=ts, updated_at=ts,
+        ))
+    db.session.commit()
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100, help='Rows per page')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    if orjson is None:
+        print('orjson is not installed; nothing to compare')
+        return 1
+
+    app = create_app(TestingConfig)
+    results = {'rows': args.rows, 'repeat': args.repeat, 'pages': {}}
+    with app.app_context():
+        db.create_all()
+        _load(args.rows)
+        stdlib = DefaultJSONProvider(app)
+        fast = OrjsonProvider(app)
+        pages = {
+            'items(include_user=True)': lambda: [i.to_dict(include_user=True) for i in Item.query.limit(args.rows)],
+            'issues': lambda: [i.to_dict() for i in Issue.query.limit(args.rows)],
+            'document_requests': lambda: [r.to_dict() for r in DocumentRequest.query.limit(args.rows)],
+        }
+        print(f"{'page':<26}{'to_dict ms':>12}{'stdlib ms':>12}{'orjson ms':>12}{'speedup':>10}{'bytes':>10}")
+        for name, build in pages.items():
+            payload = {'items': build(), 'total': args.rows, 'page': 1}
+            to_dict_ms = _time(build, max(1, args.repeat // 10))
+            stdlib_ms = _time(lambda: stdlib.dumps(payload, separators=(',', ':')), args.repeat)
+            orjson_ms = _time(lambda: fast.dumps(payload), args.repeat)
+            size = len(fast.dumps(payload).encode('utf-8'))
+            results['pages'][name] = {
+                'to_dict_ms': to_dict_ms, 'stdlib_ms': stdlib_ms, 'orjson_ms': orjson_ms, 'bytes': size,
+            }
+            speedup = stdlib_ms / orjson_ms if orjson_ms else float('inf')
+            print(f"{name:<26}{to_dict_ms:>12}{stdlib_ms:>12}{orjson_ms:>12}{speedup:>9.1f}x{size:>10}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+"""
+Compare the concurrency limits of the sync and async serving modes.
+
+  wsgi  gunicorn wsgi:app  --workers W --threads T
+  asgi  uvicorn  asgi:app  --workers W   (ASGI_THREADS=T threads per worker)
+
+Seeds one scratch database with scripts/bench_dataset.py. For each mode it
+starts the server as a subprocess with the same workers, threads and DB pool
+sizing (WEB_CONCURRENCY/WEB_THREADS), then runs the scripts/load_test.py
+scenarios once per --levels concurrency. Reports throughput, p95/p99 and the
+error rate per level. It also reports the concurrency limit: the highest
+level whose p95 stays within --slo-ms with an error rate of at most
+--max-error-rate.
+
+Needs gunicorn and uvicorn (pip install gunicorn uvicorn). SQLite serializes
+writers across processes, so use --database-url with a local Postgres for
+numbers that say something about production.
+
+Usage:
+  python apps/api/scripts/bench_serving.py --scale small --levels 8,32,64,128 --duration 20
+  python apps/api/scripts/bench_serving.py --modes asgi --workers 2 --threads 8 --json serving.json
+  python apps/api/scripts/bench_serving.py --database-url postgresql://localhost/munlink_bench --slo-ms 300
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from apps.api.scripts.bench_dataset import add_scale_arguments, scale_from_args
+from apps.api.scripts.load_test import DEFAULT_MIX, parse_mix, run_load
+
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODES = ('wsgi', 'asgi')
+
+
+def server_command(mode, port, workers, threads):
+    """Command line that serves the API in ``mode`` on 127.0.0.1:``port``."""
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'wsgi:app', '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers), '--threads', str(threads), '--timeout', '120']
+    if mode == 'asgi':
+        # Threads for the sync routes come from ASGI_THREADS
+        return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+                '--workers', str(workers), '--no-access-log']
+    raise ValueError(f'unknown mode {mode!r}')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _healthy(port):
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+        conn.request('GET', '/health')
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+
+
+def start_server(mode, database_url, upload_folder, workers, threads, timeout=60):
+    """Start the server subprocess and wait for /health; returns ``(base_url, process)``."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        UPLOAD_FOLDER=str(upload_folder),
+        WEB_CONCURRENCY=str(workers),
+        WEB_THREADS=str(threads),
+        ASGI_THREADS=str(threads),
+        RATE_LIMIT_ENABLED='False',  # many virtual users log in from one IP
+        EMAIL_OUTBOX_WORKER='False',
+        CLEANUP_WORKER='False',
+        DEBUG='False',
+    )
+    proc = subprocess.Popen(server_command(mode, port, workers, threads), cwd=API_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'{mode} server exited:\n{proc.stderr.read()[-2000:]}')
+        if _healthy(port):
+            return f'http://127.0.0.1:{port}', proc
+        time.sleep(0.2)
+    stop_server(proc)
+    raise RuntimeError(f'{mode} server did not become healthy within {timeout}s')
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def sweep(base_url, counts, levels, duration, mix=None, seed=1):
+    """Run the load test at each concurrency level; returns one summary row per level."""
+    rows = []
+    for level in levels:
+        total = run_load(base_url, counts, mix=mix, concurrency=level, duration=duration, seed=seed)['total']
+        rows.append({'concurrency': level, **{k: total[k] for k in (
+            'requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate')}})
+    return rows
+
+
+def concurrency_limit(rows, slo_ms, max_error_rate):
+    """Highest concurrency whose p95 and error rate are within bounds (None if no level is)."""
+    passing = [row['concurrency'] for row in rows
+               if row['p95_ms'] <= slo_ms and row['error_rate'] <= max_error_rate]
+    return max(passing) if passing else None
+
+
+def seed_database(database_url, upload_folder, counts, seed):
+    from apps.api import db
+    from apps.api.app import create_app
+    from apps.api.scripts.bench_api import bench_config
+    from apps.api.scripts.bench_dataset import seed_region
+
+    app = create_app(bench_config(database_url, upload_folder))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        summary = seed_region(counts, seed=seed)
+        db.session.remove()
+        db.engine.dispose()
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated: wsgi,asgi')
+    parser.add_argument('--levels', default='8,16,32,64', help='Comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per level')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker for the sync routes')
+    parser.add_argument('--slo-ms', type=float, default=500, help='p95 bound for the concurrency limit')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX))
+    parser.add_argument('--database-url', help='Scratch database (default: temporary SQLite file)')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    levels = [int(level) for level in args.levels.split(',')]
+    counts = scale_from_args(args)
+    tmpdir = tempfile.mkdtemp(prefix='munlink-serving-')
+    url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'serving.db')}"
+    uploads = os.path.join(tmpdir, 'uploads')
+    results = {'scale': args.scale, 'workers': args.workers, 'threads': args.threads,
+               'duration_s': args.duration, 'slo_ms': args.slo_ms, 'modes': {}}
+    try:
+        summary = seed_database(url, uploads, counts, args.seed)
+        print(f"Seeded {args.scale} dataset in {summary['load_s']}s: {summary['counts']}")
+        for mode in modes:
+            base_url, proc = start_server(mode, url, uploads, args.workers, args.threads)
+            try:
+                rows = sweep(base_url, counts, levels, args.duration, mix=args.mix, seed=args.seed)
+            finally:
+                stop_server(proc)
+            limit = concurrency_limit(rows, args.slo_ms, args.max_error_rate)
+            results['modes'][mode] = {'levels': rows, 'concurrency_limit': limit}
+
+            print(f"\n{mode} ({args.workers} workers x {args.threads} threads)")
+            print(f"{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err%':>8}")
+            for row in rows:
+                print(f"{row['concurrency']:>12}{row['rps']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+                      f"{row['p99_ms']:>10}{row['error_rate']:>8.1%}")
+            print(f"concurrency limit (p95 <= {args.slo_ms} ms): {limit if limit is not None else 'none'}")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
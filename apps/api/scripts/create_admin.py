@@ -6,7 +6,7 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from apps.api.app import create_app, db
+from apps.api.app import get_app, db
 from apps.api.models.user import User
 from apps.api.models.municipality import Municipality
 from datetime import datetime, date
@@ -235,7 +235,7 @@ def create_admin_batch():
 
 def main():
     """Main function."""
-    app = create_app()
+    app = get_app()
     
     with app.app_context():
         # Check if municipalities exist
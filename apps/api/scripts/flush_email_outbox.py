@@ -0,0 +1,30 @@
+"""
+Deliver queued emails from the outbox once and exit.
+
+Useful as a cron job when the in-process sender is disabled
+(EMAIL_OUTBOX_WORKER=False).
+
+Usage:
+  python apps/api/scripts/flush_email_outbox.py
+"""
+try:
+    from apps.api.app import create_app
+except Exception:
+    from app import create_app
+
+
+def main() -> int:
+    app = create_app()
+    with app.app_context():
+        try:
+            from apps.api.utils.email_outbox import flush_outbox
+        except Exception:
+            from utils.email_outbox import flush_outbox
+
+        stats = flush_outbox()
+        print(f"Outbox flushed: sent={stats['sent']} retried={stats['retried']} failed={stats['failed']}")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
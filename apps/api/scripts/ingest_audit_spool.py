@@ -0,0 +1,33 @@
+"""
+Load spooled audit rows (AUDIT_SPOOL_PATH) into the database once and exit.
+
+Useful as a cron job when the in-process ingester is disabled
+(AUDIT_SPOOL_WORKER=False).
+
+Usage:
+  python apps/api/scripts/ingest_audit_spool.py
+"""
+try:
+    from apps.api.app import create_app
+except Exception:
+    from app import create_app
+
+
+def main() -> int:
+    app = create_app()
+    with app.app_context():
+        try:
+            from apps.api.utils.audit_writer import ingest_spool
+        except Exception:
+            from utils.audit_writer import ingest_spool
+
+        if not app.config.get('AUDIT_SPOOL_PATH'):
+            print("AUDIT_SPOOL_PATH is not set; nothing to ingest")
+            return 0
+        inserted = ingest_spool()
+        print(f"Audit spool ingested: rows={inserted}")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
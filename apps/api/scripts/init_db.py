@@ -126,10 +126,10 @@ def seed_if_empty():
 
 def init_database():
     """Initialize database - create tables if they don't exist and seed data"""
-    from apps.api.app import create_app
+    from apps.api.app import get_app
     from apps.api import db
     
-    app = create_app()
+    app = get_app()
     
     # Wait for database to be available (with retries for Supabase)
     print("Connecting to database...")
@@ -0,0 +1,393 @@
+"""
+Load test a locally running API with a weighted mix of traffic scenarios.
+
+Each of --concurrency virtual users loops over scenarios picked by weight:
+
+  resident_browsing  marketplace pages and item details, announcements, public issues
+  issue_reporting    resident logs in, lists categories, files an issue, checks "my issues"
+  document_request   resident logs in, lists document types, submits a request, checks "my requests"
+  admin_dashboard    municipal admin logs in and polls dashboard stats and the review queues
+
+and reports p50/p95/p99 latency, throughput and error rate per endpoint
+(plus the average X-Query-Count the API reports), which is what sizing
+gunicorn workers/threads and the DB pool (WEB_CONCURRENCY, WEB_THREADS and
+DB_MAX_CONNECTIONS in get_pool_settings) needs.
+
+The target must hold a dataset from scripts/bench_dataset.py (the scenarios
+log in with its accounts) and run with RATE_LIMIT_ENABLED=False, otherwise
+the logins of many virtual users from one IP are throttled.
+
+Usage:
+  python apps/api/scripts/bench_dataset.py --scale small --database-url sqlite:////tmp/munlink-load.db
+  cd apps/api && DATABASE_URL=sqlite:////tmp/munlink-load.db RATE_LIMIT_ENABLED=False \\
+      gunicorn wsgi:app -w 4 --threads 4 -b 127.0.0.1:8000
+  python apps/api/scripts/load_test.py --base-url http://127.0.0.1:8000 --concurrency 32 --duration 60
+  python apps/api/scripts/load_test.py --mix resident_browsing=80,admin_dashboard=20 --json run.json
+
+  # Self-contained: seed a temporary SQLite database and serve it in-process
+  python apps/api/scripts/load_test.py --start --scale tiny --concurrency 8 --duration 20
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from apps.api.scripts.bench_dataset import (
+    BENCH_PASSWORD,
+    add_scale_arguments,
+    admin_usernames,
+    scale_from_args,
+    verified_resident_usernames,
+)
+
+
+DEFAULT_MIX = {'resident_browsing': 60, 'issue_reporting': 10, 'document_request': 10, 'admin_dashboard': 20}
+ITEM_CATEGORIES = ['electronics', 'furniture', 'clothing', 'books', 'appliances', 'sports', 'others']
+
+
+class Stats:
+    """Per-endpoint latency samples, status counts and query counts (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.queries = defaultdict(int)
+        self.scenarios = defaultdict(int)
+
+    def record(self, name, ms, status, queries=None):
+        with self._lock:
+            self.samples[name].append(ms)
+            self.statuses[name][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[name] += 1
+            if queries is not None:
+                self.queries[name] += queries
+
+    def scenario_done(self, name):
+        with self._lock:
+            self.scenarios[name] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            endpoints[name] = {
+                'requests': len(ordered),
+                'errors': self.errors[name],
+                'error_rate': round(self.errors[name] / len(ordered), 4),
+                'rps': round(len(ordered) / elapsed, 2),
+                'p50_ms': round(percentile(ordered, 50), 2),
+                'p95_ms': round(percentile(ordered, 95), 2),
+                'p99_ms': round(percentile(ordered, 99), 2),
+                'max_ms': round(ordered[-1], 2),
+                'avg_queries': round(self.queries[name] / len(ordered), 2),
+                'statuses': {str(k): v for k, v in sorted(self.statuses[name].items())},
+            }
+        every = sorted(ms for samples in self.samples.values() for ms in samples)
+        total_errors = sum(self.errors.values())
+        return {
+            'duration_s': round(elapsed, 2),
+            'total': {
+                'requests': len(every),
+                'errors': total_errors,
+                'error_rate': round(total_errors / len(every), 4) if every else 0.0,
+                'rps': round(len(every) / elapsed, 2) if elapsed else 0.0,
+                'p50_ms': round(percentile(every, 50), 2),
+                'p95_ms': round(percentile(every, 95), 2),
+                'p99_ms': round(percentile(every, 99), 2),
+            },
+            'scenarios': dict(self.scenarios),
+            'endpoints': endpoints,
+        }
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class Client:
+    """One keep-alive HTTP connection per virtual user."""
+
+    def __init__(self, base_url, stats, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+        self.conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, name=None, params=None, body=None, token=None):
+        """Send one request, record it under ``name`` and return ``(status, json or None)``."""
+        url = self.prefix + path + (f'?{urlencode(params)}' if params else '')
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        started = time.perf_counter()
+        status, data, queries = 0, None, None
+        try:
+            if self.conn is None:
+                self.conn = self.conn_class(self.host, self.port, timeout=self.timeout)
+            self.conn.request(method, url, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            raw = resp.read()
+            status = resp.status
+            if resp.getheader('X-Query-Count'):
+                queries = int(resp.getheader('X-Query-Count'))
+            if raw and (resp.getheader('Content-Type') or '').startswith('application/json'):
+                data = json.loads(raw)
+        except (OSError, http.client.HTTPException, ValueError):
+            self.close()
+        self.stats.record(name or f'{method} {path}', (time.perf_counter() - started) * 1000, status, queries)
+        return status, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class VirtualUser:
+    def __init__(self, index, client, residents, admins, seed):
+        self.client = client
+        self.rng = random.Random(seed * 1000 + index)
+        self.resident_name = residents[index % len(residents)]
+        self.admin_name = admins[index % len(admins)]
+        self.sessions = {}
+        self.item_ids = []
+
+    def login(self, username):
+        """Token and user dict for ``username`` (logged in once per virtual user)."""
+        if username not in self.sessions:
+            status, data = self.client.request('POST', '/api/auth/login',
+                                               body={'username': username, 'password': BENCH_PASSWORD})
+            if status != 200 or not data:
+                return None, None
+            self.sessions[username] = (data['access_token'], data.get('user') or {})
+        return self.sessions[username]
+
+    # --- scenarios ---------------------------------------------------------
+
+    def resident_browsing(self):
+        params = {'page': self.rng.randint(1, 3)}
+        if self.rng.random() < 0.5:
+            params['category'] = self.rng.choice(ITEM_CATEGORIES)
+        status, data = self.client.request('GET', '/api/marketplace/items', params=params)
+        if status == 200 and data and data.get('items'):
+            self.item_ids = [item['id'] for item in data['items']]
+        if self.item_ids:
+            item_id = self.rng.choice(self.item_ids)
+            self.client.request('GET', f'/api/marketplace/items/{item_id}', name='GET /api/marketplace/items/<id>')
+        self.client.request('GET', '/api/announcements')
+        self.client.request('GET', '/api/issues', params={'page': self.rng.randint(1, 3)})
+
+    def issue_reporting(self):
+        token, user = self.login(self.resident_name)
+        if not token:
+            return
+        status, data = self.client.request('GET', '/api/issues/categories')
+        categories = (data or {}).get('categories') or []
+        if status == 200 and categories:
+            self.client.request('POST', '/api/issues', token=token, body={
+                'category_id': self.rng.choice(categories)['id'],
+                'title': 'Load test: sirang poste',
+                'description': 'Madilim ang kanto tuwing gabi.',
+                'specific_location': 'Kanto ng Rizal at Mabini',
+                'latitude': 14.8 + self.rng.random(), 'longitude': 120.2 + self.rng.random(),
+            })
+        self.client.request('GET', '/api/issues/my', token=token)
+
+    def document_request(self):
+        token, user = self.login(self.resident_name)
+        if not token:
+            return
+        status, data = self.client.request('GET', '/api/documents/types')
+        types = (data or {}).get('types') or []
+        if status == 200 and types:
+            self.client.request('POST', '/api/documents/requests', token=token, body={
+                'document_type_id': self.rng.choice(types)['id'],
+                'municipality_id': user.get('municipality_id'),
+                'delivery_method': 'digital',
+                'purpose': 'Employment requirement',
+            })
+        self.client.request('GET', '/api/documents/my-requests', token=token)
+
+    def admin_dashboard(self):
+        token, _ = self.login(self.admin_name)
+        if not token:
+            return
+        self.client.request('GET', '/api/admin/dashboard/stats', token=token)
+        self.client.request('GET', '/api/admin/documents/requests', token=token,
+                            params={'status': self.rng.choice(['pending', 'processing'])})
+        self.client.request('GET', '/api/admin/issues', token=token)
+        if self.rng.random() < 0.25:
+            self.client.request('GET', '/api/admin/municipalities/performance', token=token)
+
+
+SCENARIOS = tuple(DEFAULT_MIX)
+
+
+def parse_mix(raw):
+    mix = {}
+    for part in (raw or '').split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'unknown scenario {name!r} (choose from {", ".join(SCENARIOS)})')
+        mix[name] = float(weight or 1)
+    return mix or dict(DEFAULT_MIX)
+
+
+def run_load(base_url, counts, mix=None, concurrency=8, duration=30.0, iterations=None,
+             ramp_up=0.0, think_time=0.0, seed=1):
+    """Drive the scenarios against ``base_url``; returns the report dict."""
+    mix = mix or dict(DEFAULT_MIX)
+    names, weights = list(mix), list(mix.values())
+    residents = verified_resident_usernames(counts, limit=max(concurrency, 1))
+    admins = admin_usernames(counts)
+    stats = Stats()
+    started = time.perf_counter()
+    deadline = started + ramp_up + duration
+
+    def worker(index):
+        if ramp_up:
+            time.sleep(ramp_up * index / concurrency)
+        client = Client(base_url, stats)
+        vu = VirtualUser(index, client, residents, admins, seed)
+        done = 0
+        try:
+            while time.perf_counter() < deadline and (iterations is None or done < iterations):
+                scenario = vu.rng.choices(names, weights)[0]
+                getattr(vu, scenario)()
+                stats.scenario_done(scenario)
+                done += 1
+                if think_time:
+                    time.sleep(vu.rng.expovariate(1 / think_time))
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = stats.report(time.perf_counter() - started)
+    report.update(base_url=base_url, concurrency=concurrency, mix=mix)
+    return report
+
+
+def print_report(report):
+    total = report['total']
+    print(f"\n{report['total']['requests']} requests in {report['duration_s']}s "
+          f"({total['rps']} req/s) at concurrency {report['concurrency']}, "
+          f"errors {total['errors']} ({total['error_rate']:.2%})")
+    print('scenarios: ' + ', '.join(f'{k}={v}' for k, v in sorted(report['scenarios'].items())))
+    print(f"\n{'endpoint':<48}{'reqs':>7}{'rps':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'queries':>9}")
+    for name, row in report['endpoints'].items():
+        print(f"{name:<48}{row['requests']:>7}{row['rps']:>8}{row['error_rate']:>7.1%}{row['p50_ms']:>9}"
+              f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}{row['avg_queries']:>9}")
+    print(f"{'TOTAL':<48}{total['requests']:>7}{total['rps']:>8}{total['error_rate']:>7.1%}{total['p50_ms']:>9}"
+          f"{total['p95_ms']:>9}{total['p99_ms']:>9}")
+
+
+def start_local_server(database_url, counts, seed, upload_folder):
+    """Seed ``database_url`` and serve the API from a background thread; returns ``(base_url, server)``."""
+    from pathlib import Path
+    from werkzeug.serving import make_server
+
+    from apps.api import db
+    from apps.api.app import create_app
+    from apps.api.config import Config
+    from apps.api.scripts.bench_dataset import seed_region
+
+    class LoadConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ECHO = False
+        UPLOAD_FOLDER = Path(upload_folder)
+        RATE_LIMIT_ENABLED = False
+        EMAIL_OUTBOX_WORKER = False
+        CLEANUP_WORKER = False
+
+    app = create_app(LoadConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_region(counts, seed=seed)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-test-server', daemon=True).start()
+    server.app = app
+    return f'http://127.0.0.1:{server.server_port}', server
+
+
+def stop_local_server(server):
+    """Stop the in-process server and write its buffered item views."""
+    from apps.api.utils.view_counter import flush_views
+
+    server.shutdown()
+    with server.app.app_context():
+        flush_views()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=8, help='Virtual users (threads)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run after ramp-up')
+    parser.add_argument('--iterations', type=int, help='Stop each virtual user after this many scenarios')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds over which virtual users start')
+    parser.add_argument('--think-time', type=float, default=0, help='Mean pause between scenarios (seconds)')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='Scenario weights, e.g. resident_browsing=60,admin_dashboard=20')
+    parser.add_argument('--start', action='store_true',
+                        help='Seed a scratch database and serve the API in-process instead of --base-url')
+    parser.add_argument('--database-url', help='With --start: database to seed (default: temporary SQLite file)')
+    parser.add_argument('--json', help='Write the report to this file')
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    counts = scale_from_args(args)
+    base_url, server = args.base_url, None
+    if args.start:
+        tmpdir = tempfile.mkdtemp(prefix='munlink-load-')
+        url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'load.db')}"
+        base_url, server = start_local_server(url, counts, args.seed, os.path.join(tmpdir, 'uploads'))
+        print(f'Serving {args.scale} dataset from {url} at {base_url}')
+    try:
+        report = run_load(base_url, counts, mix=args.mix, concurrency=args.concurrency, duration=args.duration,
+                          iterations=args.iterations, ramp_up=args.ramp_up, think_time=args.think_time,
+                          seed=args.seed)
+    finally:
+        if server is not None:
+            stop_local_server(server)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if report['total']['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
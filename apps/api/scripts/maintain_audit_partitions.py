@@ -0,0 +1,35 @@
+"""
+Maintain audit log partitions once and exit (run monthly, e.g. from cron).
+
+Creates upcoming month partitions (PostgreSQL), moves closed months out of
+the hot table (SQLite) and archives months older than
+AUDIT_ARCHIVE_AFTER_MONTHS to gzip JSONL with a manifest.
+
+Usage:
+  python apps/api/scripts/maintain_audit_partitions.py
+"""
+try:
+    from apps.api.app import create_app
+except Exception:
+    from app import create_app
+
+
+def main() -> int:
+    app = create_app()
+    with app.app_context():
+        try:
+            from apps.api.utils.audit_partitions import maintain_partitions
+        except Exception:
+            from utils.audit_partitions import maintain_partitions
+
+        stats = maintain_partitions()
+        print(f"Partitions created: {', '.join(stats['created']) or 'none'}")
+        for name, rows in stats['rotated'].items():
+            print(f"Moved {rows} rows into {name}")
+        for entry in stats['archived']:
+            print(f"Archived {entry['table']} {entry['month']}: {entry['rows']} rows -> {entry['file']}")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+"""
+Rebuild the issue/announcement keyword search index.
+
+Indexes every row (unchanged documents are skipped) and removes entries for
+rows that no longer exist. Safe to re-run.
+
+Usage:
+  python apps/api/scripts/rebuild_search_index.py
+  python apps/api/scripts/rebuild_search_index.py issue
+"""
+import sys
+
+try:
+    from apps.api.app import create_app
+except Exception:
+    from app import create_app
+
+
+def main() -> int:
+    app = create_app()
+    with app.app_context():
+        try:
+            from apps.api.utils.search_index import SEARCHABLE, rebuild_search_index
+        except Exception:
+            from utils.search_index import SEARCHABLE, rebuild_search_index
+
+        entity_types = sys.argv[1:] or list(SEARCHABLE)
+        unknown = [t for t in entity_types if t not in SEARCHABLE]
+        if unknown:
+            print(f"Unknown entity type(s): {', '.join(unknown)} (choose from {', '.join(SEARCHABLE)})")
+            return 2
+        for entity_type, counts in rebuild_search_index(entity_types).items():
+            print(f"{entity_type}: indexed={counts['indexed']} removed={counts['removed']}")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
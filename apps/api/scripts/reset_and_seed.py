@@ -31,7 +31,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '../../..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from apps.api.app import create_app
+from apps.api.app import get_app
 from apps.api import db
 from apps.api.models.user import User
 from apps.api.models.municipality import Municipality
@@ -356,7 +356,7 @@ def main():
     parser.add_argument('--benefits-per-muni', type=int, default=3, help='Number of benefit programs to create per municipality (1-5)')
     args = parser.parse_args()
 
-    app = create_app()
+    app = get_app()
     with app.app_context():
         print("\n" + "=" * 64)
         print("MUNLINK REGION 3 - RESET AND SEED (PRESERVE MUNICIPALITIES)")
@@ -0,0 +1,39 @@
+"""
+Run pending admin cleanup jobs (and resume interrupted ones) once and exit.
+
+Useful as a cron job when the in-process runner is disabled
+(CLEANUP_WORKER=False), or to finish a job by id from the shell.
+
+Usage:
+  python apps/api/scripts/run_cleanup_jobs.py [job_id]
+"""
+import sys
+
+try:
+    from apps.api.app import create_app
+except Exception:
+    from app import create_app
+
+
+def main(argv) -> int:
+    app = create_app()
+    with app.app_context():
+        try:
+            from apps.api.utils.cleanup import run_job, run_pending_jobs
+        except Exception:
+            from utils.cleanup import run_job, run_pending_jobs
+
+        if argv:
+            def report(job):
+                print(f"job {job.id}: {job.deleted_count}/{job.total or '?'} rows, batch {job.batches}")
+
+            job = run_job(int(argv[0]), progress=report)
+            print(f"Job {job.id} {job.status}: deleted={job.deleted_count}")
+            return 0
+        finished = run_pending_jobs()
+        print(f"Cleanup jobs finished: {finished}")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -93,7 +93,7 @@ def generate_password(slug: str, suffix: str) -> str:
 def seed_all_admins(dry_run: bool = False):
     """Create one admin user per municipality across all provinces."""
     import bcrypt
-    from apps.api.app import create_app, db
+    from apps.api.app import get_app, db
     from apps.api.models.user import User
     from apps.api.models.municipality import Municipality
     from apps.api.models.province import Province
@@ -102,7 +102,7 @@ def seed_all_admins(dry_run: bool = False):
     base_email = config['base_email']
     password_suffix = config['password_suffix']
     
-    app = create_app()
+    app = get_app()
     
     with app.app_context():
         print("\n" + "=" * 60)
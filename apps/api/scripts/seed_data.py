@@ -9,7 +9,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from apps.api.app import create_app
+from apps.api.app import get_app
 from apps.api import db
 from apps.api.models.province import Province
 from apps.api.models.municipality import Municipality, Barangay
@@ -602,7 +602,7 @@ def seed_issue_categories():
 
 def main():
     """Run all seed functions."""
-    app = create_app()
+    app = get_app()
     
     with app.app_context():
         print("\n" + "="*50)
@@ -10,7 +10,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '../../..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from apps.api.app import create_app
+from apps.api.app import get_app
 from apps.api import db
 
 try:
@@ -21,7 +21,7 @@ except Exception as e:
 
 
 def main():
-    app = create_app()
+    app = get_app()
     with app.app_context():
         print("Seeding issue categories only...")
         try:
@@ -51,11 +51,11 @@ def seed_production():
     if not check_database_url():
         return
     
-    from apps.api.app import create_app
+    from apps.api.app import get_app
     from apps.api import db
     from sqlalchemy import text
     
-    app = create_app()
+    app = get_app()
     
     with app.app_context():
         # Test connection
@@ -0,0 +1,102 @@
+"""
+Report how long a fresh worker takes to become ready, and what it imports.
+
+Starts a clean interpreter (as gunicorn does for each worker), imports the
+API, builds the app and serves GET /health through the test client, with
+``-X importtime`` enabled. Prints the phase timings, the slowest packages
+and API modules to import, and whether any heavy optional library was loaded at start-up
+(those should only load on first use: ReportLab for PDFs, openpyxl for
+exports, qrcode/Pillow for QR codes, cryptography.fernet for claim codes).
+
+Usage:
+  python apps/api/scripts/startup_report.py
+  python apps/api/scripts/startup_report.py --top 25 --json startup.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+
+HEAVY_MODULES = ('reportlab', 'openpyxl', 'qrcode', 'PIL', 'cryptography.fernet')
+
+_CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import apps.api.app as app_module
+t1 = time.perf_counter()
+from apps.api.config import TestingConfig
+app = app_module.create_app(TestingConfig)
+t2 = time.perf_counter()
+status = app.test_client().get('/health').status_code
+t3 = time.perf_counter()
+print(json.dumps({{
+    'import_ms': round((t1 - t0) * 1000, 1),
+    'create_app_ms': round((t2 - t1) * 1000, 1),
+    'first_health_ms': round((t3 - t2) * 1000, 1),
+    'health_status': status,
+    'app_built_on_import': app_module._app is not None,
+    'heavy_loaded': [m for m in {heavy!r} if m in sys.modules],
+    'modules': len(sys.modules),
+}}))
+"""
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(python=sys.executable, importtime=True):
+    """Run the start-up in a child interpreter; returns timings and import stats."""
+    cmd = [python]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', _CHILD.format(root=ROOT, heavy=HEAVY_MODULES)]
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT, env=env, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f'start-up failed:\n{proc.stderr[-2000:]}')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        # Whole packages (cumulative includes their submodules) and the API's own modules
+        if match and ('.' not in match.group(4) or match.group(4).startswith('apps.api.')):
+            imports.append({'module': match.group(4), 'self_us': int(match.group(1)),
+                            'cumulative_us': int(match.group(2))})
+    result['top_imports'] = sorted(imports, key=lambda i: i['cumulative_us'], reverse=True)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    report = measure()
+    report['top_imports'] = report['top_imports'][:args.top]
+    print(f"import apps.api.app   {report['import_ms']:>8} ms")
+    print(f"create_app()          {report['create_app_ms']:>8} ms")
+    print(f"first GET /health     {report['first_health_ms']:>8} ms  (status {report['health_status']})")
+    print(f"modules loaded        {report['modules']:>8}")
+    if report['app_built_on_import']:
+        print('Importing apps.api.app built an app; construction should happen once, via wsgi.py or get_app()')
+    print(f"\n{'import':<40}{'cumulative ms':>14}")
+    for entry in report['top_imports']:
+        print(f"{entry['module']:<40}{entry['cumulative_us'] / 1000:>14.1f}")
+    if report['heavy_loaded']:
+        print(f"\nHeavy libraries loaded at start-up: {', '.join(report['heavy_loaded'])}")
+    else:
+        print('\nNo heavy optional libraries loaded at start-up.')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
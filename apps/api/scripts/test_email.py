@@ -33,7 +33,7 @@ def main() -> int:
         )
 
         try:
-            send_generic_email(to_email, subj, body)
+            send_generic_email(to_email, subj, body, deferred=False)
             print("OK: Test email sent. Check the recipient inbox/spam.")
             return 0
         except Exception as e:
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+import pytest
+
+from apps.api.utils.query_stats import count_queries, normalize_sql
+
+
+@pytest.fixture
+def query_budget():
+    """Fail if the block issues more than ``max_queries`` SQL statements.
+
+        with query_budget(4):
+            client.get('/api/marketplace/items')
+    """
+    @contextmanager
+    def check(max_queries):
+        with count_queries() as statements:
+            yield statements
+        assert len(statements) <= max_queries, (
+            f'{len(statements)} queries, budget {max_queries}:\n'
+            + '\n'.join(normalize_sql(s) for s in statements)
+        )
+    return check
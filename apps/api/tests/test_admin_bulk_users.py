@@ -0,0 +1,61 @@
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.audit import AuditLog
+from apps.api.models.email_outbox import EmailOutbox
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+
+
+def _user(username, **kwargs):
+    return User(
+        username=username,
+        email=f'{username}@example.com',
+        password_hash='x',
+        first_name=username.title(),
+        last_name='Dela Cruz',
+        **kwargs,
+    )
+
+
+def test_bulk_verify_updates_audits_and_queues_in_one_request():
+    class Config(TestingConfig):
+        EMAIL_OUTBOX_ENABLED = True
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        other = Municipality(name='Mabalacat', slug='mabalacat', psgc_code='035409000', province_id=province.id)
+        db.session.add_all([town, other])
+        db.session.flush()
+        admin = _user('admin', role='municipal_admin', admin_municipality_id=town.id)
+        residents = [_user(f'resident{i}', municipality_id=town.id) for i in range(3)]
+        outsider = _user('outsider', municipality_id=other.id)
+        db.session.add_all([admin, outsider, *residents])
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+        ids = [u.id for u in residents]
+        outsider_id = outsider.id
+
+    resp = app.test_client().post(
+        '/api/admin/users/bulk-verify',
+        json={'user_ids': ids + [outsider_id, 9999]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['processed'] == ids
+    assert {s['reason'] for s in body['skipped']} == {'not_in_municipality', 'not_found'}
+    with app.app_context():
+        assert User.query.filter(User.id.in_(ids), User.admin_verified == True).count() == 3
+        assert AuditLog.query.filter_by(entity_type='user', action='verify').count() == 3
+        assert EmailOutbox.query.filter_by(status='pending').count() == 3
+        assert User.query.get(outsider_id).admin_verified is False
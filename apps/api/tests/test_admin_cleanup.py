@@ -0,0 +1,124 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.announcement import Announcement
+from apps.api.models.audit import AuditLog
+from apps.api.models.cleanup_job import CleanupJob
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.search import SearchDocument
+from apps.api.models.user import User
+from apps.api.utils import cleanup
+
+
+def test_cleanup_streams_archive_in_batches_and_resumes(tmp_path, monkeypatch):
+    class Config(TestingConfig):
+        UPLOAD_FOLDER = tmp_path
+        CLEANUP_BATCH_SIZE = 3
+        CLEANUP_YIELD_PER = 2
+
+    app = create_app(Config)
+    old = datetime.utcnow() - timedelta(days=400)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        db.session.add(town)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=town.id)
+        db.session.add(admin)
+        db.session.flush()
+        for i in range(8):
+            db.session.add(Announcement(title=f'Old {i}', content='Lumang abiso', municipality_id=town.id,
+                                        created_by=admin.id, created_at=old))
+        db.session.add(Announcement(title='Recent', content='Bagong abiso', municipality_id=town.id, created_by=admin.id))
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+
+        # Interrupt the second batch after its archive write, before the delete commits
+        job = cleanup.create_job(town.id, 'announcements', old + timedelta(days=1), archive=True, created_by=admin.id)
+        real_index = cleanup.index_documents
+        calls = []
+
+        def flaky(connection, entries, deleted=()):
+            calls.append(deleted)
+            if len(calls) == 2:
+                raise RuntimeError('worker killed')
+            return real_index(connection, entries, deleted)
+
+        monkeypatch.setattr(cleanup, 'index_documents', flaky)
+        with pytest.raises(RuntimeError):
+            cleanup.run_job(job.id)
+        job = db.session.get(CleanupJob, job.id)
+        assert (job.status, job.deleted_count, job.batches, job.total) == ('failed', 3, 1, 8)
+        monkeypatch.setattr(cleanup, 'index_documents', real_index)
+        job_id = job.id
+
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    resp = client.post(f'/api/admin/cleanup/jobs/{job_id}/resume', headers=headers).get_json()
+    assert resp['job']['status'] == 'completed'
+    assert resp['job']['deleted_count'] == 8 and resp['job']['batches'] == 3
+    assert resp['job']['progress'] == 100.0
+
+    with app.app_context():
+        assert [a.title for a in Announcement.query.all()] == ['Recent']
+        assert SearchDocument.query.filter_by(entity_type='announcement').count() == 1
+        assert AuditLog.query.filter_by(action='cleanup_delete').count() == 1
+        with gzip.open(tmp_path / resp['job']['archived_url'], 'rt', encoding='utf-8') as fh:
+            titles = [json.loads(line)['title'] for line in fh]
+    assert titles == [f'Old {i}' for i in range(8)]  # no duplicates from the interrupted batch
+
+    # Inline cleanup keeps the original response shape
+    resp = client.post('/api/admin/cleanup', json={'entity': 'announcements', 'confirm': 'DELETE'}, headers=headers)
+    assert resp.status_code == 200 and resp.get_json()['deleted_count'] == 1
+
+
+def test_resume_refuses_a_job_that_is_still_running(tmp_path):
+    class Config(TestingConfig):
+        UPLOAD_FOLDER = tmp_path
+        CLEANUP_WORKER = False
+        CLEANUP_STALE_SECONDS = 300
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        db.session.add(town)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=town.id)
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+        job = cleanup.create_job(town.id, 'announcements', None, archive=False, created_by=admin.id)
+        job.status, job.updated_at = 'running', datetime.utcnow()
+        db.session.commit()
+        job_id = job.id
+
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    for payload in ({}, {'background': True}):
+        resp = client.post(f'/api/admin/cleanup/jobs/{job_id}/resume', json=payload, headers=headers)
+        assert resp.status_code == 409
+    with app.app_context():
+        assert db.session.get(CleanupJob, job_id).status == 'running'  # not reset to pending
+
+        # Its runner went away: the job is stale and can be taken over
+        db.session.get(CleanupJob, job_id).updated_at = datetime.utcnow() - timedelta(seconds=600)
+        db.session.commit()
+    resp = client.post(f'/api/admin/cleanup/jobs/{job_id}/resume', headers=headers)
+    assert resp.status_code == 200 and resp.get_json()['job']['status'] == 'completed'
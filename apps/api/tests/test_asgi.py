@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.utils.asgi import AsyncApp
+
+
+def _call(asgi, method, path, query=b'', headers=(), body=b''):
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'root_path': '',
+             'headers': [*headers, (b'content-length', str(len(body)).encode())], 'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80)}
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi(scope, receive, send))
+    start = sent[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def _asgi(tmp_path, **overrides):
+    # A file database: requests run on the adapter's threads, each with its own connection
+    config = type('Config', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'api.db'}",
+                                              'UPLOAD_FOLDER': tmp_path, 'ASGI_THREADS': 4, **overrides})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return AsyncApp(app)
+
+
+def test_flask_routes_work_through_the_adapter(tmp_path):
+    asgi = _asgi(tmp_path)
+    status, headers, body = _call(asgi, 'GET', '/health')
+    assert status == 200 and json.loads(body)['status'] == 'healthy'
+
+    status, _, body = _call(asgi, 'POST', '/api/auth/login', headers=[(b'content-type', b'application/json')],
+                            body=b'{"username": "nobody", "password": "x"}')
+    assert status == 401
+    assert _call(asgi, 'GET', '/uploads/missing.png')[0] == 404
+
+
+def test_uploads_and_cached_feed_pages_are_served_on_the_loop(tmp_path):
+    asgi = _asgi(tmp_path)
+    (tmp_path / 'photo.jpg').write_bytes(b'x' * 200_000)
+    origin = [(b'origin', b'http://localhost:3000')]
+
+    status, headers, body = _call(asgi, 'GET', '/uploads/photo.jpg', headers=origin)
+    assert status == 200 and body == b'x' * 200_000
+    assert headers[b'content-type'] == b'image/jpeg' and headers[b'content-length'] == b'200000'
+    assert headers[b'access-control-allow-origin'] == b'http://localhost:3000'
+    assert _call(asgi, 'GET', '/uploads/../secret.txt')[0] == 404
+
+    # First page is a cache miss served by Flask, the repeat a hit answered on the loop
+    status, headers, miss = _call(asgi, 'GET', '/api/marketplace/items', query=b'page=1&per_page=5')
+    assert status == 200 and headers[b'x-feed-cache'] == b'miss'
+    status, headers, hit = _call(asgi, 'GET', '/api/marketplace/items', query=b'page=1&per_page=5')
+    assert status == 200 and headers[b'x-feed-cache'] == b'hit' and hit == miss
+
+
+def test_native_routes_can_be_turned_off(tmp_path):
+    asgi = _asgi(tmp_path, ASGI_NATIVE_ROUTES=False)
+    for _ in range(2):
+        _, headers, _ = _call(asgi, 'GET', '/api/marketplace/items')
+    assert headers[b'x-feed-cache'] == b'hit'
+    # Flask's send_file adds an ETag; the loop path does not
+    (tmp_path / 'a.txt').write_text('hello')
+    status, headers, body = _call(asgi, 'GET', '/uploads/a.txt')
+    assert status == 200 and body == b'hello' and b'etag' in headers
+
+
+def test_serving_benchmark_concurrency_limit():
+    from apps.api.scripts.bench_serving import concurrency_limit, server_command
+
+    rows = [{'concurrency': 8, 'p95_ms': 80, 'error_rate': 0.0},
+            {'concurrency': 32, 'p95_ms': 300, 'error_rate': 0.0},
+            {'concurrency': 64, 'p95_ms': 450, 'error_rate': 0.05},
+            {'concurrency': 128, 'p95_ms': 900, 'error_rate': 0.0}]
+    assert concurrency_limit(rows, slo_ms=500, max_error_rate=0.01) == 32
+    assert concurrency_limit(rows, slo_ms=50, max_error_rate=0.01) is None
+    assert server_command('asgi', 8001, workers=2, threads=8)[2:4] == ['uvicorn', 'asgi:app']
+
+
+def test_relative_upload_folder_resolves_like_flask(tmp_path, monkeypatch):
+    asgi = _asgi(tmp_path, UPLOAD_FOLDER='uploads')
+    flask_only = _asgi(tmp_path, UPLOAD_FOLDER='uploads', ASGI_NATIVE_ROUTES=False)
+    for adapter in (asgi, flask_only):
+        adapter.app.root_path = str(tmp_path / 'root')
+    for base, content in ((tmp_path / 'root', 'from app root'), (tmp_path, 'from cwd')):
+        (base / 'uploads').mkdir(parents=True)
+        (base / 'uploads' / 'a.txt').write_text(content)
+    monkeypatch.chdir(tmp_path)
+
+    assert _call(asgi, 'GET', '/uploads/a.txt')[2] == b'from app root'
+    assert _call(flask_only, 'GET', '/uploads/a.txt')[2] == b'from app root'
+    assert _call(asgi, 'GET', '/uploads/')[0] == 404  # a directory is not served
@@ -0,0 +1,50 @@
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.audit import AuditFacet
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.audit import log_action, log_actions_bulk
+from apps.api.utils.audit_facets import rebuild_facets
+
+
+def test_facets_follow_every_write_path_and_feed_meta():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        db.session.add(town)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=town.id)
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+        town_id = town.id
+
+        def entry(action, entity_type='document_request'):
+            return dict(user_id=admin.id, municipality_id=town_id, entity_type=entity_type, entity_id=1, action=action)
+
+        log_action(**entry('approve'))  # ORM insert outside a request
+        log_actions_bulk([entry('approve'), entry('reject'), entry('verify', 'user')])
+        db.session.commit()
+        with app.test_request_context():
+            log_action(**entry('approve'))  # buffered, written at teardown
+
+        counts = {(f.entity_type, f.action): f.count for f in AuditFacet.query.all()}
+        assert counts == {('document_request', 'approve'): 3, ('document_request', 'reject'): 1, ('user', 'verify'): 1}
+
+        with db.engine.begin() as conn:
+            rebuild_facets(conn)
+        assert {(f.entity_type, f.action): f.count for f in AuditFacet.query.all()} == counts
+
+    meta = app.test_client().get('/api/admin/audit/meta', headers={'Authorization': f'Bearer {token}'}).get_json()
+    assert meta['entity_types'] == ['document_request', 'user']
+    assert meta['actions'] == ['approve', 'reject', 'verify']
+    assert meta['counts']['entity_types'] == {'document_request': 4, 'user': 1}
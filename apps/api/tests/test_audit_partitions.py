@@ -0,0 +1,76 @@
+import gzip
+import json
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import inspect
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.audit import AuditLog
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.audit_partitions import add_months, load_manifest, maintain_partitions, month_start
+
+
+def test_rotation_archive_and_hot_window_listing(tmp_path):
+    class Config(TestingConfig):
+        AUDIT_HOT_MONTHS = 3
+        AUDIT_ARCHIVE_AFTER_MONTHS = 12
+        AUDIT_ARCHIVE_DIR = str(tmp_path)
+
+    now = datetime.utcnow()
+    this_month = month_start(now)
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        db.session.add(town)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=town.id)
+        db.session.add(admin)
+        db.session.flush()
+        for action, months_ago in [('hot', 0), ('warm', 5), ('cold', 14), ('cold', 14)]:
+            db.session.add(AuditLog(
+                municipality_id=town.id, entity_type='user', entity_id=admin.id, action=action,
+                created_at=add_months(this_month, -months_ago).replace(day=2),
+            ))
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+
+        stats = maintain_partitions(now)
+        warm = f'audit_logs_p{add_months(this_month, -5):%Y%m}'
+        cold = add_months(this_month, -14)
+        assert stats['rotated'] == {warm: 1, f'audit_logs_p{cold:%Y%m}': 2}
+        assert [(e['month'], e['rows']) for e in stats['archived']] == [(f'{cold:%Y-%m}', 2)]
+        assert warm in inspect(db.engine).get_table_names()
+        assert AuditLog.query.count() == 1  # only the hot row stays in the base table
+
+        entry, = load_manifest()
+        with gzip.open(tmp_path / entry['file'], 'rt') as fh:
+            assert [json.loads(line)['action'] for line in fh] == ['cold', 'cold']
+
+        # A late row for the archived month goes to a second part, not over the first file
+        db.session.add(AuditLog(municipality_id=town.id, entity_type='user', entity_id=admin.id,
+                                action='late', created_at=cold.replace(day=3)))
+        db.session.commit()
+        maintain_partitions(now)
+        first, second = load_manifest()
+        assert first == entry and (second['part'], second['rows']) == (2, 1)
+        assert second['file'] == f'audit_logs/{cold:%Y%m}.part2.jsonl.gz'
+        with gzip.open(tmp_path / entry['file'], 'rt') as fh:
+            assert len(fh.readlines()) == 2
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    hot = client.get('/api/admin/audit', headers=headers).get_json()
+    assert [l['action'] for l in hot['logs']] == ['hot']
+    since = add_months(this_month, -6).isoformat()
+    wider = client.get('/api/admin/audit', query_string={'from': since}, headers=headers).get_json()
+    assert [l['action'] for l in wider['logs']] == ['hot', 'warm']
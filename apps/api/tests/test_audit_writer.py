@@ -0,0 +1,123 @@
+import threading
+
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.audit import AuditLog
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+from apps.api.utils.audit import log_action
+from apps.api.utils.audit_writer import ingest_spool
+from apps.api.utils.background import try_lock
+
+
+def _log(action):
+    log_action(user_id=None, municipality_id=1, entity_type='user', entity_id=1, action=action)
+
+
+def _actions():
+    return sorted(a for (a,) in db.session.query(AuditLog.action).all())
+
+
+def test_request_audit_rows_are_written_at_teardown_unless_rolled_back():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='035400000')
+        db.session.add(province)
+        db.session.flush()
+        town = Municipality(name='Angeles', slug='angeles', psgc_code='035401000', province_id=province.id)
+        db.session.add(town)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=town.id)
+        resident = User(username='res', email='res@example.com', password_hash='x', first_name='R',
+                        last_name='B', municipality_id=town.id)
+        db.session.add_all([admin, resident])
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+        resident_id, admin_id, town_id = resident.id, admin.id, town.id
+
+        with app.test_request_context():
+            _log('rolled_back')
+            User.query.count()
+            db.session.rollback()
+            _log('committed')
+            db.session.commit()
+            _log('dropped')
+            User.query.count()
+            db.session.rollback()
+            assert _actions() == []  # nothing written before teardown
+        assert _actions() == ['committed']
+
+    resp = app.test_client().post(f'/api/admin/users/{resident_id}/verify',
+                                  headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 200
+    with app.app_context():
+        row = AuditLog.query.filter_by(action='verify').one()
+        assert (row.entity_id, row.user_id, row.municipality_id) == (resident_id, admin_id, town_id)
+
+
+def test_spool_mode_defers_rows_to_ingest(tmp_path):
+    spool = tmp_path / 'audit.spool'
+
+    class Config(TestingConfig):
+        AUDIT_SPOOL_PATH = str(spool)
+        AUDIT_SPOOL_WORKER = False
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        for i in range(2):
+            with app.test_request_context():
+                _log(f'spooled{i}')
+        assert _actions() == []
+        assert len(spool.read_text().splitlines()) == 2
+
+        assert ingest_spool() == 2
+        assert _actions() == ['spooled0', 'spooled1']
+        assert not spool.exists() and ingest_spool() == 0
+
+
+def test_concurrent_ingests_load_a_work_file_once(tmp_path):
+    spool = tmp_path / 'audit.spool'
+
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'audit.db'}"
+        AUDIT_SPOOL_PATH = str(spool)
+        AUDIT_SPOOL_WORKER = False
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        for i in range(20):
+            with app.test_request_context():
+                _log(f'spooled{i:02d}')
+        # A leftover work file from a run that died before the unlink
+        spool.rename(f'{spool}.ingesting')
+
+        with try_lock(f'{spool}.lock'):
+            assert ingest_spool() == 0  # another ingester holds the lock: skip
+        assert (tmp_path / 'audit.spool.ingesting').exists()
+
+    results, errors, start = [], [], threading.Barrier(2)
+
+    def ingest():
+        with app.app_context():
+            start.wait()
+            try:
+                results.append(ingest_spool())
+            except Exception as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=ingest) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and sum(results) == 20
+    with app.app_context():
+        assert _actions() == [f'spooled{i:02d}' for i in range(20)]
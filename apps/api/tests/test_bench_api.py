@@ -0,0 +1,24 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.models.issue import Issue
+from apps.api.models.user import User
+from apps.api.scripts.bench_api import CASES, bench_config, compare, run
+from apps.api.scripts.bench_dataset import resolve_scale, seed_region
+
+
+def test_benchmark_cases_run_on_seeded_dataset(tmp_path):
+    app = create_app(bench_config(f"sqlite:///{tmp_path / 'bench.db'}", tmp_path / 'uploads'))
+    counts = resolve_scale('tiny', users=50, items=60, issues=40, document_requests=40, audit_logs=20)
+    with app.app_context():
+        db.create_all()
+        summary = seed_region(counts, seed=7)
+        assert User.query.count() == counts['users'] + counts['municipalities']
+        assert Issue.query.filter(Issue.geohash.isnot(None)).count() == counts['issues']
+
+    # Every case must succeed (non-200 responses raise)
+    cases = run(app, summary, repeat=1, warmup=0, export_rows=20)
+    assert list(cases) == list(CASES)
+    assert all(stats['runs'] == 1 and stats['p50_ms'] > 0 for stats in cases.values())
+
+    baseline = {'cases': {'login': {'p50_ms': cases['login']['p50_ms'] / 2}}}
+    assert compare({'cases': cases}, baseline, threshold=0.10) == ['login']
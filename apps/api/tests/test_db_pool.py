@@ -0,0 +1,103 @@
+import time
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, text
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig, get_engine_options, get_pool_settings
+from apps.api.models.user import User
+from apps.api.utils import metrics
+from apps.api.utils.db_pool import install_liveness_check, pool_status, track_overflow
+
+
+def test_pool_is_sized_from_workers_threads_and_connection_budget(monkeypatch):
+    # Defaults keep the previous 3 + 5 per worker
+    settings = get_pool_settings()
+    assert (settings['pool_size'], settings['max_overflow']) == (3, 5)
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    monkeypatch.setenv('WEB_THREADS', '4')
+    monkeypatch.setenv('DB_MAX_CONNECTIONS', '40')
+    settings = get_pool_settings()
+    assert (settings['pool_size'], settings['max_overflow']) == (6, 4)
+
+    monkeypatch.setenv('DB_POOL_SIZE', '2')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    settings = get_pool_settings()
+    assert (settings['pool_size'], settings['max_overflow']) == (2, 0)
+
+
+def test_engine_options_for_session_and_transaction_poolers(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://u:p@db.example.supabase.co:5432/postgres')
+    options = get_engine_options()
+    assert options['pool_pre_ping'] is False and options['pool_use_lifo'] is True
+    assert 'prepare_threshold' not in options['connect_args']
+
+    monkeypatch.setenv('DATABASE_URL', 'postgresql+psycopg://u:p@pooler.supabase.com:6543/postgres')
+    assert get_pool_settings()['pooler_mode'] == 'transaction'
+    assert get_engine_options()['connect_args']['prepare_threshold'] is None
+
+    monkeypatch.setenv('DATABASE_URL', 'postgresql+asyncpg://u:p@localhost/munlink')
+    monkeypatch.setenv('DB_POOLER_MODE', 'transaction')
+    connect_args = get_engine_options()['connect_args']
+    assert connect_args['statement_cache_size'] == 0 and 'keepalives' not in connect_args
+
+    monkeypatch.setenv('DB_POOL_PING_IDLE', '0')
+    assert get_engine_options()['pool_pre_ping'] is True
+
+
+def _pings(outcome):
+    return metrics.DB_PINGS.values.get((outcome,), 0)
+
+
+def test_only_idle_connections_are_pinged_and_dead_ones_replaced(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0)
+    install_liveness_check(engine, idle_seconds=0.05)
+    ok, failed = _pings('ok'), _pings('failed')
+
+    for _ in range(3):  # fresh, then recently used: no pings
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+    assert (_pings('ok'), _pings('failed')) == (ok, failed)
+
+    time.sleep(0.06)
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    assert _pings('ok') == ok + 1
+
+    time.sleep(0.06)
+    engine.dialect.do_ping = lambda dbapi_connection: False
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT 1')).scalar() == 1
+    assert _pings('failed') == failed + 1
+    engine.dispose()
+
+
+def test_overflow_usage_is_reported(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=2)
+    track_overflow(engine)
+    before = metrics.DB_OVERFLOW_CHECKOUTS.values.get((), 0)
+    first, second = engine.connect(), engine.connect()
+    assert metrics.DB_OVERFLOW.values[()] == 1
+    assert pool_status(engine)['overflow'] == 1 and pool_status(engine)['checked_out'] == 2
+    assert metrics.DB_OVERFLOW_CHECKOUTS.values[()] == before + 1
+    second.close()
+    first.close()
+    assert metrics.DB_OVERFLOW.values[()] == 0
+    engine.dispose()
+
+
+def test_admin_db_pool_endpoint():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin')
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+    resp = app.test_client().get('/api/admin/system/db-pool', headers={'Authorization': f'Bearer {token}'})
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body['settings']['pool_size'] >= 1 and 'avg_checkout_wait_ms' in body
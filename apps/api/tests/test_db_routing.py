@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from flask import request
+from flask_jwt_extended import create_access_token, decode_token, jwt_required
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.db_routing import use_primary, use_replica
+from apps.api.models.province import Province
+from apps.api.models.token_blacklist import TokenBlacklist
+from apps.api.models.user import User
+from apps.api.utils.auth import generate_verification_token
+
+
+def _app(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    config = type('Config', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+        'DB_REPLICA_URLS': [f'sqlite:///{replica}'],
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Province(name='Primary', slug='primary', psgc_code='1'))
+        db.session.commit()
+        # Same schema, different rows: shows which database served a read
+        replica_engine = app.extensions['db_replicas'][0]
+        db.metadata.create_all(replica_engine)
+        with replica_engine.begin() as conn:
+            conn.execute(Province.__table__.insert(), {'name': 'Replica', 'slug': 'replica', 'psgc_code': '2',
+                                                       'region_code': '03', 'region_name': 'Central Luzon'})
+    return app
+
+
+def _names():
+    return [p.name for p in Province.query.order_by(Province.id)]
+
+
+def test_get_requests_read_from_replica_until_they_write(tmp_path):
+    app = _app(tmp_path)
+
+    @app.route('/_test/provinces', methods=['GET', 'POST'])
+    def provinces():
+        before = _names()
+        if 'write' in request.args:
+            db.session.add(Province(name='Written', slug='written', psgc_code='3'))
+            db.session.flush()
+        with use_primary():
+            forced = _names()
+        return {'before': before, 'after': _names(), 'primary': forced}
+
+    client = app.test_client()
+    body = client.get('/_test/provinces').get_json()
+    assert body == {'before': ['Replica'], 'after': ['Replica'], 'primary': ['Primary']}
+
+    # Read-your-writes: after the flush the request stays on the primary
+    body = client.get('/_test/provinces?write=1').get_json()
+    assert body['before'] == ['Replica'] and body['after'] == ['Primary', 'Written']
+
+    assert client.post('/_test/provinces').get_json()['before'] == ['Primary']
+    assert client.get('/api/provinces').get_json()['provinces'][0]['name'] == 'Replica'
+
+
+def test_use_replica_marks_reads_outside_requests(tmp_path):
+    app = _app(tmp_path)
+    with app.app_context():
+        assert _names() == ['Primary']
+        db.session.remove()
+        with use_replica():
+            assert _names() == ['Replica']
+            assert [p.name for p in Province.query.with_for_update()] == ['Primary']
+
+
+def test_without_replicas_everything_uses_the_primary(tmp_path):
+    app = create_app(type('Config', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'p.db'}"}))
+    assert app.extensions['db_replicas'] == []
+    with app.app_context():
+        db.create_all()
+        with use_replica():
+            assert Province.query.count() == 0
+
+
+def test_token_revocation_and_email_verification_read_the_primary(tmp_path):
+    app = _app(tmp_path)
+
+    @app.route('/_test/protected')
+    @jwt_required()
+    def protected():
+        return {'ok': True}
+
+    # The replica has not caught up: it has neither the user nor the revocation
+    with app.app_context():
+        user = User(username='juan', email='juan@example.com', password_hash='x', first_name='J', last_name='D')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        link = generate_verification_token(user.id, 'email')
+        TokenBlacklist.add_token_to_blacklist(decode_token(token)['jti'], 'access', user.id,
+                                              datetime.utcnow() + timedelta(hours=1))
+
+    client = app.test_client()
+    resp = client.get('/_test/protected', headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 401
+    resp = client.get(f'/api/auth/verify-email/{link}')
+    assert resp.status_code == 200 and resp.get_json()['message'] == 'Email verified successfully'
@@ -0,0 +1,98 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.email_outbox import EmailOutbox
+from apps.api.utils.email_outbox import flush_outbox
+from apps.api.utils.email_sender import send_user_status_email
+from apps.api.utils.smtp_stub import SMTPStub
+
+
+def _app(port, **overrides):
+    class Config(TestingConfig):
+        SMTP_SERVER = '127.0.0.1'
+        SMTP_PORT = port
+        SMTP_USERNAME = 'munlink'
+        SMTP_PASSWORD = 'secret'
+        EMAIL_OUTBOX_ENABLED = True
+
+    for key, value in overrides.items():
+        setattr(Config, key, value)
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_outbox_sends_batch_over_one_connection():
+    with SMTPStub() as stub:
+        app = _app(stub.port, EMAIL_OUTBOX_BATCH_SIZE=2)
+        with app.app_context():
+            for i in range(3):
+                send_user_status_email(f'resident{i}@example.com', approved=True)
+            assert EmailOutbox.query.filter_by(status='pending').count() == 3
+            assert stub.messages == []
+
+            stats = flush_outbox()
+
+            assert stats == {'sent': 3, 'retried': 0, 'failed': 0}
+            assert EmailOutbox.query.filter_by(status='sent').count() == 3
+    assert sorted(m['to'][0] for m in stub.messages) == [f'resident{i}@example.com' for i in range(3)]
+    assert stub.connections == 1
+
+
+def test_outbox_retries_with_backoff_then_fails():
+    app = _app(1, EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_BACKOFF_SECONDS=0)
+    with app.app_context():
+        send_user_status_email('resident@example.com', approved=False, reason='Blurry ID')
+        assert flush_outbox() == {'sent': 0, 'retried': 1, 'failed': 0}
+        assert flush_outbox() == {'sent': 0, 'retried': 0, 'failed': 1}
+        row = EmailOutbox.query.one()
+        assert row.status == 'failed' and row.attempts == 2 and row.last_error
+
+
+def test_background_worker_can_be_stopped_and_restarted():
+    import time
+
+    from apps.api.utils.background import ensure_worker, stop_workers
+
+    app = create_app(TestingConfig)
+    runs = []
+    worker = ensure_worker(app, 'test-worker', 0.05, lambda: runs.append(1))
+    worker.wake()
+    deadline = time.monotonic() + 5
+    while not runs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert runs
+
+    worker.stop()
+    assert not worker.is_alive()
+    restarted = ensure_worker(app, 'test-worker', 0.05, lambda: None)
+    assert restarted is not worker and restarted.is_alive()
+    stop_workers(app)
+    assert not restarted.is_alive()
+
+
+def test_failed_wake_keeps_the_queued_row_and_failed_insert_keeps_caller_changes(monkeypatch):
+    from apps.api.models.province import Province
+    from apps.api.utils import email_outbox
+
+    with SMTPStub() as stub:
+        app = _app(stub.port)
+
+        def broken_wake():
+            raise RuntimeError('worker unavailable')
+
+        monkeypatch.setattr(email_outbox, 'wake_sender', broken_wake)
+        with app.app_context():
+            send_user_status_email('queued@example.com', approved=True)
+            assert EmailOutbox.query.count() == 1  # committed despite the wake failure
+            assert stub.messages == []  # and not sent a second time inline
+
+            # Outbox not migrated: only the savepoint rolls back, the caller's change survives
+            EmailOutbox.__table__.drop(db.engine)
+            db.session.remove()
+            db.session.add(Province(name='Pampanga', slug='pampanga', psgc_code='035400000'))
+            send_user_status_email('inline@example.com', approved=True)
+            db.session.commit()
+            assert Province.query.count() == 1
+    assert [m['to'][0] for m in stub.messages] == ['inline@example.com']
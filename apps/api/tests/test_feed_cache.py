@@ -0,0 +1,63 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.marketplace import Item
+from apps.api.utils.feed_cache import FeedCache
+
+
+def _item(title, municipality_id, status='available', category='appliances'):
+    return Item(user_id=1, municipality_id=municipality_id, title=title, description='Used', category=category,
+                condition='good', transaction_type='sell', price=100, status=status)
+
+
+def test_browse_pages_cached_and_invalidated_on_commit():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([_item('Fan', 1), _item('Desk', 2), _item('Pending TV', 1, status='pending')])
+        db.session.commit()
+        fan_id, desk_id, tv_id = (i.id for i in Item.query.order_by(Item.id))
+    client = app.test_client()
+
+    def browse(**params):
+        resp = client.get('/api/marketplace/items', query_string={'municipality_id': 1, **params})
+        return resp.headers.get('X-Feed-Cache'), [i['title'] for i in resp.get_json()['items']]
+
+    assert browse() == ('miss', ['Fan'])
+    assert browse() == ('hit', ['Fan'])
+    assert browse(q='fan')[0] is None and browse(page=9)[0] is None
+
+    with app.app_context():
+        # Changes outside the feed's scope keep the page
+        db.session.get(Item, desk_id).price = 50
+        db.session.get(Item, tv_id).title = 'Pending LED TV'
+        db.session.commit()
+        db.session.get(Item, fan_id).price = 80
+        db.session.rollback()
+    assert browse()[0] == 'hit'
+
+    with app.app_context():
+        db.session.get(Item, tv_id).status = 'available'  # admin approval
+        db.session.commit()
+    assert browse() == ('miss', ['Pending LED TV', 'Fan'])
+
+    with app.app_context():
+        db.session.get(Item, fan_id).is_active = False  # soft delete
+        db.session.commit()
+    assert browse() == ('miss', ['Pending LED TV'])
+
+    with app.app_context():
+        db.session.get(Item, desk_id).municipality_id = 1  # moved into this municipality
+        db.session.commit()
+    assert browse()[0] == 'miss'
+
+
+def test_page_built_across_an_invalidation_is_not_cached():
+    cache = FeedCache()
+    key = (1, None, None, 1, 20)
+    generation = cache.generation
+    cache.invalidate([(1, 'appliances', 'sell')])  # a commit lands while the page is queried
+    assert cache.put(key, '{"items": []}', generation=generation) is False
+    assert cache.get(key) is None
+    assert cache.put(key, '{"items": []}', generation=cache.generation) is True
+    assert cache.get(key) == '{"items": []}'
@@ -0,0 +1,92 @@
+from sqlalchemy import event
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.announcement import Announcement
+from apps.api.models.marketplace import Item
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+
+
+def _seed(app):
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='P-1')
+        db.session.add(province)
+        db.session.flush()
+        muni = Municipality(name='San Fernando', slug='san-fernando', psgc_code='M-1', province_id=province.id)
+        db.session.add(muni)
+        db.session.flush()
+        user = User(username='seller', email='seller@example.com', password_hash='x',
+                    first_name='Maria', last_name='Santos', municipality_id=muni.id)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Item(
+            user_id=user.id, municipality_id=muni.id, title='Electric fan', description='Used',
+            category='appliances', condition='good', transaction_type='sell', price=1500, status='available',
+        ))
+        db.session.add(Announcement(title='Road closure', content='Detour via Lazatin',
+                                    municipality_id=muni.id, created_by=user.id))
+        db.session.commit()
+        return user.id
+
+
+def _capture_selects(app):
+    statements = []
+
+    def before(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before)
+    return statements
+
+
+def test_item_fields_project_columns():
+    app = create_app(TestingConfig)
+    user_id = _seed(app)
+    client = app.test_client()
+
+    full = client.get('/api/marketplace/items').get_json()['items'][0]
+    assert 'user' in full and 'description' in full
+
+    statements = _capture_selects(app)
+    resp = client.get('/api/marketplace/items', query_string={'fields': 'id,title,price,seller,municipality_name'})
+    assert resp.status_code == 200
+    item = resp.get_json()['items'][0]
+    assert item == {
+        'id': full['id'], 'title': 'Electric fan', 'price': 1500.0,
+        'seller': full['seller'], 'municipality_name': 'San Fernando',
+    }
+    assert item['seller']['id'] == user_id
+
+    page_query = [s for s in statements if 'LIMIT' in s.upper()]
+    assert len(page_query) == 1
+    # Only the requested columns are selected, and no lazy loads follow
+    assert 'items.description' not in page_query[0] and 'password_hash' not in page_query[0]
+    assert 'items.title' in page_query[0] and '.email AS' in page_query[0]
+    assert len(statements) == 2  # count + page
+
+
+def test_unknown_fields_rejected():
+    app = create_app(TestingConfig)
+    _seed(app)
+    client = app.test_client()
+    resp = client.get('/api/marketplace/items', query_string={'fields': 'id,password'})
+    assert resp.status_code == 400
+    assert 'password' in resp.get_json()['details']
+    assert client.get('/api/issues', query_string={'fields': 'geohash'}).status_code == 400
+
+
+def test_announcement_fields_match_to_dict():
+    app = create_app(TestingConfig)
+    _seed(app)
+    client = app.test_client()
+    full = client.get('/api/announcements').get_json()['announcements'][0]
+    sparse = client.get('/api/announcements', query_string={'fields': 'title, creator_name,images'}).get_json()
+    assert sparse['announcements'][0] == {
+        'title': full['title'], 'creator_name': 'Maria Santos', 'images': [],
+    }
@@ -0,0 +1,71 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.issue import Issue
+from apps.api.utils.geo import encode, decode_bounds, next_prefix
+
+# San Fernando, Pampanga city hall
+LAT, LNG = 15.0286, 120.6898
+
+
+def _issue(n, lat, lng, **kwargs):
+    return Issue(
+        issue_number=f'GEO-{n}', user_id=1, category_id=1, municipality_id=1,
+        title=f'Issue {n}', description='Pothole', latitude=lat, longitude=lng, **kwargs,
+    )
+
+
+def test_geohash_helpers():
+    gh = encode(LAT, LNG)
+    min_lat, min_lon, max_lat, max_lon = decode_bounds(gh)
+    assert min_lat <= LAT <= max_lat and min_lon <= LNG <= max_lon
+    assert next_prefix('wdw4') == 'wdw5' and next_prefix('wdz') == 'we' and next_prefix('zz') is None
+
+
+def test_nearby_and_clusters():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            _issue(1, LAT, LNG),                     # at the center
+            _issue(2, LAT + 0.003, LNG),             # ~330 m north
+            _issue(3, LAT, LNG + 0.02),              # ~2.1 km east
+            _issue(4, 14.5995, 120.9842),            # Manila, far away
+            _issue(5, LAT + 0.001, LNG, is_public=False),
+            _issue(6, None, None),
+        ])
+        db.session.commit()
+        moved = Issue.query.filter_by(issue_number='GEO-4').one()
+        moved.latitude, moved.longitude = LAT - 0.004, LNG  # ~440 m south
+        db.session.commit()
+        assert moved.geohash == encode(LAT - 0.004, LNG)
+
+    client = app.test_client()
+    resp = client.get('/api/issues/nearby', query_string={'lat': LAT, 'lng': LNG, 'radius': 1000}).get_json()
+    assert [i['issue_number'] for i in resp['issues']] == ['GEO-1', 'GEO-2', 'GEO-4']
+    assert resp['issues'][0]['distance_m'] == 0
+
+    bbox = f'{LNG - 0.05},{LAT - 0.05},{LNG + 0.05},{LAT + 0.05}'
+    assert client.get('/api/issues/nearby', query_string={'bbox': bbox}).get_json()['count'] == 4
+    assert client.get('/api/issues/nearby').status_code == 400
+
+    far = client.get('/api/issues/clusters', query_string={'bbox': bbox, 'zoom': 8}).get_json()
+    assert far['total'] == 4 and len(far['clusters']) == 1
+    near = client.get('/api/issues/clusters', query_string={'bbox': bbox, 'zoom': 16}).get_json()
+    assert near['total'] == 4 and len(near['clusters']) > 1
+
+
+def test_nearby_candidate_cap_keeps_the_nearest_issues(monkeypatch):
+    from apps.api.routes import issues as issue_routes
+
+    monkeypatch.setattr(issue_routes, 'NEARBY_CANDIDATE_LIMIT', 3)
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        # Far ones first, so id order alone would fill the cap with them
+        db.session.add_all([_issue(n, LAT + 0.005 + n * 0.0001, LNG) for n in range(1, 6)])
+        db.session.add_all([_issue(10, LAT + 0.0005, LNG), _issue(11, LAT, LNG)])
+        db.session.commit()
+
+    resp = app.test_client().get('/api/issues/nearby', query_string={'lat': LAT, 'lng': LNG, 'radius': 2000})
+    assert [i['issue_number'] for i in resp.get_json()['issues']] == ['GEO-11', 'GEO-10', 'GEO-1']
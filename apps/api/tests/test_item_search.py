@@ -0,0 +1,42 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.marketplace import Item
+
+
+def _item(title, description, **kwargs):
+    values = dict(
+        user_id=1, municipality_id=1, category='electronics', condition='good',
+        transaction_type='sell', status='available', is_active=True,
+    )
+    values.update(kwargs)
+    return Item(title=title, description=description, **values)
+
+
+def test_list_items_full_text_search_is_ranked_and_tracks_updates():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            _item('Electric fan', 'Standing electric fan, barely used'),
+            _item('Rice cooker', 'Works well; comes with a spare fan filter'),
+            _item('Study table', 'Wooden, foldable legs', category='furniture'),
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    titles = [i['title'] for i in client.get('/api/marketplace/items?q=fan').get_json()['items']]
+    # Title hits rank above description-only hits
+    assert titles == ['Electric fan', 'Rice cooker']
+
+    # Prefix matching and the existing filters still apply
+    resp = client.get('/api/marketplace/items?q=elec&category=electronics').get_json()
+    assert [i['title'] for i in resp['items']] == ['Electric fan'] and resp['total'] == 1
+    assert client.get('/api/marketplace/items?q=fan&category=furniture').get_json()['total'] == 0
+
+    with app.app_context():
+        table = Item.query.filter_by(title='Study table').one()
+        table.title = 'Study desk'
+        db.session.commit()
+    assert [i['title'] for i in client.get('/api/marketplace/items?q=desk').get_json()['items']] == ['Study desk']
+    assert client.get('/api/marketplace/items?q=table').get_json()['total'] == 0
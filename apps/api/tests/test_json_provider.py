@@ -0,0 +1,41 @@
+from datetime import datetime
+from decimal import Decimal
+
+from flask import jsonify, request
+
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.utils.json_provider import OrjsonProvider
+
+
+def test_orjson_provider_handles_native_types_and_falls_back():
+    app = create_app(TestingConfig)
+    assert isinstance(app.json, OrjsonProvider)
+
+    @app.route('/_json_echo', methods=['POST'])
+    def echo():
+        return jsonify({
+            'received': request.get_json(),
+            'when': datetime(2026, 10, 19, 8, 30, 0, 5),
+            'price': Decimal('1500.50'),
+            'tags': {'only'},
+            'huge': 2 ** 70,  # beyond orjson's range: stdlib fallback
+            'title': 'Parañaque',
+        })
+
+    resp = app.test_client().post('/_json_echo', json={'q': 'kalsada', 3: 'x'})
+    assert resp.mimetype == 'application/json'
+    assert resp.get_json() == {
+        'received': {'q': 'kalsada', '3': 'x'},
+        'when': '2026-10-19T08:30:00.000005',  # ISO on both paths
+        'price': '1500.50',
+        'tags': ['only'],
+        'huge': 2 ** 70,
+        'title': 'Parañaque',
+    }
+    assert app.json.dumps({'when': datetime(2026, 10, 19, 8, 30)}) == '{"when":"2026-10-19T08:30:00"}'
+
+    class Stdlib(TestingConfig):
+        JSON_PROVIDER = 'default'
+
+    assert not isinstance(create_app(Stdlib).json, OrjsonProvider)
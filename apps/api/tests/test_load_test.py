@@ -0,0 +1,20 @@
+from apps.api.scripts.bench_dataset import resolve_scale
+from apps.api.scripts.load_test import DEFAULT_MIX, percentile, run_load, start_local_server, stop_local_server
+
+
+def test_load_test_runs_every_scenario_without_errors(tmp_path):
+    counts = resolve_scale('tiny', users=40, items=60, issues=40, document_requests=40, audit_logs=20)
+    base_url, server = start_local_server(f"sqlite:///{tmp_path / 'load.db'}", counts, seed=5,
+                                          upload_folder=tmp_path / 'uploads')
+    try:
+        report = run_load(base_url, counts, concurrency=2, duration=60, iterations=12, seed=5)
+    finally:
+        stop_local_server(server)
+
+    assert set(report['scenarios']) == set(DEFAULT_MIX)
+    assert report['total']['requests'] > 0 and report['total']['errors'] == 0, report['endpoints']
+    for name in ('POST /api/auth/login', 'GET /api/marketplace/items', 'GET /api/admin/dashboard/stats'):
+        row = report['endpoints'][name]
+        assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms'] <= row['max_ms']
+    assert report['endpoints']['GET /api/marketplace/items']['avg_queries'] >= 0
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
@@ -0,0 +1,117 @@
+import json
+import os
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.utils import metrics
+
+
+def _sample(body, line_prefix):
+    for line in body.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def _checkouts_timed():
+    counts = metrics.snapshot()['munlink_db_pool_checkout_seconds'].get('[]', [0.0])
+    return sum(counts[:-1])  # bucket counts; the last slot is the sum
+
+
+def _app(**overrides):
+    config = type('Config', (TestingConfig,), overrides)
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_request_metrics_in_text_exposition_format():
+    app = _app(DEBUG=True)  # no METRICS_TOKEN: only served in DEBUG
+    client = app.test_client()
+    requests_line = ('munlink_http_requests_total'
+                     '{endpoint="marketplace.list_items",method="GET",status="200"}')
+    count_line = ('munlink_http_request_duration_seconds_count'
+                  '{endpoint="marketplace.list_items",method="GET"}')
+    before = client.get('/metrics').get_data(as_text=True)
+
+    for _ in range(3):
+        assert client.get('/api/marketplace/items').status_code == 200
+    client.get('/no/such/path')
+
+    resp = client.get('/metrics')
+    body = resp.get_data(as_text=True)
+    assert resp.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert '# TYPE munlink_http_request_duration_seconds histogram' in body
+    assert _sample(body, requests_line) - _sample(before, requests_line) == 3
+    assert _sample(body, count_line) - _sample(before, count_line) == 3
+    inf_line = ('munlink_http_request_duration_seconds_bucket'
+                '{endpoint="marketplace.list_items",method="GET",le="+Inf"}')
+    assert _sample(body, inf_line) == _sample(body, count_line)
+    assert 'endpoint="unmatched",method="GET",status="404"' in body
+    assert _sample(body, 'munlink_db_pool_checkouts_total') > 0
+    # The scrape itself is still in flight
+    assert _sample(body, 'munlink_http_requests_in_flight{endpoint="marketplace.list_items"}') == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = metrics.Histogram('munlink_test_seconds', 'test', ('kind',), buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.5, 3.0):
+            hist.observe(value, kind='a')
+        body = metrics.render({'munlink_test_seconds': metrics.snapshot()['munlink_test_seconds']})
+        assert 'munlink_test_seconds_bucket{kind="a",le="0.1"} 1.0' in body
+        assert 'munlink_test_seconds_bucket{kind="a",le="1.0"} 3.0' in body
+        assert 'munlink_test_seconds_bucket{kind="a",le="+Inf"} 4.0' in body
+        assert 'munlink_test_seconds_count{kind="a"} 4.0' in body
+        assert 'munlink_test_seconds_sum{kind="a"} 4.05' in body
+    finally:
+        metrics.REGISTRY.pop('munlink_test_seconds')
+
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    app = _app(METRICS_DIR=str(tmp_path), METRICS_TOKEN='s3cret')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer s3cre'}).status_code == 401
+
+    key = json.dumps(['marketplace.list_items', 'GET', '200'])
+    gauge_key = json.dumps(['marketplace.list_items'])
+    dead_pid = 2 ** 22 + 12345  # above the default pid_max, never running
+    for pid in (os.getppid(), dead_pid):
+        (tmp_path / f'metrics-{pid}.json').write_text(json.dumps({'pid': pid, 'metrics': {
+            'munlink_http_requests_total': {key: 5.0},
+            'munlink_http_requests_in_flight': {gauge_key: 2.0},
+        }}))
+
+    body = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).get_data(as_text=True)
+    live = metrics.snapshot()
+    own = live['munlink_http_requests_total'].get(key, 0.0)
+    own_gauge = live['munlink_http_requests_in_flight'].get(gauge_key, 0.0)
+    line = 'munlink_http_requests_total{endpoint="marketplace.list_items",method="GET",status="200"}'
+    # Counters from exited workers are kept; their gauges are not
+    assert _sample(body, line) == own + 10
+    assert _sample(body, 'munlink_http_requests_in_flight{endpoint="marketplace.list_items"}') == own_gauge + 2
+    # The scraping worker wrote its own snapshot
+    assert (tmp_path / f'metrics-{os.getpid()}.json').exists()
+
+
+def test_metrics_without_a_token_are_hidden_outside_debug():
+    app = _app(DEBUG=False, METRICS_TOKEN='')
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_pool_metrics_survive_dispose_and_cover_replicas(tmp_path):
+    from sqlalchemy import text
+
+    app = _app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+               DB_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    with app.app_context():
+        engines = [db.engine, app.extensions['db_replicas'][0]]
+    for engine in engines:
+        engine.dispose()  # swaps in a new pool
+        before = _checkouts_timed()
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        assert _checkouts_timed() == before + 1
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.user import User
+from apps.api.utils.profiler import StackSampler
+
+
+def _app(tmp_path, **overrides):
+    config = type('Config', (TestingConfig,), {'PROFILE_DIR': str(tmp_path), **overrides})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin')
+        resident = User(username='res', email='res@example.com', password_hash='x', first_name='R',
+                        last_name='S')
+        db.session.add_all([admin, resident])
+        db.session.commit()
+        tokens = {
+            'admin': create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'}),
+            'resident': create_access_token(identity=str(resident.id), additional_claims={'role': 'resident'}),
+        }
+    return app, tokens
+
+
+def test_admin_header_profiles_request_and_listing_serves_it(tmp_path):
+    app, tokens = _app(tmp_path)
+    client = app.test_client()
+    admin = {'Authorization': f"Bearer {tokens['admin']}"}
+
+    resp = client.get('/api/marketplace/items', headers={**admin, 'X-Profile': 'cprofile'})
+    name = resp.headers['X-Profile-Id']
+    assert resp.status_code == 200 and name.endswith('.prof')
+
+    listing = client.get('/api/admin/system/profiles', headers=admin).get_json()['profiles']
+    assert listing[0]['name'] == name
+    assert listing[0]['endpoint'] == 'marketplace.list_items' and listing[0]['trigger'] == 'header'
+
+    download = client.get(f'/api/admin/system/profiles/{name}', headers=admin)
+    assert download.status_code == 200 and len(download.data) > 0
+    assert client.get('/api/admin/system/profiles/..%2Fsecret.prof', headers=admin).status_code == 404
+    resident = {'Authorization': f"Bearer {tokens['resident']}"}
+    assert client.get('/api/admin/system/profiles', headers=resident).status_code == 403
+
+
+def test_header_ignored_for_non_admins_and_sampling_honours_endpoint_filter(tmp_path):
+    app, tokens = _app(tmp_path, PROFILE_SAMPLE_RATE=1.0, PROFILE_ENDPOINTS='issues.list_issues',
+                       PROFILE_MAX_FILES=2)
+    client = app.test_client()
+    resident = {'Authorization': f"Bearer {tokens['resident']}", 'X-Profile': '1'}
+
+    assert 'X-Profile-Id' not in client.get('/api/marketplace/items', headers=resident).headers
+    names = [client.get('/api/issues').headers['X-Profile-Id'] for _ in range(3)]
+    assert all(n.endswith('.folded') for n in names)
+    # Only the newest PROFILE_MAX_FILES profiles are kept
+    assert sorted(p.name for p in tmp_path.glob('*.folded')) == sorted(names[1:])
+
+
+def test_stack_sampler_writes_collapsed_stacks(tmp_path):
+    def slow_work():
+        time.sleep(0.05)
+
+    sampler = StackSampler(threading.get_ident(), 0.002)
+    sampler.start()
+    slow_work()
+    sampler.stop()
+    sampler.dump(tmp_path / 'out.folded')
+
+    lines = (tmp_path / 'out.folded').read_text().splitlines()
+    assert sampler.samples > 0
+    assert any('test_stack_sampler_writes_collapsed_stacks' in line and ';slow_work (' in line for line in lines)
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) >= 1 and ';' in stack
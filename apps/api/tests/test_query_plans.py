@@ -0,0 +1,154 @@
+"""Query-plan regression test for the hot list and stats endpoints.
+
+Seeds a few thousand rows per table, runs ANALYZE, calls each endpoint and
+EXPLAINs every SELECT it issued. A full scan of a large table, or a temp
+B-tree sort for ``ORDER BY created_at``, means an index no longer matches
+the query shape.
+"""
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert, text
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.announcement import Announcement
+from apps.api.models.document import DocumentRequest, DocumentType
+from apps.api.models.issue import Issue, IssueCategory
+from apps.api.models.marketplace import Item, Transaction
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.user import User
+
+MUNICIPALITIES = 40
+ROWS = 4000
+LARGE_TABLES = ('items', 'issues', 'document_requests', 'announcements', 'users', 'transactions')
+
+ENDPOINTS = [
+    ('/api/marketplace/items', {'municipality_id': 1}),
+    ('/api/marketplace/items', {'municipality_id': 1, 'category': 'appliances'}),
+    ('/api/marketplace/items', {}),
+    ('/api/issues', {'municipality_id': 1}),
+    ('/api/issues', {'municipality_id': 1, 'status': 'submitted'}),
+    ('/api/issues', {}),
+    ('/api/announcements', {'municipality_id': 1}),
+    ('/api/announcements', {}),
+    ('/api/admin/users/pending', {}),
+    ('/api/admin/users/verified', {}),
+    ('/api/admin/users/stats', {}),
+    ('/api/admin/issues', {}),
+    ('/api/admin/issues', {'status': 'in_progress'}),
+    ('/api/admin/issues/stats', {}),
+    ('/api/admin/marketplace/pending', {}),
+    ('/api/admin/marketplace/stats', {}),
+    ('/api/admin/announcements', {}),
+    ('/api/admin/announcements/stats', {}),
+    ('/api/admin/dashboard/stats', {}),
+    ('/api/admin/documents/requests', {}),
+    ('/api/admin/documents/requests', {'status': 'pending'}),
+    ('/api/admin/documents/stats', {}),
+    ('/api/admin/transactions', {'status': 'pending'}),
+]
+
+# Counting every public issue across municipalities reads most of the table;
+# a scan is the right plan there (the page query still uses the index).
+ALLOWED = {('/api/issues', 'SCAN issues', 'SELECT count(')}
+
+
+def _seed():
+    start = datetime(2026, 1, 1)
+    province = Province(name='Pampanga', slug='pampanga', psgc_code='P')
+    db.session.add(province)
+    db.session.flush()
+    db.session.add_all([
+        Municipality(name=f'Town {m}', slug=f'town-{m}', psgc_code=f'M{m}', province_id=province.id)
+        for m in range(1, MUNICIPALITIES + 1)
+    ])
+    db.session.add_all([IssueCategory(name='Roads', slug='roads'),
+                        DocumentType(name='Clearance', code='CLR', authority_level='municipal')])
+    admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A', last_name='B',
+                 role='municipal_admin', admin_municipality_id=1)
+    db.session.add(admin)
+    db.session.commit()
+
+    def rows(build):
+        return [build(i, 1 + i % MUNICIPALITIES, start + timedelta(minutes=i)) for i in range(ROWS)]
+
+    statuses = ('pending', 'available', 'rejected', 'reserved')
+    conn = db.session.connection()
+    conn.execute(insert(User), rows(lambda i, m, ts: {
+        'username': f'u{i}', 'email': f'u{i}@example.com', 'password_hash': 'x', 'first_name': 'F',
+        'last_name': 'L', 'role': 'resident', 'municipality_id': m, 'admin_verified': i % 3 == 0,
+        'is_active': True, 'created_at': ts,
+    }))
+    conn.execute(insert(Item), rows(lambda i, m, ts: {
+        'user_id': 2 + i, 'municipality_id': m, 'title': f'Item {i}', 'description': 'd',
+        'category': ('appliances', 'furniture')[i % 2], 'condition': 'good', 'transaction_type': 'sell',
+        'status': statuses[i % 4], 'is_active': i % 10 != 0, 'created_at': ts,
+    }))
+    conn.execute(insert(Issue), rows(lambda i, m, ts: {
+        'issue_number': f'ISS-{i}', 'user_id': 2 + i, 'category_id': 1, 'municipality_id': m, 'title': 't',
+        'description': 'd', 'status': ('submitted', 'in_progress', 'resolved')[i % 3],
+        'is_public': i % 5 != 0, 'created_at': ts,
+    }))
+    conn.execute(insert(DocumentRequest), rows(lambda i, m, ts: {
+        'request_number': f'DOC-{i}', 'user_id': 2 + i, 'document_type_id': 1, 'municipality_id': m,
+        'delivery_method': 'digital', 'purpose': 'p', 'status': ('pending', 'ready')[i % 2], 'created_at': ts,
+    }))
+    conn.execute(insert(Announcement), rows(lambda i, m, ts: {
+        'title': 't', 'content': 'c', 'municipality_id': m, 'created_by': 1, 'priority': 'medium',
+        'is_active': i % 4 != 0, 'created_at': ts, 'updated_at': ts,
+    }))
+    conn.execute(insert(Transaction), rows(lambda i, m, ts: {
+        'item_id': 1 + i, 'buyer_id': 2 + i, 'seller_id': 2 + (i + 1) % ROWS, 'transaction_type': 'sell',
+        'status': ('pending', 'completed', 'cancelled')[i % 3], 'created_at': ts,
+    }))
+    conn.execute(text('ANALYZE'))
+    db.session.commit()
+    return create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+
+
+def _bad_steps(conn, path, params, statement, bound):
+    problems = []
+    for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', bound).fetchall():
+        detail = row[-1]
+        for table in LARGE_TABLES:
+            if detail == f'SCAN {table}':
+                allowed = not params and any(
+                    path == p and detail == d and statement.startswith(prefix) for p, d, prefix in ALLOWED
+                )
+                if not allowed:
+                    problems.append(detail)
+        if 'USE TEMP B-TREE FOR ORDER BY' in detail and 'created_at' in statement.split('ORDER BY')[-1]:
+            problems.append(detail)
+    return problems
+
+
+def test_hot_queries_use_indexes():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        token = _seed()
+        captured = []
+
+        def before(conn, cursor, statement, params, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, params))
+
+        event.listen(db.engine, 'before_cursor_execute', before)
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    failures = {}
+    for path, params in ENDPOINTS:
+        captured.clear()
+        resp = client.get(path, query_string=params, headers=headers)
+        assert resp.status_code == 200, (path, resp.get_json())
+        with app.app_context():
+            with db.engine.connect() as conn:
+                for statement, bound in captured:
+                    problems = _bad_steps(conn, path, params, statement, bound)
+                    if problems:
+                        failures.setdefault(f'{path} {params}', []).append((problems, statement[-300:]))
+    assert not failures, failures
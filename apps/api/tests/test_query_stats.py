@@ -0,0 +1,77 @@
+import json
+import logging
+
+from flask_jwt_extended import create_access_token
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.marketplace import Item
+from apps.api.models.municipality import Municipality
+from apps.api.models.province import Province
+from apps.api.models.transfer import TransferRequest
+from apps.api.models.user import User
+from apps.api.utils.query_stats import normalize_sql
+
+
+def _seed(app, rows=10):
+    with app.app_context():
+        db.create_all()
+        province = Province(name='Pampanga', slug='pampanga', psgc_code='P-1')
+        db.session.add(province)
+        db.session.flush()
+        towns = [Municipality(name=f'Town {i}', slug=f'town-{i}', psgc_code=f'M-{i}', province_id=province.id)
+                 for i in range(2)]
+        db.session.add_all(towns)
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', password_hash='x', first_name='A',
+                     last_name='B', role='municipal_admin', admin_municipality_id=towns[0].id)
+        db.session.add(admin)
+        for i in range(rows):
+            user = User(username=f'r{i}', email=f'r{i}@example.com', password_hash='x', first_name='R',
+                        last_name=str(i), municipality_id=towns[0].id)
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Item(user_id=user.id, municipality_id=towns[i % 2].id, title=f'Item {i}',
+                                description='d', category='tools', condition='good', transaction_type='sell',
+                                price=10, status='available'))
+            db.session.add(TransferRequest(user_id=user.id, from_municipality_id=towns[0].id,
+                                           to_municipality_id=towns[1].id, status='pending'))
+        db.session.commit()
+        return create_access_token(identity=str(admin.id), additional_claims={'role': 'municipal_admin'})
+
+
+def test_headers_report_query_count_and_db_time():
+    app = create_app(TestingConfig)
+    _seed(app, rows=2)
+    resp = app.test_client().get('/api/marketplace/items', query_string={'q': 'item'})
+    assert int(resp.headers['X-Query-Count']) >= 1
+    assert resp.headers['Server-Timing'].startswith('db;dur=') and 'app;dur=' in resp.headers['Server-Timing']
+
+
+def test_slow_queries_logged_with_call_site(caplog):
+    class Config(TestingConfig):
+        SLOW_QUERY_MS = 0
+
+    app = create_app(Config)
+    _seed(app, rows=1)
+    with caplog.at_level(logging.WARNING, logger='munlink.slow_query'):
+        app.test_client().get('/api/issues', query_string={'municipality_id': 42})
+    entries = [json.loads(r.getMessage()) for r in caplog.records if r.name == 'munlink.slow_query']
+    issue_query = next(e for e in entries if 'FROM issues' in e['sql'])
+    assert issue_query['path'] == '/api/issues' and issue_query['call_site'].startswith('routes/issues.py:')
+    assert normalize_sql("SELECT *  FROM t WHERE id IN (1, 2, 3) AND name = 'x''y' LIMIT 20") == \
+        'SELECT * FROM t WHERE id IN (?...) AND name = ? LIMIT ?'
+
+
+def test_list_endpoints_stay_within_query_budget(query_budget):
+    app = create_app(TestingConfig)
+    token = _seed(app, rows=10)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Budgets do not grow with the number of rows (no per-row lazy loads)
+    with query_budget(2):
+        assert client.get('/api/marketplace/items', query_string={'status': 'available'}).status_code == 200
+    with query_budget(6):
+        assert client.get('/api/admin/transfers', headers=headers).status_code == 200
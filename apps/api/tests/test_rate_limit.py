@@ -0,0 +1,59 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.utils.rate_limit import RateLimiter, MemoryBackend, SQLiteBackend
+
+
+def test_sliding_window_blocks_after_limit():
+    limiter = RateLimiter(MemoryBackend())
+    results = [limiter.hit('login:ip', '1.2.3.4', limit=3, window=60)[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+    # Other keys are unaffected
+    assert limiter.hit('login:ip', '5.6.7.8', limit=3, window=60)[0] is True
+    stats = limiter.stats()
+    assert stats['blocked_total'] == 1
+    assert stats['scopes']['login:ip'] == {'allowed': 4, 'blocked': 1}
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = tmp_path / 'limits.db'
+    a = RateLimiter(SQLiteBackend(path))
+    b = RateLimiter(SQLiteBackend(path))
+    assert a.hit('login:account', 'juan', limit=2, window=60)[0] is True
+    assert b.hit('login:account', 'juan', limit=2, window=60)[0] is True
+    allowed, retry_after = a.hit('login:account', 'juan', limit=2, window=60)
+    assert allowed is False and retry_after > 0
+
+
+def test_login_is_throttled_before_user_lookup():
+    class Config(TestingConfig):
+        LOGIN_RATE_LIMIT_IP = '2/60'
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    codes = [
+        client.post('/api/auth/login', json={'username': 'juan', 'password': 'x'}).status_code
+        for _ in range(3)
+    ]
+    assert codes == [401, 401, 429]
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_ip_limit():
+    def attempts(forwarded_for, **overrides):
+        config = type('Config', (TestingConfig,), {'LOGIN_RATE_LIMIT_IP': '2/60', **overrides})
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+        client = app.test_client()
+        return [
+            client.post('/api/auth/login', json={'username': f'juan{i}', 'password': 'x'},
+                        headers={'X-Forwarded-For': forwarded_for(i)}).status_code
+            for i in range(3)
+        ]
+
+    # No proxy in front (the default): the header is ignored entirely
+    assert attempts(lambda i: f'10.0.0.{i}') == [401, 401, 429]
+    # Behind Render's proxy, which appends the real address after whatever the client sent
+    assert attempts(lambda i: f'10.0.0.{i}, 203.0.113.7', RATE_LIMIT_TRUSTED_PROXIES=1) == [401, 401, 429]
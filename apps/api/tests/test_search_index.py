@@ -0,0 +1,80 @@
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.announcement import Announcement
+from apps.api.models.issue import Issue
+from apps.api.models.search import SearchDocument
+from apps.api.utils.search_index import fold
+
+
+def _issue(n, title, description, municipality_id=1, **kwargs):
+    return Issue(
+        issue_number=f'ISS-{n}', user_id=1, category_id=1, title=title,
+        description=description, municipality_id=municipality_id, **kwargs,
+    )
+
+
+def test_fold_merges_spelling_variants():
+    assert fold('Pilipinas') == fold('Filipinas')
+    assert fold('Calsada') == fold('kalsada')
+    assert fold('Tsinelas') == fold('chinelas')
+    assert fold('Parañaque') == fold('Paranaque')
+
+
+def test_issue_and_announcement_search_is_fuzzy_scoped_and_incremental():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            _issue(1, 'Baradong kanal sa kalsada', 'Tumataas ang baha tuwing umuulan'),
+            _issue(2, 'Streetlight not working', 'Dark corner near the barangay hall'),
+            _issue(3, 'Baradong kanal', 'Same problem in another town', municipality_id=2),
+            _issue(4, 'Private complaint about kanal', 'Not public', is_public=False),
+        ])
+        db.session.add(Announcement(
+            title='Libreng bakuna', content='Vaccination drive sa covered court', municipality_id=1, created_by=1,
+        ))
+        db.session.commit()
+
+    client = app.test_client()
+
+    def issue_titles(**params):
+        return [i['title'] for i in client.get('/api/issues', query_string=params).get_json()['issues']]
+
+    # Spelling variant + municipality scoping; private issues stay hidden
+    assert issue_titles(q='calsada', municipality_id=1) == ['Baradong kanal sa kalsada']
+    assert sorted(issue_titles(q='kanal')) == ['Baradong kanal', 'Baradong kanal sa kalsada']
+    # One-letter typo still matches
+    assert issue_titles(q='streetlite') == ['Streetlight not working']
+    assert issue_titles(q='xyzzy') == []
+
+    anns = client.get('/api/announcements', query_string={'q': 'bakunah', 'municipality_id': 1}).get_json()
+    assert [a['title'] for a in anns['announcements']] == ['Libreng bakuna']
+
+    with app.app_context():
+        issue = Issue.query.filter_by(issue_number='ISS-2').one()
+        issue.title = 'Poste ng ilaw sira'
+        db.session.commit()
+        db.session.delete(Announcement.query.one())
+        db.session.commit()
+        assert SearchDocument.query.filter_by(entity_type='announcement').count() == 0
+
+    assert issue_titles(q='poste ilaw') == ['Poste ng ilaw sira']
+    assert client.get('/api/announcements', query_string={'q': 'bakuna'}).get_json()['pagination']['total'] == 0
+
+
+def test_route_filters_apply_before_the_candidate_cap():
+    class Config(TestingConfig):
+        SEARCH_MAX_CANDIDATES = 2
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        # The private issues outrank the public one and would fill a capped candidate list
+        db.session.add_all([_issue(1, 'Baradong kanal', 'Public')])
+        db.session.add_all([_issue(n, 'Baradong kanal', 'Private', is_public=False) for n in range(2, 6)])
+        db.session.commit()
+
+    resp = app.test_client().get('/api/issues', query_string={'q': 'kanal'}).get_json()
+    assert [i['description'] for i in resp['issues']] == ['Public']
+    assert resp['pagination']['total'] == 1
@@ -0,0 +1,82 @@
+from sqlalchemy import event
+
+from apps.api import db
+from apps.api.app import create_app
+from apps.api.config import TestingConfig
+from apps.api.models.marketplace import Item
+from apps.api.utils.background import try_lock
+from apps.api.utils.view_counter import flush_views
+
+
+def _item(app):
+    with app.app_context():
+        db.create_all()
+        item = Item(user_id=1, municipality_id=1, title='Bike', description='Used', category='sports',
+                    condition='good', transaction_type='sell', price=2500, status='available')
+        db.session.add(item)
+        db.session.commit()
+        return item.id
+
+
+def _writes(app):
+    writes = []
+
+    def before(conn, cursor, statement, params, context, executemany):
+        if not statement.lstrip().upper().startswith('SELECT'):
+            writes.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before)
+    return writes
+
+
+def test_views_are_coalesced_and_flushed():
+    app = create_app(TestingConfig)
+    item_id = _item(app)
+    writes = _writes(app)
+    client = app.test_client()
+
+    for n in range(1, 4):
+        assert client.get(f'/api/marketplace/items/{item_id}').get_json()['view_count'] == n
+    assert writes == []  # GETs stay read-only
+
+    with app.app_context():
+        assert flush_views() == 1
+        assert len(writes) == 1 and writes[0].lstrip().upper().startswith('UPDATE')
+        assert db.session.get(Item, item_id).view_count == 3
+        assert flush_views() == 0
+
+
+def test_views_spool_to_shared_log(tmp_path):
+    spool = tmp_path / 'views.log'
+    app = create_app(TestingConfig)
+    app.config['VIEW_COUNT_SPOOL_PATH'] = str(spool)
+    item_id = _item(app)
+    client = app.test_client()
+
+    for _ in range(5):
+        client.get(f'/api/marketplace/items/{item_id}')
+    assert spool.read_text().split() == [str(item_id)] * 5
+
+    with app.app_context():
+        assert flush_views() == 1
+        assert db.session.get(Item, item_id).view_count == 5
+    assert not spool.exists() and not (tmp_path / 'views.log.flushing').exists()
+
+
+def test_spool_is_skipped_while_another_flusher_holds_the_lock(tmp_path):
+    spool = tmp_path / 'views.log'
+    app = create_app(TestingConfig)
+    app.config['VIEW_COUNT_SPOOL_PATH'] = str(spool)
+    item_id = _item(app)
+    client = app.test_client()
+    for _ in range(2):
+        client.get(f'/api/marketplace/items/{item_id}')
+
+    with app.app_context():
+        with try_lock(f'{spool}.lock'):
+            assert flush_views() == 0
+        assert spool.exists()
+        assert flush_views() == 1
+        assert flush_views() == 0  # the work file is applied once
+        assert db.session.get(Item, item_id).view_count == 2
@@ -0,0 +1,207 @@
+"""ASGI adapter for the optional async serving mode (``uvicorn asgi:app``).
+
+Under gunicorn's sync workers, a worker thread is held until the client has
+received the last byte. That includes a large upload download to a slow
+phone connection, and a marketplace feed page that is already sitting
+pre-serialized in the feed cache. ``AsyncApp`` runs the API on an event loop
+instead:
+
+* ``GET/HEAD /uploads/<path>`` streams the file from the event loop. Only the
+  chunk reads run in the thread pool.
+* ``GET /api/marketplace/items`` feed cache hits are answered on the loop,
+  without a thread.
+* Every other request, plus the misses, conditional/range requests and OPTIONS
+  preflights of the routes above, runs through the normal Flask app in a pool
+  of ``ASGI_THREADS`` threads. The sync code path is unchanged.
+
+E-mail already leaves the request through the outbox (utils/email_outbox.py),
+and PDF rendering is CPU-bound, so both stay on the thread pool.
+
+asgiref's own ``WsgiToAsgi`` runs every WSGI call on one shared thread
+(``thread_sensitive``), which would serialize the whole API. ``_WsgiInstance``
+runs them on our pool instead and closes the response iterable, which
+releases ``send_file`` handles.
+
+Requests answered on the loop still count in ``GET /metrics`` under their
+Flask endpoint names. They are not profiled and carry no ``X-Query-Count``
+header. Set ``ASGI_NATIVE_ROUTES=False`` to send everything through Flask.
+"""
+from __future__ import annotations
+
+import asyncio
+import mimetypes
+import os
+import time
+from stat import S_ISREG
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date
+from werkzeug.security import safe_join
+from werkzeug.utils import get_content_type
+
+try:
+    from apps.api.utils.feed_cache import feed_key, get_cache as get_feed_cache
+    from apps.api.utils.metrics import HTTP_DURATION, HTTP_REQUESTS, maybe_write_snapshot
+except ImportError:
+    from utils.feed_cache import feed_key, get_cache as get_feed_cache
+    from utils.metrics import HTTP_DURATION, HTTP_REQUESTS, maybe_write_snapshot
+
+
+CHUNK_SIZE = 64 * 1024
+Headers = List[Tuple[bytes, bytes]]
+
+
+def _open_regular_file(path):
+    """``(file, stat)`` for a regular file at ``path``, else ``(None, None)``; blocking."""
+    try:
+        fh = open(path, 'rb')
+    except OSError:
+        return None, None
+    stat = os.fstat(fh.fileno())
+    if not S_ISREG(stat.st_mode):
+        fh.close()
+        return None, None
+    return fh, stat
+
+
+class _WsgiInstance(WsgiToAsgiInstance):
+    """One request through the Flask app on the adapter's thread pool."""
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self._run, thread_sensitive=False, executor=self.executor)(body)
+
+    def _run(self, body):
+        result = self.wsgi_application(self.build_environ(self.scope, body), self.start_response)
+        try:
+            for output in result:
+                if not output:
+                    continue
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                self.sync_send({'type': 'http.response.body', 'body': output, 'more_body': True})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class AsyncApp:
+    """ASGI application wrapping the Flask ``app``."""
+
+    def __init__(self, app):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=int(app.config.get('ASGI_THREADS', 32)),
+                                           thread_name_prefix='asgi-flask')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+        if self.app.config.get('ASGI_NATIVE_ROUTES', True) and scope['method'] in ('GET', 'HEAD'):
+            if await self._native(scope, send):
+                return
+        await _WsgiInstance(self.app, self.executor)(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _native(self, scope, send) -> bool:
+        """Answer on the event loop when possible; False hands the request to Flask."""
+        path = scope['path']
+        headers = dict(scope.get('headers') or [])
+        if path.startswith('/uploads/'):
+            return await self._send_upload(scope, send, headers, path[len('/uploads/'):])
+        if path == '/api/marketplace/items' and scope['method'] == 'GET':
+            return await self._send_cached_feed(scope, send, headers)
+        return False
+
+    async def _send_upload(self, scope, send, headers, filename) -> bool:
+        if any(name in headers for name in (b'range', b'if-modified-since', b'if-none-match')):
+            return False
+        full_path = safe_join(str(self.app.config.get('UPLOAD_FOLDER', 'uploads')), filename)
+        if full_path is None:
+            return False  # Flask answers the 404
+        # Relative folders resolve against the app root, as in send_from_directory
+        full_path = os.path.join(self.app.root_path, full_path)
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        fh, stat = await loop.run_in_executor(self.executor, _open_regular_file, full_path)
+        if fh is None:
+            return False
+        try:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', get_content_type(mimetype, 'utf-8').encode('latin-1')),
+                (b'content-length', str(stat.st_size).encode()),
+                (b'last-modified', http_date(stat.st_mtime).encode()),
+                (b'cache-control', b'no-cache'),
+                (b'accept-ranges', b'bytes'),
+                *self._cors(headers),
+            ]})
+            if scope['method'] == 'GET':
+                while True:
+                    chunk = await loop.run_in_executor(self.executor, fh.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            await loop.run_in_executor(self.executor, fh.close)
+        await send({'type': 'http.response.body'})
+        self._record('serve_uploaded_file', scope['method'], 200, started)
+        return True
+
+    async def _send_cached_feed(self, scope, send, headers) -> bool:
+        started = time.perf_counter()
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        with self.app.app_context():
+            key = feed_key(args)
+            body = get_feed_cache(self.app).get(key) if key is not None else None
+        if body is None:
+            return False
+        payload = body.encode('utf-8')
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+            (b'x-feed-cache', b'hit'),
+            *self._cors(headers),
+        ]})
+        await send({'type': 'http.response.body', 'body': payload})
+        self._record('marketplace.list_items', 'GET', 200, started)
+        return True
+
+    def _cors(self, headers) -> Headers:
+        # Same answer Flask-CORS gives for the origins configured in create_app
+        origin: Optional[bytes] = headers.get(b'origin')
+        if origin and origin.decode('latin-1') in self.app.extensions.get('cors_origins', ()):
+            return [(b'access-control-allow-origin', origin), (b'access-control-allow-credentials', b'true'),
+                    (b'vary', b'Origin')]
+        return [(b'vary', b'Origin')]
+
+    def _record(self, endpoint, method, status, started) -> None:
+        if not self.app.config.get('METRICS_ENABLED', True):
+            return
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=method, status=status)
+        HTTP_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, method=method)
+        maybe_write_snapshot(self.app)
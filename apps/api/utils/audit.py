@@ -1,14 +1,20 @@
 """Generic audit logging utilities for admin/system actions."""
 
 from datetime import datetime
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
+
+from sqlalchemy import insert
 
 try:
     from apps.api import db
     from apps.api.models.audit import AuditLog
+    from apps.api.utils import audit_writer
+    from apps.api.utils.audit_facets import bump_facets
 except Exception:  # pragma: no cover
     from __init__ import db
     from models.audit import AuditLog
+    from utils import audit_writer
+    from utils.audit_facets import bump_facets
 
 
 def log_action(
@@ -22,20 +28,58 @@ def log_action(
     old_values: Optional[Dict[str, Any]] = None,
     new_values: Optional[Dict[str, Any]] = None,
     notes: Optional[str] = None,
-) -> AuditLog:
-    log = AuditLog(
-        user_id=user_id,
-        municipality_id=municipality_id,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        action=action,
-        actor_role=actor_role,
-        old_values=old_values,
-        new_values=new_values,
-        notes=notes,
-        created_at=datetime.utcnow(),
-    )
+) -> Optional[AuditLog]:
+    """Record an audit row.
+
+    During a request the row is buffered and written in bulk at teardown (see
+    ``audit_writer``), so callers need no extra commit; a rollback of the
+    request session discards it. Elsewhere (scripts, CLI) an ``AuditLog`` is
+    added to the session and returned; the caller commits.
+    """
+    row = {
+        'user_id': user_id,
+        'municipality_id': municipality_id,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action,
+        'actor_role': actor_role,
+        'old_values': old_values,
+        'new_values': new_values,
+        'notes': notes,
+        'created_at': datetime.utcnow(),
+    }
+    if audit_writer.record(AuditLog, row):
+        return None
+    log = AuditLog(**row)
     db.session.add(log)
     return log
 
 
+
+def log_actions_bulk(entries: List[Dict[str, Any]]) -> int:
+    """Insert many audit rows with one executemany INSERT (no ORM objects).
+
+    Each entry takes the same keyword fields as ``log_action``. Like
+    ``log_action`` this does not commit.
+    """
+    if not entries:
+        return 0
+    now = datetime.utcnow()
+    rows = [
+        {
+            'user_id': e.get('user_id'),
+            'municipality_id': e['municipality_id'],
+            'entity_type': e['entity_type'],
+            'entity_id': e.get('entity_id'),
+            'action': e['action'],
+            'actor_role': e.get('actor_role', 'admin'),
+            'old_values': e.get('old_values'),
+            'new_values': e.get('new_values'),
+            'notes': e.get('notes'),
+            'created_at': e.get('created_at') or now,
+        }
+        for e in entries
+    ]
+    db.session.execute(insert(AuditLog), rows)
+    bump_facets(db.session.connection(), rows)
+    return len(rows)
@@ -0,0 +1,129 @@
+"""Incremental facet counters for the audit log.
+
+Every path that writes ``audit_logs`` rows (the request buffer, the spool
+ingester, ``log_actions_bulk`` and plain ORM inserts) calls
+``bump_facets`` on the same connection, so the counters commit or roll back
+with the rows they count. Keys are upserted in sorted order to keep
+concurrent writers from deadlocking on PostgreSQL.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import case, event, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+try:
+    from apps.api.models.audit import AuditFacet, AuditLog
+except ImportError:
+    from models.audit import AuditFacet, AuditLog
+
+
+_listeners_installed = False
+
+
+def _aggregate(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[int, str, str], list]:
+    totals: Dict[Tuple[int, str, str], list] = {}
+    for row in rows:
+        if row.get('municipality_id') is None or not row.get('entity_type') or not row.get('action'):
+            continue
+        key = (int(row['municipality_id']), row['entity_type'], row['action'])
+        seen = row.get('created_at') or datetime.utcnow()
+        current = totals.get(key)
+        if current is None:
+            totals[key] = [1, seen]
+        else:
+            current[0] += 1
+            current[1] = max(current[1], seen)
+    return totals
+
+
+def _upsert(connection, values: list) -> int:
+    table = AuditFacet.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        stmt = (pg_insert if dialect == 'postgresql' else sqlite_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['municipality_id', 'entity_type', 'action'],
+            set_={
+                'count': table.c.count + stmt.excluded.count,
+                'last_seen': case(
+                    (table.c.last_seen.is_(None), stmt.excluded.last_seen),
+                    (stmt.excluded.last_seen > table.c.last_seen, stmt.excluded.last_seen),
+                    else_=table.c.last_seen,
+                ),
+            },
+        )
+        for value in values:
+            connection.execute(stmt, value)
+        return len(values)
+    # Portable fallback: update, insert when missing
+    for value in values:
+        key = (
+            (table.c.municipality_id == value['municipality_id'])
+            & (table.c.entity_type == value['entity_type'])
+            & (table.c.action == value['action'])
+        )
+        current = connection.execute(select(table.c.last_seen).where(key)).first()
+        if current is None:
+            connection.execute(table.insert().values(**value))
+        else:
+            last_seen = max(d for d in (current.last_seen, value['last_seen']) if d is not None)
+            connection.execute(
+                table.update().where(key).values(count=table.c.count + value['count'], last_seen=last_seen)
+            )
+    return len(values)
+
+
+def bump_facets(connection, rows: Iterable[Dict[str, Any]]) -> int:
+    """Add ``rows`` (audit_logs column dicts) to the facet counters."""
+    totals = _aggregate(rows)
+    return _upsert(connection, [
+        {'municipality_id': m, 'entity_type': e, 'action': a, 'count': n, 'last_seen': seen}
+        for (m, e, a), (n, seen) in sorted(totals.items())
+    ])
+
+
+def rebuild_facets(connection) -> int:
+    """Recount every facet from the audit rows still in the database."""
+    try:
+        from apps.api.utils.audit_partitions import list_partitions, month_table
+    except ImportError:
+        from utils.audit_partitions import list_partitions, month_table
+
+    connection.execute(AuditFacet.__table__.delete())
+    sources = [AuditLog.__table__]
+    if connection.dialect.name != 'postgresql':  # PostgreSQL partitions are read through the parent
+        sources += [month_table('audit_logs', name) for name in list_partitions(connection, 'audit_logs').values()]
+    written = 0
+    for source in sources:
+        result = connection.execute(
+            select(source.c.municipality_id, source.c.entity_type, source.c.action,
+                   func.count(), func.max(source.c.created_at))
+            .group_by(source.c.municipality_id, source.c.entity_type, source.c.action)
+        ).all()
+        written += _upsert(connection, [
+            {'municipality_id': m, 'entity_type': e, 'action': a, 'count': n, 'last_seen': seen}
+            for m, e, a, n, seen in sorted(result, key=lambda r: (r[0] or 0, r[1] or '', r[2] or ''))
+            if m is not None and e and a
+        ])
+    return written
+
+
+def _after_insert(mapper, connection, target) -> None:
+    bump_facets(connection, [{
+        'municipality_id': target.municipality_id,
+        'entity_type': target.entity_type,
+        'action': target.action,
+        'created_at': target.created_at,
+    }])
+
+
+def init_audit_facets(app) -> None:
+    """Count ORM-inserted ``AuditLog`` rows (scripts, admin tooling)."""
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(AuditLog, 'after_insert', _after_insert)
+        _listeners_installed = True
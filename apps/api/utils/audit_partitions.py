@@ -0,0 +1,346 @@
+"""Monthly partitions and archival for the audit tables.
+
+``audit_logs`` and ``transaction_audit_logs`` are split by ``created_at``
+month:
+
+* PostgreSQL: native range partitioning (see migration
+  ``20261019_partition_audit_logs``). ``maintain_partitions`` and a
+  per-process worker (``start_partition_worker``) create the upcoming month
+  partitions ahead of time; a DEFAULT partition catches anything outside
+  them, and its rows move out once their month's partition is created.
+* SQLite: table-per-month emulation. The base table holds the hot window
+  (``AUDIT_HOT_MONTHS``, current month included); ``maintain_partitions``
+  moves closed months past that window into ``<table>_pYYYYMM`` tables.
+
+Months older than ``AUDIT_ARCHIVE_AFTER_MONTHS`` are streamed into
+``<archive dir>/<table>/<YYYYMM>.jsonl.gz``, recorded in ``manifest.json``
+and dropped from the database. Archiving a month again (rows that arrived
+later) writes ``<YYYYMM>.part2.jsonl.gz`` and so on next to the first file.
+
+``audit_entity`` gives routes something to query: the model itself when the
+requested window is hot (or on PostgreSQL, where the planner prunes by
+``created_at``), otherwise a UNION ALL over the base and month tables.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, func, insert, inspect, select, text, union_all
+from sqlalchemy.orm import aliased
+
+try:
+    from apps.api import db
+    from apps.api.models.audit import AuditLog
+    from apps.api.models.marketplace import TransactionAuditLog
+    from apps.api.utils.background import ensure_worker, get_worker
+except ImportError:
+    from __init__ import db
+    from models.audit import AuditLog
+    from models.marketplace import TransactionAuditLog
+    from utils.background import ensure_worker, get_worker
+
+
+PARTITION_WORKER_NAME = 'audit-partitions'
+MODELS = {model.__tablename__: model for model in (AuditLog, TransactionAuditLog)}
+# Extra index created on each SQLite month table
+_MONTH_INDEX = {
+    'audit_logs': ('municipality_id', 'created_at'),
+    'transaction_audit_logs': ('transaction_id',),
+}
+_MONTH_RE = re.compile(r'_p(\d{6})$')
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: datetime) -> str:
+    return f'{table_name}_p{month:%Y%m}'
+
+
+def hot_window_start(now: Optional[datetime] = None) -> datetime:
+    """First instant covered by the hot partitions."""
+    months = max(1, int(current_app.config.get('AUDIT_HOT_MONTHS', 3)))
+    return add_months(month_start(now or datetime.utcnow()), -(months - 1))
+
+
+def _is_postgres(conn) -> bool:
+    return conn.dialect.name == 'postgresql'
+
+
+def _is_partitioned(conn, table_name: str) -> bool:
+    row = conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name AND c.relnamespace = to_regnamespace(current_schema())"
+    ), {'name': table_name}).first()
+    return row is not None
+
+
+def list_partitions(conn, table_name: str) -> Dict[datetime, str]:
+    """Month partitions currently in the database, keyed by month start."""
+    if _is_postgres(conn):
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name"
+        ), {'name': table_name}).scalars()
+    else:
+        names = inspect(conn).get_table_names()
+    months = {}
+    for name in names:
+        match = _MONTH_RE.search(name)
+        if match and name == f'{table_name}_p{match.group(1)}':
+            months[datetime.strptime(match.group(1), '%Y%m')] = name
+    return dict(sorted(months.items()))
+
+
+def month_table(table_name: str, name: str) -> Table:
+    """Core table for a month partition: the parent's columns, no constraints."""
+    parent = MODELS[table_name].__table__
+    month = Table(name, MetaData(), *[Column(c.name, c.type, primary_key=c.primary_key) for c in parent.columns])
+    Index(f'ix_{name}', *[month.c[col] for col in _MONTH_INDEX[table_name]])
+    return month
+
+
+def _create_month_partition(conn, table_name: str, month: datetime, has_default: bool) -> str:
+    """Create one month partition, first moving that month's rows out of DEFAULT.
+
+    PostgreSQL refuses ``PARTITION OF ... FOR VALUES`` while the DEFAULT
+    partition holds rows in the range, so DEFAULT is detached, the rows are
+    moved into the new partition and DEFAULT is attached again.
+    """
+    name = partition_name(table_name, month)
+    default = f'{table_name}_pdefault'
+    bounds = f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    window = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{add_months(month, 1):%Y-%m-%d}'"
+    stray = has_default and conn.execute(text(f'SELECT 1 FROM "{default}" WHERE {window} LIMIT 1')).first()
+    if not stray:
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table_name}" {bounds}'))
+        return name
+    conn.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{default}"'))
+    conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table_name}" {bounds}'))
+    conn.execute(text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {window}'))
+    conn.execute(text(f'DELETE FROM "{default}" WHERE {window}'))
+    conn.execute(text(f'ALTER TABLE "{table_name}" ATTACH PARTITION "{default}" DEFAULT'))
+    return name
+
+
+def ensure_partitions(conn, table_name: str, now: datetime, months_ahead: int) -> List[str]:
+    """PostgreSQL: create month partitions from now through ``months_ahead``.
+
+    Months whose rows already landed in the DEFAULT partition get their own
+    partition too. Each month runs in a savepoint; one that fails is logged
+    and skipped rather than aborting the rest.
+    """
+    if not _is_postgres(conn) or not _is_partitioned(conn, table_name):
+        return []
+    # Workers in every process run this; one at a time per table
+    conn.execute(text('SELECT pg_advisory_xact_lock(hashtext(:name))'), {'name': f'{table_name}_partitions'})
+    existing = list_partitions(conn, table_name)
+    months = {add_months(month_start(now), offset) for offset in range(0, months_ahead + 1)}
+    default = f'{table_name}_pdefault'
+    has_default = bool(conn.execute(text('SELECT to_regclass(:name) IS NOT NULL'), {'name': default}).scalar())
+    if has_default:
+        months.update(conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', created_at) FROM \"{default}\""
+        )).scalars())
+    created = []
+    for month in sorted(months):
+        month = month_start(month)
+        if month in existing:
+            continue
+        try:
+            with conn.begin_nested():
+                created.append(_create_month_partition(conn, table_name, month, has_default))
+        except Exception:
+            current_app.logger.exception('Could not create partition %s', partition_name(table_name, month))
+    return created
+
+
+def ensure_upcoming_partitions() -> List[str]:
+    """Background task: create the coming months' partitions for every audit table."""
+    months_ahead = int(current_app.config.get('AUDIT_PARTITION_MONTHS_AHEAD', 2))
+    created = []
+    for table_name in MODELS:
+        with db.engine.begin() as conn:
+            created += ensure_partitions(conn, table_name, datetime.utcnow(), months_ahead)
+    return created
+
+
+def start_partition_worker(app) -> None:
+    """Keep PostgreSQL month partitions ahead of time from a per-process worker.
+
+    Started lazily from the audit writer, so the partitions exist even when
+    the monthly ``maintain_audit_partitions.py`` cron does not run.
+    """
+    if not app.config.get('AUDIT_PARTITION_WORKER', True) or db.engine.dialect.name != 'postgresql':
+        return
+    previous = get_worker(app, PARTITION_WORKER_NAME)
+    worker = ensure_worker(app, PARTITION_WORKER_NAME, float(app.config.get('AUDIT_PARTITION_INTERVAL', 21600)),
+                           ensure_upcoming_partitions)
+    if worker is not previous:
+        worker.wake()  # check once now instead of after the first interval
+
+
+def rotate_sqlite(conn, table_name: str, before: datetime) -> Dict[str, int]:
+    """SQLite: move rows older than ``before`` out of the base table into month tables."""
+    if _is_postgres(conn):
+        return {}
+    base = MODELS[table_name].__table__
+    months = conn.execute(
+        select(func.strftime('%Y%m', base.c.created_at))
+        .where(base.c.created_at < before)
+        .distinct()
+    ).scalars().all()
+    moved = {}
+    for key in sorted(m for m in months if m):
+        month = datetime.strptime(key, '%Y%m')
+        name = partition_name(table_name, month)
+        target = month_table(table_name, name)
+        target.create(conn, checkfirst=True)
+        window = (base.c.created_at >= month, base.c.created_at < min(add_months(month, 1), before))
+        result = conn.execute(insert(target).from_select([c.name for c in base.columns], select(base).where(*window)))
+        conn.execute(base.delete().where(*window))
+        moved[name] = result.rowcount
+    return moved
+
+
+def archive_dir() -> Path:
+    configured = current_app.config.get('AUDIT_ARCHIVE_DIR')
+    if configured:
+        return Path(configured)
+    return Path(current_app.config.get('UPLOAD_FOLDER', 'uploads')) / 'archives' / 'audit'
+
+
+def load_manifest(directory: Optional[Path] = None) -> List[dict]:
+    path = (directory or archive_dir()) / 'manifest.json'
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_manifest(directory: Path, entries: List[dict]) -> None:
+    path = directory / 'manifest.json'
+    tmp = path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(entries, indent=2), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_path(out_dir: Path, month: datetime) -> tuple[Path, int]:
+    """First free ``<YYYYMM>.jsonl.gz`` / ``<YYYYMM>.partN.jsonl.gz`` for ``month``.
+
+    Rows that reach a month after it was archived (late inserts, a restored
+    backup) go to a new part; an existing archive is never replaced.
+    """
+    part = 1
+    while True:
+        suffix = '' if part == 1 else f'.part{part}'
+        path = out_dir / f'{month:%Y%m}{suffix}.jsonl.gz'
+        if not path.exists():
+            return path, part
+        part += 1
+
+
+def archive_partition(conn, table_name: str, month: datetime, name: str, directory: Path) -> dict:
+    """Stream one month partition into gzip JSONL, then drop it."""
+    out_dir = directory / table_name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path, part = _archive_path(out_dir, month)
+    tmp_path = out_path.with_suffix('.gz.tmp')
+    source = month_table(table_name, name)
+    digest = hashlib.sha256()
+    rows = 0
+    min_id = max_id = None
+    result = conn.execution_options(stream_results=True, yield_per=1000).execute(
+        select(source).order_by(source.c.id)
+    )
+    with gzip.open(tmp_path, 'wb') as fh:
+        for row in result:
+            line = (json.dumps(dict(row._mapping), default=_json_default, separators=(',', ':')) + '\n').encode('utf-8')
+            fh.write(line)
+            digest.update(line)
+            rows += 1
+            min_id = row.id if min_id is None else min_id
+            max_id = row.id
+    os.replace(tmp_path, out_path)
+    if _is_postgres(conn):
+        conn.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"'))
+    conn.execute(text(f'DROP TABLE "{name}"'))
+    return {
+        'table': table_name,
+        'month': f'{month:%Y-%m}',
+        'part': part,
+        'file': str(out_path.relative_to(directory)).replace('\\', '/'),
+        'rows': rows,
+        'min_id': min_id,
+        'max_id': max_id,
+        'sha256': digest.hexdigest(),
+        'archived_at': datetime.utcnow().isoformat(),
+    }
+
+
+def maintain_partitions(now: Optional[datetime] = None) -> dict:
+    """Create upcoming partitions, rotate the SQLite hot table and archive old months."""
+    now = now or datetime.utcnow()
+    config = current_app.config
+    hot_start = hot_window_start(now)
+    archive_before = add_months(month_start(now), -max(1, int(config.get('AUDIT_ARCHIVE_AFTER_MONTHS', 12))))
+    months_ahead = int(config.get('AUDIT_PARTITION_MONTHS_AHEAD', 2))
+    directory = archive_dir()
+    stats = {'created': [], 'rotated': {}, 'archived': []}
+
+    for table_name in MODELS:
+        with db.engine.begin() as conn:
+            stats['created'] += ensure_partitions(conn, table_name, now, months_ahead)
+            stats['rotated'].update(rotate_sqlite(conn, table_name, hot_start))
+        with db.engine.connect() as conn:
+            partitions = list_partitions(conn, table_name)
+        for month, name in partitions.items():
+            if month >= archive_before:
+                continue
+            # One transaction per month: the file is written before the drop commits
+            with db.engine.begin() as conn:
+                entry = archive_partition(conn, table_name, month, name, directory)
+            manifest = [e for e in load_manifest(directory) if e['file'] != entry['file']]
+            _save_manifest(directory, manifest + [entry])
+            stats['archived'].append(entry)
+    return stats
+
+
+def audit_entity(model, since: Optional[datetime] = None):
+    """Mapped entity covering rows created at or after ``since`` (None = all).
+
+    Returns ``model`` unless SQLite month tables overlap the window, in which
+    case an aliased UNION ALL of the base and the relevant month tables.
+    """
+    conn = db.session.connection()
+    if _is_postgres(conn):
+        return model
+    partitions = list_partitions(conn, model.__tablename__)
+    if since is not None:
+        floor = month_start(since)
+        partitions = {m: n for m, n in partitions.items() if m >= floor}
+    if not partitions:
+        return model
+    selects = [select(model.__table__)]
+    selects += [select(month_table(model.__tablename__, name)) for name in partitions.values()]
+    return aliased(model, union_all(*selects).subquery(f'{model.__tablename__}_all'))
@@ -0,0 +1,259 @@
+"""Batched audit writer.
+
+Inside a request, ``log_action``/``log_tx_action`` hand their rows to
+``record`` instead of adding ORM objects. Rows are held on ``g`` and written
+at request teardown with one multi-row INSERT per table, so routes no longer
+need a second ``commit()`` just for the audit trail.
+
+Rows follow the request's transaction: a session rollback discards the rows
+recorded since the last commit, and rows still pending when the request ends
+with an unhandled exception are dropped.
+
+With ``AUDIT_SPOOL_PATH`` set the teardown step only appends JSON lines to
+that local file (one ``write`` per request, under ``flock``); a background
+worker or ``scripts/ingest_audit_spool.py`` loads the file into the database
+in batches.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    from apps.api import db
+    from apps.api.models.audit import AuditLog
+    from apps.api.models.marketplace import TransactionAuditLog
+    from apps.api.utils.audit_facets import bump_facets, init_audit_facets
+    from apps.api.utils.audit_partitions import start_partition_worker
+    from apps.api.utils.background import ensure_worker, try_lock
+except ImportError:
+    from __init__ import db
+    from models.audit import AuditLog
+    from models.marketplace import TransactionAuditLog
+    from utils.audit_facets import bump_facets, init_audit_facets
+    from utils.audit_partitions import start_partition_worker
+    from utils.background import ensure_worker, try_lock
+
+
+WORKER_NAME = 'audit-spool'
+MODELS = {model.__tablename__: model for model in (AuditLog, TransactionAuditLog)}
+
+Entry = Tuple[str, Dict[str, Any]]
+
+_listeners_installed = False
+
+
+def _buffering_enabled() -> bool:
+    return has_request_context() and current_app.config.get('AUDIT_BUFFER_ENABLED', True)
+
+
+def record(model, row: Dict[str, Any]) -> bool:
+    """Buffer ``row`` for ``model``'s table until request teardown.
+
+    Returns False outside a request (or with buffering disabled); the caller
+    then writes the row itself.
+    """
+    if not _buffering_enabled():
+        return False
+    state = g.get('_audit_buffer')
+    if state is None:
+        state = g._audit_buffer = {'pending': [], 'ready': []}
+    state['pending'].append((model.__tablename__, row))
+    return True
+
+
+def _request_session(session) -> bool:
+    return has_request_context() and db.session.registry.has() and session is db.session.registry()
+
+
+def _after_commit(session) -> None:
+    if not _request_session(session):
+        return
+    state = g.get('_audit_buffer')
+    if state and state['pending']:
+        state['ready'].extend(state['pending'])
+        state['pending'] = []
+
+
+def _after_soft_rollback(session, previous_transaction) -> None:
+    if previous_transaction.nested or not _request_session(session):
+        return
+    state = g.get('_audit_buffer')
+    if state:
+        state['pending'] = []
+
+
+def insert_entries(connection, entries: List[Entry], batch_size: int = 500) -> int:
+    """Bulk-insert buffered rows, one executemany INSERT per table and batch.
+
+    ``audit_logs`` rows also bump the facet counters on the same connection.
+    """
+    by_table: Dict[str, List[Dict[str, Any]]] = {}
+    for table, row in entries:
+        by_table.setdefault(table, []).append(row)
+    for table, rows in by_table.items():
+        model = MODELS[table]
+        for start in range(0, len(rows), batch_size):
+            connection.execute(insert(model), rows[start:start + batch_size])
+        if model is AuditLog:
+            bump_facets(connection, rows)
+    return len(entries)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def spool_entries(path: str, entries: List[Entry]) -> None:
+    """Append rows to the spool file as JSON lines with a single write."""
+    data = ''.join(
+        json.dumps({'t': table, 'r': row}, default=_json_default, separators=(',', ':')) + '\n'
+        for table, row in entries
+    ).encode('utf-8')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # The ingester may have rotated the file between open and lock
+            try:
+                current = os.stat(path).st_ino == os.fstat(fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                return
+        finally:
+            os.close(fd)
+
+
+def _decode(line: str) -> Entry | None:
+    try:
+        payload = json.loads(line)
+        table, row = payload['t'], payload['r']
+        model = MODELS[table]
+    except (ValueError, KeyError, TypeError):
+        return None
+    created = row.get('created_at')
+    if isinstance(created, str):
+        row['created_at'] = datetime.fromisoformat(created)
+    # Drop unknown keys so an older/newer spool line cannot break the INSERT
+    columns = model.__mapper__.column_attrs.keys()
+    return table, {k: v for k, v in row.items() if k in columns}
+
+
+def _ingest_file(path: str, batch_size: int) -> int:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if fcntl is not None:
+            # Wait out any writer that opened the file before it was rotated
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        with os.fdopen(os.dup(fd), 'r', encoding='utf-8') as fh:
+            lines = fh.readlines()
+    finally:
+        os.close(fd)
+    entries, skipped = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = _decode(line)
+        if entry is None:
+            skipped += 1
+        else:
+            entries.append(entry)
+    if skipped:
+        current_app.logger.warning('Skipped %d malformed audit spool lines in %s', skipped, path)
+    if entries:
+        with db.engine.begin() as conn:
+            insert_entries(conn, entries, batch_size)
+    os.unlink(path)
+    return len(entries)
+
+
+def ingest_spool(path: str | None = None, batch_size: int | None = None) -> int:
+    """Load spooled audit rows into the database; returns the number inserted.
+
+    The spool is renamed to ``<path>.ingesting`` first, so writers keep
+    appending to a fresh file. A leftover ``.ingesting`` file from a failed run
+    is loaded before the current spool.
+
+    The whole rotate/insert/unlink sequence runs under ``<path>.lock``. When
+    another worker or the ingest script holds it, this run is skipped and
+    returns 0, so the same work file is never inserted twice.
+    """
+    path = path or current_app.config.get('AUDIT_SPOOL_PATH')
+    if not path:
+        return 0
+    batch_size = batch_size or int(current_app.config.get('AUDIT_SPOOL_BATCH_SIZE', 500))
+    work = f'{path}.ingesting'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with try_lock(f'{path}.lock') as locked:
+        if not locked:
+            return 0
+        total = 0
+        if os.path.exists(work):
+            total += _ingest_file(work, batch_size)
+        try:
+            os.replace(path, work)
+        except FileNotFoundError:
+            return total
+        return total + _ingest_file(work, batch_size)
+
+
+def write_entries(entries: List[Entry]) -> None:
+    """Persist rows now: to the spool when configured, else straight to the DB."""
+    if not entries:
+        return
+    app = current_app._get_current_object()
+    start_partition_worker(app)
+    spool = app.config.get('AUDIT_SPOOL_PATH')
+    if spool:
+        try:
+            spool_entries(spool, entries)
+            if app.config.get('AUDIT_SPOOL_WORKER', True):
+                ensure_worker(app, WORKER_NAME, float(app.config.get('AUDIT_SPOOL_INTERVAL', 5)), ingest_spool)
+            return
+        except OSError:
+            app.logger.exception('Audit spool write failed; writing %d rows inline', len(entries))
+    try:
+        # Own connection/transaction: independent of whatever the request session holds
+        with db.engine.begin() as conn:
+            insert_entries(conn, entries)
+    except Exception:
+        app.logger.exception('Failed to write %d audit rows', len(entries))
+
+
+def flush(exc: BaseException | None = None) -> None:
+    """Write this request's buffered rows (teardown handler)."""
+    state = g.pop('_audit_buffer', None)
+    if not state:
+        return
+    entries = state['ready'] if exc is not None else state['ready'] + state['pending']
+    write_entries(entries)
+
+
+def init_audit_writer(app) -> None:
+    """Register the teardown flush and the session hooks that track commits."""
+    global _listeners_installed
+    app.teardown_request(flush)
+    init_audit_facets(app)
+    if not _listeners_installed:
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+        _listeners_installed = True
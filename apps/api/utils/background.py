@@ -0,0 +1,105 @@
+"""Lightweight in-process background workers.
+
+Each worker is a daemon thread that runs a task inside an app context every
+``interval`` seconds, or sooner when woken. Workers are started lazily (on
+first use) so importing or creating the app never spawns threads, and each
+gunicorn worker process gets its own after fork.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class PeriodicWorker(threading.Thread):
+    """Run ``task()`` periodically inside ``app.app_context()``."""
+
+    def __init__(self, app, name: str, interval: float, task: Callable[[], object]):
+        super().__init__(name=f'munlink-{name}', daemon=True)
+        self.app = app
+        self.interval = max(0.05, float(interval))
+        self.task = task
+        self.pid = os.getpid()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()  # not _stop: Thread._stop() is used by threading
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            self.run_once()
+
+    def run_once(self) -> None:
+        with self.app.app_context():
+            try:
+                self.task()
+            except Exception:
+                self.app.logger.exception('Background task %s failed', self.name)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+
+def get_worker(app, name: str) -> PeriodicWorker | None:
+    return app.extensions.get('background_workers', {}).get(name)
+
+
+def ensure_worker(app, name: str, interval: float, task: Callable[[], object]) -> PeriodicWorker:
+    """Return the running worker ``name`` for this process, starting it if needed."""
+    workers: Dict[str, PeriodicWorker] = app.extensions.get('background_workers')
+    if workers is None:
+        workers = app.extensions['background_workers'] = {}
+        # Let a task that is mid-run finish before the interpreter exits
+        atexit.register(stop_workers, app)
+    worker = workers.get(name)
+    # A worker inherited through fork() is not running in this process
+    if worker is None or not worker.is_alive() or worker.pid != os.getpid():
+        worker = PeriodicWorker(app, name, interval, task)
+        workers[name] = worker
+        worker.start()
+    return worker
+
+
+def stop_workers(app) -> None:
+    """Stop this app's workers (registered at exit; tests may call it directly)."""
+    for worker in list(app.extensions.get('background_workers', {}).values()):
+        worker.stop()
+    app.extensions['background_workers'] = {}
+
+
+@contextmanager
+def try_lock(path: str) -> Iterator[bool]:
+    """Hold an exclusive, non-blocking ``flock`` on ``path`` for the block.
+
+    Yields False when another process or thread already holds it; the caller
+    should then skip its run rather than wait.
+    """
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o640)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
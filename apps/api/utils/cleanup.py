@@ -0,0 +1,267 @@
+"""Streaming, batched cleanup (purge + optional archive) for admin data.
+
+A ``CleanupJob`` walks the matching rows in id order, ``CLEANUP_BATCH_SIZE``
+at a time:
+
+1. rows are streamed (``yield_per``) into a gzip JSONL archive, one gzip
+   member per batch;
+2. the batch is removed with a single ``DELETE ... WHERE id IN (...)``
+   (plus its search index entries);
+3. the job cursor, counters and archive length are committed together.
+
+Short transactions keep table locks brief and memory flat. A job that was
+interrupted resumes from its cursor, first truncating the archive back to
+the last committed length so no row is archived twice.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, and_, select, update
+
+try:
+    from apps.api import db
+    from apps.api.models.announcement import Announcement
+    from apps.api.models.cleanup_job import CleanupJob
+    from apps.api.models.document import DocumentRequest
+    from apps.api.utils.audit import log_action
+    from apps.api.utils.background import ensure_worker
+    from apps.api.utils.search_index import _index_available, index_documents
+except ImportError:
+    from __init__ import db
+    from models.announcement import Announcement
+    from models.cleanup_job import CleanupJob
+    from models.document import DocumentRequest
+    from utils.audit import log_action
+    from utils.background import ensure_worker
+    from utils.search_index import _index_available, index_documents
+
+
+WORKER_NAME = 'cleanup-jobs'
+
+# entity -> (model, search index entity type or None)
+CLEANUP_ENTITIES = {
+    'announcements': (Announcement, 'announcement'),
+    'requests': (DocumentRequest, None),
+}
+
+
+class CleanupError(Exception):
+    pass
+
+
+def _scope(job: CleanupJob):
+    model, _ = CLEANUP_ENTITIES[job.entity]
+    conditions = [model.municipality_id == job.municipality_id]
+    if job.cutoff is not None:
+        conditions.append(model.created_at <= job.cutoff)
+    return model, conditions
+
+
+def _upload_base() -> Path:
+    return Path(current_app.config.get('UPLOAD_FOLDER', 'uploads'))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def create_job(municipality_id: int, entity: str, cutoff: Optional[datetime], archive: bool,
+               created_by: Optional[int] = None) -> CleanupJob:
+    """Create (and commit) a pending job; raises CleanupError for unknown entities."""
+    if entity not in CLEANUP_ENTITIES:
+        raise CleanupError('Unsupported entity for cleanup')
+    job = CleanupJob(
+        municipality_id=municipality_id,
+        entity=entity,
+        cutoff=cutoff,
+        archive=archive,
+        created_by=created_by,
+        status='pending',
+    )
+    model, conditions = _scope(job)
+    job.total = db.session.query(func.count(model.id)).filter(*conditions).scalar() or 0
+    db.session.add(job)
+    db.session.flush()
+    if archive:
+        stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        job.archive_path = f'archives/{entity}-{municipality_id}-{stamp}-{job.id}.jsonl.gz'
+    db.session.commit()
+    return job
+
+
+def _prepare_archive(job: CleanupJob) -> Optional[Path]:
+    if not job.archive:
+        return None
+    path = _upload_base() / job.archive_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    size = path.stat().st_size if path.exists() else 0
+    if size < (job.archive_bytes or 0):
+        raise CleanupError(f'Archive {job.archive_path} is shorter than recorded; refusing to resume')
+    if size > (job.archive_bytes or 0):
+        # Drop the batch written before the interruption; it was never deleted
+        with open(path, 'r+b') as fh:
+            fh.truncate(job.archive_bytes or 0)
+    return path
+
+
+def _run_batch(job: CleanupJob, archive_path: Optional[Path], batch_size: int, chunk: int) -> int:
+    model, conditions = _scope(job)
+    stmt = (
+        select(model)
+        .where(*conditions, model.id > job.last_id)
+        .order_by(model.id)
+        .limit(batch_size)
+        .execution_options(yield_per=chunk)
+    )
+    ids = []
+    fh = gzip.open(archive_path, 'ab') if archive_path else None
+    try:
+        for obj in db.session.execute(stmt).scalars():
+            ids.append(obj.id)
+            if fh is not None:
+                fh.write((json.dumps(obj.to_dict(), default=_json_default, ensure_ascii=False) + '\n').encode('utf-8'))
+    finally:
+        if fh is not None:
+            fh.close()
+    if not ids:
+        return 0
+
+    db.session.execute(delete(model).where(model.id.in_(ids)), execution_options={'synchronize_session': False})
+    search_type = CLEANUP_ENTITIES[job.entity][1]
+    connection = db.session.connection()
+    if search_type and _index_available(connection):
+        index_documents(connection, [], [(search_type, i) for i in ids])
+
+    job.last_id = ids[-1]
+    job.deleted_count = (job.deleted_count or 0) + len(ids)
+    job.batches = (job.batches or 0) + 1
+    if archive_path is not None:
+        job.archive_bytes = archive_path.stat().st_size
+    job.updated_at = datetime.utcnow()
+    db.session.commit()
+    return len(ids)
+
+
+def _finish(job: CleanupJob) -> None:
+    job.status = 'completed'
+    job.finished_at = job.updated_at = datetime.utcnow()
+    log_action(
+        user_id=job.created_by,
+        municipality_id=job.municipality_id,
+        entity_type=job.entity,
+        entity_id=None,
+        action='cleanup_delete',
+        actor_role='admin',
+        old_values=None,
+        new_values={
+            'deleted': job.deleted_count,
+            'before': job.cutoff.isoformat() if job.cutoff else None,
+            'job_id': job.id,
+        },
+        notes='Archive saved' if job.archive and job.deleted_count else None,
+    )
+    db.session.commit()
+
+
+def run_job(job_id: int, max_batches: Optional[int] = None,
+            progress: Optional[Callable[[CleanupJob], None]] = None) -> CleanupJob:
+    """Run (or resume) a job until done or ``max_batches`` batches; returns the job.
+
+    Failures mark the job ``failed`` with the error and re-raise; running it
+    again resumes from the last committed batch.
+    """
+    config = current_app.config
+    batch_size = max(1, int(config.get('CLEANUP_BATCH_SIZE', 500)))
+    chunk = max(1, min(batch_size, int(config.get('CLEANUP_YIELD_PER', 100))))
+    job = db.session.get(CleanupJob, job_id)
+    if job is None:
+        raise CleanupError('Cleanup job not found')
+    if job.status == 'completed':
+        return job
+    job.status = 'running'
+    job.error = None
+    job.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    done = 0
+    try:
+        archive_path = _prepare_archive(job)
+        while max_batches is None or done < max_batches:
+            if not _run_batch(job, archive_path, batch_size, chunk):
+                _finish(job)
+                break
+            done += 1
+            if progress is not None:
+                progress(job)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(CleanupJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)[:2000]
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+        raise
+    return job
+
+
+def _stale_before() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=int(current_app.config.get('CLEANUP_STALE_SECONDS', 300)))
+
+
+def is_active(job: CleanupJob) -> bool:
+    """True while a runner is working on ``job`` (running, with recent progress)."""
+    return job.status == 'running' and job.updated_at is not None and job.updated_at >= _stale_before()
+
+
+def claim_job(job: CleanupJob, status: str = 'running') -> bool:
+    """Atomically move ``job`` to ``status`` if nobody changed it since it was loaded.
+
+    Taking a job with ``status='running'`` guarantees two runners never work on
+    it at once; False means another request or worker got there first.
+    """
+    result = db.session.execute(
+        update(CleanupJob)
+        .where(CleanupJob.id == job.id, CleanupJob.status == job.status, CleanupJob.updated_at == job.updated_at)
+        .values(status=status, updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_pending_jobs() -> int:
+    """Run pending jobs and resume ones whose runner went away; returns jobs finished."""
+    candidates = (
+        CleanupJob.query
+        .filter(or_(CleanupJob.status == 'pending',
+                    and_(CleanupJob.status == 'running', CleanupJob.updated_at < _stale_before())))
+        .order_by(CleanupJob.id)
+        .all()
+    )
+    finished = 0
+    for job in candidates:
+        if not claim_job(job):
+            continue
+        try:
+            if run_job(job.id).status == 'completed':
+                finished += 1
+        except Exception:
+            current_app.logger.exception('Cleanup job %s failed', job.id)
+    return finished
+
+
+def start_in_background() -> bool:
+    """Wake the per-process cleanup worker; False when it is disabled."""
+    app = current_app._get_current_object()
+    if not app.config.get('CLEANUP_WORKER', True):
+        return False
+    ensure_worker(app, WORKER_NAME, float(app.config.get('CLEANUP_WORKER_INTERVAL', 60)), run_pending_jobs).wake()
+    return True
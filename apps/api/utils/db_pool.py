@@ -0,0 +1,126 @@
+"""Connection pool liveness checks and pool telemetry.
+
+``get_pool_settings`` (config.py) sizes the pool from the worker/thread
+topology. Unless ``DB_POOL_PING_IDLE`` is 0, ``get_engine_options`` also turns
+off SQLAlchemy's ``pool_pre_ping``, which costs a round trip on every
+checkout to the remote Supabase pooler. Instead, a connection is pinged when
+it is checked out only if it sat idle in the pool for ``ping_idle`` seconds or
+more. Connections used moments ago skip the ping. A failed ping raises
+``DisconnectionError``, and the pool replaces the connection with a fresh one
+before handing it out.
+
+Checkout wait time is recorded by utils/metrics.py
+(``munlink_db_pool_checkout_seconds``). This module adds overflow usage and
+ping outcomes. ``pool_status()`` backs ``GET /api/admin/system/db-pool``.
+"""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+
+try:
+    from apps.api.utils.metrics import (
+        DB_CHECKOUT_SECONDS, DB_OVERFLOW, DB_OVERFLOW_CHECKOUTS, DB_PINGS,
+    )
+except ImportError:
+    from utils.metrics import DB_CHECKOUT_SECONDS, DB_OVERFLOW, DB_OVERFLOW_CHECKOUTS, DB_PINGS
+
+
+_IDLE_SINCE = 'munlink_idle_since'
+
+
+def install_liveness_check(engine, idle_seconds: float) -> None:
+    """Ping connections on checkout once they have been idle for ``idle_seconds``."""
+    pool = engine.pool
+    if getattr(pool, '_munlink_liveness', False):
+        return
+    dialect = engine.dialect
+
+    def on_connect(dbapi_connection, record):
+        record.info[_IDLE_SINCE] = time.monotonic()
+
+    def on_checkout(dbapi_connection, record, proxy):
+        idle_since = record.info.get(_IDLE_SINCE)
+        if idle_since is not None and time.monotonic() - idle_since < idle_seconds:
+            return
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        DB_PINGS.inc(outcome='ok' if alive else 'failed')
+        if not alive:
+            # The pool discards this connection and retries with a new one
+            raise DisconnectionError('connection failed its idle liveness ping')
+
+    def on_checkin(dbapi_connection, record):
+        if record is not None:
+            record.info[_IDLE_SINCE] = time.monotonic()
+
+    event.listen(pool, 'connect', on_connect)
+    event.listen(pool, 'checkout', on_checkout)
+    event.listen(pool, 'checkin', on_checkin)
+    pool._munlink_liveness = True
+
+
+def _overflow(pool, returning: int = 0) -> Optional[int]:
+    """Checked-out connections beyond pool_size (``returning``: ones being checked in)."""
+    # QueuePool only; SQLite :memory: uses a singleton/static pool without overflow
+    if not hasattr(pool, 'overflow'):
+        return None
+    return max(0, pool.checkedout() - returning - pool.size())
+
+
+def track_overflow(engine) -> None:
+    """Keep the overflow gauge current and count checkouts served beyond pool_size."""
+    pool = engine.pool
+    if getattr(pool, '_munlink_overflow', False) or _overflow(pool) is None:
+        return
+
+    def on_checkout(dbapi_connection, record, proxy):
+        overflow = _overflow(pool)
+        DB_OVERFLOW.set(overflow)
+        if overflow:
+            DB_OVERFLOW_CHECKOUTS.inc()
+
+    def on_checkin(dbapi_connection, record):
+        # Fires before the connection is back in the pool
+        DB_OVERFLOW.set(_overflow(pool, returning=1))
+
+    event.listen(pool, 'checkout', on_checkout)
+    event.listen(pool, 'checkin', on_checkin)
+    pool._munlink_overflow = True
+
+
+def pool_status(engine, settings: Optional[dict] = None) -> dict:
+    """Current pool usage in this process plus the settings it was sized with."""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__, 'settings': settings or {}}
+    if _overflow(pool) is not None:
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': _overflow(pool),
+        })
+    # Local to this worker; GET /metrics aggregates across workers
+    counts = DB_CHECKOUT_SECONDS.values.get((), [0.0])
+    checkouts = sum(counts[:-1])
+    status['checkouts'] = int(checkouts)
+    status['avg_checkout_wait_ms'] = round(counts[-1] / checkouts * 1000, 3) if checkouts else 0.0
+    status['overflow_checkouts'] = int(DB_OVERFLOW_CHECKOUTS.values.get((), 0))
+    status['liveness_pings'] = {outcome: int(DB_PINGS.values.get((outcome,), 0)) for outcome in ('ok', 'failed')}
+    return status
+
+
+def init_db_pool(app) -> None:
+    """Install idle liveness checks (when pre-ping is off) and overflow tracking."""
+    settings = app.config.get('DB_POOL') or {}
+    with app.app_context():
+        engine = app.extensions['sqlalchemy'].engine
+        if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('pool_pre_ping') \
+                and settings.get('ping_idle', 0) > 0:
+            install_liveness_check(engine, settings['ping_idle'])
+        track_overflow(engine)
@@ -0,0 +1,144 @@
+"""Email outbox: queue messages in the database and deliver them in batches.
+
+``queue_email`` adds a row (and wakes the background sender); ``flush_outbox``
+claims due rows with a single UPDATE, sends them over one reused SMTP session
+and reschedules failures with exponential backoff.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update, or_, and_
+
+try:
+    from apps.api import db
+    from apps.api.models.email_outbox import EmailOutbox
+    from apps.api.utils.background import ensure_worker
+    from apps.api.utils.email_sender import SMTPSession
+except ImportError:
+    from __init__ import db
+    from models.email_outbox import EmailOutbox
+    from utils.background import ensure_worker
+    from utils.email_sender import SMTPSession
+
+
+WORKER_NAME = 'email-outbox'
+
+
+def queue_email(to_email: str, subject: str, body: str, commit: bool = True) -> EmailOutbox:
+    """Add a message to the outbox. With ``commit=False`` the caller commits."""
+    row = EmailOutbox(
+        to_email=to_email,
+        subject=subject[:255],
+        body=body,
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(row)
+    if commit:
+        db.session.commit()
+        wake_sender()
+    return row
+
+
+def wake_sender() -> None:
+    """Start (if needed) and wake the per-process background sender."""
+    app = current_app._get_current_object()
+    if not app.config.get('EMAIL_OUTBOX_WORKER', True):
+        return
+    worker = ensure_worker(
+        app,
+        WORKER_NAME,
+        float(app.config.get('EMAIL_OUTBOX_INTERVAL', 15)),
+        flush_outbox,
+    )
+    worker.wake()
+
+
+def _claim_batch(limit: int, stale_after: timedelta) -> tuple[str, list[EmailOutbox]]:
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    due = (
+        db.session.query(EmailOutbox.id)
+        .filter(or_(
+            and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+            # Rows left in 'sending' by a crashed worker
+            and_(EmailOutbox.status == 'sending', EmailOutbox.claimed_at < now - stale_after),
+        ))
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    # The status guard keeps two workers from claiming the same row
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due))
+        .where(or_(
+            EmailOutbox.status == 'pending',
+            and_(EmailOutbox.status == 'sending', EmailOutbox.claimed_at < now - stale_after),
+        ))
+        .values(status='sending', claim_token=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    rows = (
+        EmailOutbox.query
+        .filter(EmailOutbox.claim_token == token, EmailOutbox.status == 'sending')
+        .order_by(EmailOutbox.id)
+        .all()
+    )
+    return token, rows
+
+
+def flush_outbox(max_batches: int | None = None, session: SMTPSession | None = None) -> dict:
+    """Deliver due messages. Returns counts of sent / retried / failed rows."""
+    app = current_app
+    batch_size = int(app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    max_attempts = int(app.config.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    backoff = float(app.config.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 60))
+    stale_after = timedelta(seconds=int(app.config.get('EMAIL_OUTBOX_CLAIM_TIMEOUT', 600)))
+
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    own_session = session is None
+    smtp = session or SMTPSession()
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            _, rows = _claim_batch(batch_size, stale_after)
+            if not rows:
+                break
+            batches += 1
+            for row in rows:
+                try:
+                    smtp.send(row.to_email, row.subject, row.body)
+                    row.status = 'sent'
+                    row.sent_at = datetime.utcnow()
+                    row.last_error = None
+                    stats['sent'] += 1
+                except Exception as exc:
+                    row.attempts = (row.attempts or 0) + 1
+                    row.last_error = str(exc)[:2000]
+                    if row.attempts >= max_attempts:
+                        row.status = 'failed'
+                        stats['failed'] += 1
+                        app.logger.error("Email to %s failed permanently: %s", row.to_email, exc)
+                    else:
+                        row.status = 'pending'
+                        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff * (2 ** (row.attempts - 1)))
+                        stats['retried'] += 1
+                    # Connection may be in an unknown state after an error
+                    smtp.close()
+                row.claim_token = None
+            db.session.commit()
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if own_session:
+            smtp.close()
+    return stats
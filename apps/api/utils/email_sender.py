@@ -1,74 +1,201 @@
 """Simple email sending utility for verification and notification emails.
 
 Adds generic helpers with SMTP-if-configured behavior and logger fallback.
+When ``EMAIL_OUTBOX_ENABLED`` is set, messages are queued in the
+``email_outbox`` table and delivered by a background sender that reuses one
+authenticated SMTP session (see ``utils/email_outbox.py``).
 """
 import smtplib
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from flask import current_app
 import ssl
+import time
 
+try:
+    from apps.api.utils.metrics import EMAIL_SECONDS
+except ImportError:
+    from utils.metrics import EMAIL_SECONDS
 
-def send_verification_email(to_email: str, verify_link: str) -> None:
-    """Send an email verification message with a verification link.
 
-    Uses SMTP settings from Flask app config.
-    """
-    app = current_app
-    smtp_server = app.config.get('SMTP_SERVER')
-    smtp_port = int(app.config.get('SMTP_PORT', 587))
+def _smtp_settings(app) -> dict:
     smtp_username = app.config.get('SMTP_USERNAME')
-    smtp_password = app.config.get('SMTP_PASSWORD')
-    from_email = app.config.get('FROM_EMAIL', smtp_username)
-    app_name = app.config.get('APP_NAME', 'MunLink Region III')
+    return {
+        'server': app.config.get('SMTP_SERVER'),
+        'port': int(app.config.get('SMTP_PORT', 587)),
+        'username': smtp_username,
+        'password': app.config.get('SMTP_PASSWORD'),
+        'from_email': app.config.get('FROM_EMAIL', smtp_username or 'noreply@example.com'),
+        'app_name': app.config.get('APP_NAME', 'MunLink Region III'),
+        'timeout': int(app.config.get('SMTP_TIMEOUT', 10)),
+    }
 
-    subject = f"Verify your email for {app_name}"
-    body = (
-        f"Hello,\n\n"
-        f"Please verify your email to complete your registration to {app_name}.\n\n"
-        f"Click the link below (valid for 24 hours):\n"
-        f"{verify_link}\n\n"
-        f"If you did not sign up, you can ignore this email.\n\n"
-        f"Thank you,\n{app_name} Team"
-    )
 
+def build_message(to_email: str, subject: str, body: str, app=None) -> MIMEText:
+    settings = _smtp_settings(app or current_app)
     msg = MIMEText(body, 'plain', 'utf-8')
     msg['Subject'] = subject
-    msg['From'] = formataddr((app_name, from_email))
+    msg['From'] = formataddr((settings['app_name'], settings['from_email']))
     msg['To'] = to_email
+    return msg
 
-    # Best effort send; raise with detailed logs so caller can surface in DEBUG
-    try:
-        if not smtp_server:
-            current_app.logger.error("Email send failed: SMTP_SERVER is not configured")
+
+class SMTPSession:
+    """One SMTP connection reused for many messages.
+
+    Connects (STARTTLS/SSL + login) on first send and transparently reconnects
+    once if the server dropped the connection between messages.
+    """
+
+    def __init__(self, app=None, require_auth: bool = False):
+        self.app = app or current_app._get_current_object()
+        self.settings = _smtp_settings(self.app)
+        self.require_auth = require_auth
+        self.server = None
+        self.connections = 0
+        self.sent = 0
+
+    def connect(self):
+        s = self.settings
+        if not s['server']:
             raise RuntimeError("SMTP_SERVER is not configured")
-        if not smtp_username:
-            current_app.logger.error("Email send failed: SMTP_USERNAME is not configured")
+        if self.require_auth and not s['username']:
             raise RuntimeError("SMTP_USERNAME is not configured")
-        if not smtp_password:
-            current_app.logger.error("Email send failed: SMTP_PASSWORD is not configured")
+        if self.require_auth and not s['password']:
             raise RuntimeError("SMTP_PASSWORD is not configured")
-        
-        current_app.logger.info(f"Attempting to send email to {to_email} via {smtp_server}:{smtp_port}")
 
         # Use SSL for 465, STARTTLS for others (e.g., 587)
-        if smtp_port == 465:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(smtp_server, smtp_port, context=context, timeout=10) as server:
-                server.ehlo()
-                server.login(smtp_username, smtp_password)
-                server.sendmail(from_email, [to_email], msg.as_string())
+        if s['port'] == 465:
+            server = smtplib.SMTP_SSL(s['server'], s['port'], context=ssl.create_default_context(), timeout=s['timeout'])
+            server.ehlo()
         else:
-            with smtplib.SMTP(smtp_server, smtp_port, timeout=10) as server:
-                server.ehlo()
+            server = smtplib.SMTP(s['server'], s['port'], timeout=s['timeout'])
+            server.ehlo()
+            if server.has_extn('starttls'):
                 try:
                     server.starttls(context=ssl.create_default_context())
                     server.ehlo()
                 except Exception:
                     # STARTTLS may be unsupported on some servers
                     pass
-                server.login(smtp_username, smtp_password)
-                server.sendmail(from_email, [to_email], msg.as_string())
+        if s['username'] and s['password']:
+            try:
+                server.login(s['username'], s['password'])
+            except smtplib.SMTPAuthenticationError:
+                server.close()
+                raise
+            except smtplib.SMTPNotSupportedError:
+                if self.require_auth:
+                    server.close()
+                    raise
+        self.server = server
+        self.connections += 1
+        return server
+
+    def send(self, to_email: str, subject: str, body: str) -> None:
+        msg = build_message(to_email, subject, body, app=self.app)
+        payload = msg.as_string()
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            if self.server is None:
+                self.connect()
+            try:
+                self.server.sendmail(self.settings['from_email'], [to_email], payload)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                self.connect()
+                self.server.sendmail(self.settings['from_email'], [to_email], payload)
+            outcome = 'sent'
+        finally:
+            EMAIL_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        self.sent += 1
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                try:
+                    self.server.close()
+                except Exception:
+                    pass
+            self.server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _outbox_enabled(deferred) -> bool:
+    if deferred is None:
+        return bool(current_app.config.get('EMAIL_OUTBOX_ENABLED'))
+    return bool(deferred)
+
+
+def _queue(to_email: str, subject: str, body: str) -> bool:
+    """Queue a message in the outbox; returns False if the outbox is unavailable.
+
+    The insert runs in a savepoint, so a failure (e.g. the email_outbox table
+    is not migrated yet) leaves the caller's pending changes in the session.
+    """
+    try:
+        from apps.api import db
+        from apps.api.utils.email_outbox import queue_email, wake_sender
+    except ImportError:
+        from __init__ import db
+        from utils.email_outbox import queue_email, wake_sender
+    try:
+        with db.session.begin_nested():
+            queue_email(to_email, subject, body, commit=False)
+    except Exception as exc:
+        current_app.logger.warning("Email outbox unavailable, sending inline: %s", exc)
+        return False
+    try:
+        db.session.commit()
+    except Exception as exc:
+        # A failed commit leaves nothing to keep; the session has to be reset
+        db.session.rollback()
+        current_app.logger.warning("Email outbox commit failed, sending inline: %s", exc)
+        return False
+    try:
+        wake_sender()
+    except Exception:
+        # The row is committed; the worker's next pass sends it
+        current_app.logger.exception("Could not wake the email outbox sender")
+    return True
+
+
+def send_verification_email(to_email: str, verify_link: str, deferred: bool | None = None) -> None:
+    """Send an email verification message with a verification link.
+
+    Uses SMTP settings from Flask app config. Queued in the outbox when
+    enabled; otherwise sent inline and raises on failure.
+    """
+    app = current_app
+    app_name = app.config.get('APP_NAME', 'MunLink Region III')
+
+    subject = f"Verify your email for {app_name}"
+    body = (
+        f"Hello,\n\n"
+        f"Please verify your email to complete your registration to {app_name}.\n\n"
+        f"Click the link below (valid for 24 hours):\n"
+        f"{verify_link}\n\n"
+        f"If you did not sign up, you can ignore this email.\n\n"
+        f"Thank you,\n{app_name} Team"
+    )
+
+    if _outbox_enabled(deferred) and _queue(to_email, subject, body):
+        return
+
+    # Best effort send; raise with detailed logs so caller can surface in DEBUG
+    smtp_username = app.config.get('SMTP_USERNAME')
+    try:
+        current_app.logger.info(f"Attempting to send email to {to_email} via {app.config.get('SMTP_SERVER')}:{app.config.get('SMTP_PORT')}")
+        with SMTPSession(require_auth=True) as session:
+            session.send(to_email, subject, body)
         current_app.logger.info(f"Email sent successfully to {to_email}")
     except smtplib.SMTPAuthenticationError as exc:
         current_app.logger.error(f"SMTP Authentication failed for {smtp_username}: {exc}. Make sure you're using a Gmail App Password, not your regular password.")
@@ -81,35 +208,17 @@ def send_verification_email(to_email: str, verify_link: str) -> None:
         raise
 
 
-def send_generic_email(to_email: str, subject: str, body: str) -> None:
-    """Send a generic email using SMTP config if available; fallback to logging."""
-    app = current_app
+def send_generic_email(to_email: str, subject: str, body: str, deferred: bool | None = None) -> None:
+    """Send a generic email using SMTP config if available; fallback to logging.
+
+    ``deferred=None`` follows ``EMAIL_OUTBOX_ENABLED``; pass ``False`` to force
+    an inline send (e.g. SMTP smoke tests).
+    """
+    if _outbox_enabled(deferred) and _queue(to_email, subject, body):
+        return
     try:
-        smtp_server = app.config.get('SMTP_SERVER')
-        smtp_port = int(app.config.get('SMTP_PORT', 587))
-        smtp_username = app.config.get('SMTP_USERNAME')
-        smtp_password = app.config.get('SMTP_PASSWORD')
-        from_email = app.config.get('FROM_EMAIL', smtp_username or 'noreply@example.com')
-        app_name = app.config.get('APP_NAME', 'MunLink Region III')
-
-        msg = MIMEText(body, 'plain', 'utf-8')
-        msg['Subject'] = subject
-        msg['From'] = formataddr((app_name, from_email))
-        msg['To'] = to_email
-
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=10) as server:
-            server.ehlo()
-            try:
-                server.starttls()
-                server.ehlo()
-            except Exception:
-                pass
-            if smtp_username and smtp_password:
-                try:
-                    server.login(smtp_username, smtp_password)
-                except Exception:
-                    pass
-            server.sendmail(from_email, [to_email], msg.as_string())
+        with SMTPSession() as session:
+            session.send(to_email, subject, body)
     except Exception:
         try:
             current_app.logger.info("Email (fallback log): to=%s subject=%s body=%s", to_email, subject, body)
@@ -117,9 +226,9 @@ def send_generic_email(to_email: str, subject: str, body: str) -> None:
             pass
 
 
-def send_user_status_email(to_email: str, approved: bool, reason: str | None = None) -> None:
-    app = current_app
-    app_name = app.config.get('APP_NAME', 'MunLink Region III')
+def user_status_email_content(approved: bool, reason: str | None = None) -> tuple[str, str]:
+    """Subject and body of the registration approved/rejected notification."""
+    app_name = current_app.config.get('APP_NAME', 'MunLink Region III')
     if approved:
         subject = f"{app_name}: Registration Approved"
         body = (
@@ -132,6 +241,11 @@ def send_user_status_email(to_email: str, approved: bool, reason: str | None = N
             "Your registration has been rejected.\n"
             f"Reason: {reason or 'Not specified.'}\n"
         )
+    return subject, body
+
+
+def send_user_status_email(to_email: str, approved: bool, reason: str | None = None) -> None:
+    subject, body = user_status_email_content(approved, reason)
     send_generic_email(to_email, subject, body)
 
 
@@ -156,4 +270,3 @@ def send_document_request_status_email(to_email: str, doc_name: str, requested_a
         )
     send_generic_email(to_email, subject, body)
 
-
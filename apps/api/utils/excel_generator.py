@@ -93,7 +93,8 @@ def generate_workbook(sheets: Dict[str, Dict[str, Any]]) -> Workbook:
             if header_row_idx > ws.max_row:
                 # Ensure we are at correct row
                 while ws.max_row < header_row_idx - 1:
-                    ws.append([])
+                    # append([]) does not add a row; touching a cell does
+                    ws.cell(row=ws.max_row + 1, column=1)
             ws.append(headers)
             for cell in ws[header_row_idx]:
                 cell.font = bold
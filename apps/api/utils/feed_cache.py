@@ -0,0 +1,210 @@
+"""Pre-serialized marketplace browse feed.
+
+``GET /api/marketplace/items`` with the default browse filters (available
+items, newest first, no keyword search or ``fields``) caches the JSON body of
+its first ``FEED_CACHE_PAGES`` pages per (municipality, category,
+transaction type, page, per_page). Hits are served from memory without
+touching the database.
+
+Invalidation is driven by the session: when a commit inserts, updates or
+deletes an item that was or is visible in the feed (``status='available'``
+and active), every cached page whose filters match the item's old or new
+municipality/category/transaction type is dropped. That covers admin
+approval, ``update_item``, ``delete_item`` and the transaction flows that
+reserve or release items. A page whose query started before an invalidation
+is served but not cached (``FeedCache.generation``).
+
+The cache lives in each process; ``FEED_CACHE_TTL`` bounds how long another
+worker can serve a page that this process invalidated.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+try:
+    from apps.api.models.marketplace import Item
+except ImportError:
+    from models.marketplace import Item
+
+
+FeedKey = Tuple[Optional[int], Optional[str], Optional[str], int, int]
+
+_listeners_installed = False
+
+
+class FeedCache:
+    """Small thread-safe LRU of response bodies with a TTL."""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 30):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; see put()
+        self.generation = 0
+
+    def get(self, key: FeedKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, body = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: FeedKey, body: str, generation: Optional[int] = None) -> bool:
+        """Cache ``body`` unless an invalidation ran since ``generation`` was read.
+
+        A page built from a query that started before a commit's invalidation
+        may predate that commit, so it is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, scopes: Iterable[Tuple[int, str, str]]) -> int:
+        """Drop pages whose filters match any (municipality, category, type)."""
+        scopes = set(scopes)
+        if not scopes:
+            return 0
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key in self._entries
+                if any(
+                    key[0] in (None, muni) and key[1] in (None, category) and key[2] in (None, tx_type)
+                    for muni, category, tx_type in scopes
+                )
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+def get_cache(app=None) -> Optional[FeedCache]:
+    app = app or current_app
+    return app.extensions.get('feed_cache')
+
+
+def feed_key(args) -> Optional[FeedKey]:
+    """Cache key for a list_items request, or None when it is not a browse page."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    if (args.get('q') or '').strip() or args.get('fields'):
+        return None
+    if args.get('status', 'available') != 'available':
+        return None
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 20, type=int)
+    if page < 1 or page > int(current_app.config.get('FEED_CACHE_PAGES', 3)):
+        return None
+    if per_page < 1 or per_page > int(current_app.config.get('FEED_CACHE_MAX_PER_PAGE', 50)):
+        return None
+    return (
+        args.get('municipality_id', type=int) or None,
+        args.get('category') or None,
+        args.get('transaction_type') or None,
+        page,
+        per_page,
+    )
+
+
+def _visible(status, is_active) -> bool:
+    return status == 'available' and is_active is not False
+
+
+def _scopes(item: Item, new: bool, deleted: bool) -> Set[Tuple[int, str, str]]:
+    """(municipality, category, type) combinations ``item`` appears under, before and after."""
+    if new:
+        if not _visible(item.status, item.is_active):
+            return set()
+        return {(item.municipality_id, item.category, item.transaction_type)}
+
+    state = sa_inspect(item)
+
+    def values(attr):
+        history = state.attrs[attr].history
+        old = list(history.deleted) or list(history.unchanged) or list(history.added)
+        now = list(history.added) or list(history.unchanged)
+        return old[0] if old else None, now[0] if now else None
+
+    status_old, status_new = values('status')
+    active_old, active_new = values('is_active')
+    was, now = _visible(status_old, active_old), _visible(status_new, active_new) and not deleted
+    if not was and not now:
+        return set()
+    scopes = set()
+    (m_old, m_new), (c_old, c_new), (t_old, t_new) = (
+        values('municipality_id'), values('category'), values('transaction_type'),
+    )
+    if was:
+        scopes.add((m_old, c_old, t_old))
+    if now:
+        scopes.add((m_new, c_new, t_new))
+    return scopes
+
+
+def _after_flush(session, flush_context):
+    if not has_app_context() or get_cache() is None:
+        return
+    scopes = set()
+    for obj in session.new:
+        if isinstance(obj, Item):
+            scopes |= _scopes(obj, new=True, deleted=False)
+    for obj in session.dirty:
+        if isinstance(obj, Item) and session.is_modified(obj, include_collections=False):
+            scopes |= _scopes(obj, new=False, deleted=False)
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            scopes |= _scopes(obj, new=False, deleted=True)
+    if scopes:
+        session.info.setdefault('_feed_invalidations', set()).update(scopes)
+
+
+def _after_commit(session):
+    scopes = session.info.pop('_feed_invalidations', None)
+    if scopes and has_app_context():
+        cache = get_cache()
+        if cache is not None:
+            cache.invalidate(scopes)
+
+
+def _after_rollback(session):
+    session.info.pop('_feed_invalidations', None)
+
+
+def init_feed_cache(app) -> None:
+    """Create the per-app feed cache and install the invalidation hooks."""
+    global _listeners_installed
+    if not app.config.get('FEED_CACHE_ENABLED', True):
+        return
+    app.extensions['feed_cache'] = FeedCache(
+        max_entries=app.config.get('FEED_CACHE_MAX_ENTRIES', 1000),
+        ttl=app.config.get('FEED_CACHE_TTL', 30),
+    )
+    if not _listeners_installed:
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+        _listeners_installed = True
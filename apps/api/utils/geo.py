@@ -0,0 +1,195 @@
+"""Geohash helpers for location queries on issues.
+
+Every issue with coordinates carries a geohash (``Issue.geohash``, indexed).
+Bounding boxes and radii are turned into a handful of geohash prefix ranges
+(``geohash >= 'wdw4' AND geohash < 'wdw5'``), which any B-tree index can
+answer on PostgreSQL and SQLite alike; exact distance/box checks then run on
+the small candidate set. Map clustering groups by a geohash prefix whose
+length follows the zoom level.
+"""
+from __future__ import annotations
+
+import math
+
+from sqlalchemy import and_, event, or_
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m cells
+MAX_COVER_CELLS = 24
+EARTH_RADIUS_M = 6371008.8
+
+_listeners_installed = False
+
+
+def encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value, lon_lo = (value << 1) | 1, mid
+            else:
+                value, lon_hi = value << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value, lat_lo = (value << 1) | 1, mid
+            else:
+                value, lat_hi = value << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def decode_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """``(min_lat, min_lon, max_lat, max_lon)`` of a geohash cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for ch in geohash:
+        value = _DECODE[ch]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """``(lat_degrees, lon_degrees)`` spanned by a cell of this precision."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def next_prefix(prefix: str) -> str | None:
+    """Smallest string greater than every geohash starting with ``prefix``."""
+    chars = list(prefix)
+    while chars:
+        idx = _DECODE[chars[-1]]
+        if idx + 1 < len(BASE32):
+            chars[-1] = BASE32[idx + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def _steps(lo: float, hi: float, step: float) -> list[float]:
+    values, v = [], lo
+    while v < hi:
+        values.append(v)
+        v += step
+    values.append(hi)
+    return values
+
+
+def cover_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+               max_cells: int = MAX_COVER_CELLS, max_precision: int = GEOHASH_PRECISION) -> list[str]:
+    """Geohash cells (all the same precision) covering the box."""
+    for precision in range(max_precision, 0, -1):
+        lat_step, lon_step = cell_size(precision)
+        n_lat = math.floor((max_lat - min_lat) / lat_step) + 2
+        n_lon = math.floor((max_lon - min_lon) / lon_step) + 2
+        if n_lat * n_lon <= max_cells:
+            break
+    lat_step, lon_step = cell_size(precision)
+    return sorted({
+        encode(lat, lon, precision)
+        for lat in _steps(min_lat, max_lat, lat_step)
+        for lon in _steps(min_lon, max_lon, lon_step)
+    })
+
+
+def prefix_filter(column, cells: list[str]):
+    """SQL condition matching geohashes under any of ``cells`` (merged ranges)."""
+    ranges: list[list] = []
+    for cell in sorted(cells):
+        hi = next_prefix(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1][1] = hi
+        else:
+            ranges.append([cell, hi])
+    clauses = [and_(column >= lo, column < hi) if hi else column >= lo for lo, hi in ranges]
+    return or_(*clauses)
+
+
+def radius_bbox(lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = math.degrees(radius_m / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+    return max(-90.0, lat - dlat), max(-180.0, lon - dlon), min(90.0, lat + dlat), min(180.0, lon + dlon)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def approx_distance(lat_column, lon_column, lat: float, lon: float):
+    """SQL expression ordering rows by distance from ``lat``/``lon``.
+
+    Squared equirectangular distance in degrees: plain arithmetic that every
+    backend can evaluate, and monotonic with the true distance at city scale.
+    """
+    scale = math.cos(math.radians(lat))
+    dlat = lat_column - lat
+    dlon = (lon_column - lon) * scale
+    return dlat * dlat + dlon * dlon
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """Geohash length giving roughly 8 clusters across a 256px map tile."""
+    tile_lon = 360.0 / 2 ** max(0, min(22, zoom))
+    precision = 1
+    for p in range(1, GEOHASH_PRECISION):
+        if cell_size(p)[1] < tile_lon / 8:
+            break
+        precision = p
+    return precision
+
+
+def parse_bbox(raw: str | None) -> tuple[float, float, float, float] | None:
+    """Parse ``minLng,minLat,maxLng,maxLat`` into ``(min_lat, min_lon, max_lat, max_lon)``."""
+    if not raw:
+        return None
+    parts = [float(p) for p in raw.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox must be minLng,minLat,maxLng,maxLat')
+    min_lon, min_lat, max_lon, max_lat = parts
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        raise ValueError('bbox is out of range or inverted')
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def _set_geohash(mapper, connection, target):
+    try:
+        lat, lon = float(target.latitude), float(target.longitude)
+    except (TypeError, ValueError):
+        target.geohash = None
+        return
+    valid = -90 <= lat <= 90 and -180 <= lon <= 180
+    target.geohash = encode(lat, lon) if valid else None
+
+
+def init_geo_index(app) -> None:
+    """Keep ``Issue.geohash`` in sync with latitude/longitude on every write."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    try:
+        from apps.api.models.issue import Issue
+    except ImportError:
+        from models.issue import Issue
+    event.listen(Issue, 'before_insert', _set_geohash)
+    event.listen(Issue, 'before_update', _set_geohash)
+    _listeners_installed = True
@@ -0,0 +1,128 @@
+"""Full-text search over marketplace item titles and descriptions.
+
+Backends:
+- PostgreSQL: ``items.search_vector`` is a generated ``tsvector`` column with a
+  GIN index (created by migration ``20261019_item_fts``), so it always tracks
+  inserts and updates. Ranked with ``ts_rank_cd``.
+- SQLite: an external-content FTS5 table ``items_fts`` kept in sync by
+  triggers. Ranked with ``bm25``. Created idempotently on first use so
+  databases made with ``db.create_all()`` work too.
+- Anything else: falls back to ``LIKE`` on title/description (unranked).
+
+Queries are tokenised to words and matched as prefixes, so user input never
+reaches the engine's query syntax.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import weakref
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+
+try:
+    from apps.api import db
+    from apps.api.models.marketplace import Item
+except ImportError:
+    from __init__ import db
+    from models.marketplace import Item
+
+
+MAX_TERMS = 8
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_ready_engines: 'weakref.WeakSet' = weakref.WeakSet()
+_lock = threading.Lock()
+_items_fts = table('items_fts', column('rowid'))
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        title, description, content='items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF title, description ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def search_terms(q: str | None) -> list[str]:
+    """Lower-cased word tokens of a user query (at most MAX_TERMS)."""
+    if not q:
+        return []
+    return [t.lower() for t in _TOKEN_RE.findall(q)][:MAX_TERMS]
+
+
+def _dialect() -> str:
+    return db.engine.dialect.name
+
+
+def ensure_search_index(rebuild: bool = False) -> None:
+    """Create the SQLite FTS table/triggers if missing (no-op elsewhere)."""
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    if engine in _ready_engines and not rebuild:
+        return
+    with _lock:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='items_fts'")
+            ).first()
+            for stmt in SQLITE_FTS_DDL:
+                conn.exec_driver_sql(stmt)
+            if rebuild or not exists:
+                # Index rows that predate the triggers
+                conn.exec_driver_sql("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+        _ready_engines.add(engine)
+
+
+def apply_item_search(query, q: str | None):
+    """Restrict an ``Item`` query to matches for ``q`` and order by relevance.
+
+    Returns ``(query, ranked)``; ``ranked`` is False when nothing was applied
+    (empty query) or the backend has no ranking, so callers keep their
+    default ordering.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query, False
+
+    dialect = _dialect()
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('simple', ' & '.join(f'{t}:*' for t in terms))
+        vector = literal_column('items.search_vector')
+        query = query.filter(vector.op('@@')(tsquery))
+        return query.order_by(func.ts_rank_cd(vector, tsquery).desc(), Item.created_at.desc()), True
+
+    if dialect == 'sqlite':
+        ensure_search_index()
+        match = ' '.join(f'"{t}"*' for t in terms)
+        fts = literal_column('items_fts')
+        # Materialising the matches makes SQLite drive the join (and the
+        # pagination COUNT) from the FTS hits instead of probing the FTS
+        # table once per row of idx_item_status.
+        hits = (
+            select(
+                _items_fts.c.rowid.label('item_id'),
+                # bm25: lower is better; title matches weigh more than description
+                func.bm25(fts, 10.0, 1.0).label('rank'),
+            )
+            .where(fts.op('MATCH')(match))
+            .cte('item_hits')
+            .prefix_with('MATERIALIZED')
+        )
+        query = query.join(hits, hits.c.item_id == Item.id)
+        return query.order_by(hits.c.rank, Item.created_at.desc()), True
+
+    for t in terms:
+        pattern = f'%{t}%'
+        query = query.filter(or_(Item.title.ilike(pattern), Item.description.ilike(pattern)))
+    return query, False
@@ -0,0 +1,85 @@
+"""orjson-backed JSON provider for API responses.
+
+``jsonify`` and ``request.get_json`` go through ``app.json``; this provider
+swaps the stdlib encoder for orjson, which serializes dicts, datetimes,
+dates, UUIDs and dataclasses natively in C. Output differences from the
+stdlib provider:
+
+* ``datetime``/``date`` values become ISO 8601 strings (the same format the
+  models' ``to_dict`` already emit) instead of HTTP dates;
+* keys keep insertion order instead of being sorted;
+* non-ASCII text is emitted as UTF-8 instead of ``\\uXXXX`` escapes.
+
+Calls the fast path cannot handle (custom ``dumps`` kwargs, integers beyond
+64 bits, ...) fall back to the stdlib provider. Select the provider with
+``JSON_PROVIDER`` (``orjson`` or ``default``); without orjson installed the
+stdlib provider stays in place.
+"""
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import typing as t
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(o):
+    """Types orjson does not serialize itself (also used by the stdlib fallback)."""
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson, with the stdlib provider as fallback."""
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        return self._dumpb(obj, **kwargs).decode('utf-8')
+
+    def _dumpb(self, obj: t.Any, pretty: bool = False, **kwargs: t.Any) -> bytes:
+        if not kwargs:
+            option = self.option | (orjson.OPT_INDENT_2 if pretty else 0)
+            try:
+                return orjson.dumps(obj, default=_default, option=option)
+            except (TypeError, orjson.JSONEncodeError):
+                pass
+        if pretty:
+            kwargs.setdefault('indent', 2)
+        kwargs.setdefault('default', _default)
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumpb(obj, pretty=pretty) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app) -> None:
+    """Install the provider selected by ``JSON_PROVIDER`` on ``app``."""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,366 @@
+"""Prometheus-style metrics with multi-process aggregation.
+
+Metrics live in process memory. With ``METRICS_DIR`` set, every process also
+snapshots its values to ``<METRICS_DIR>/metrics-<pid>.json`` at most every
+``METRICS_WRITE_INTERVAL`` seconds (and at exit). ``GET /metrics`` merges the
+snapshots of all gunicorn workers on the host with its own live values:
+
+* counters and histograms are summed over every snapshot, including workers
+  that have exited, so totals never go backwards after a worker restart;
+* gauges are summed over live processes only.
+
+Clear ``METRICS_DIR`` when the service (re)starts, as with the
+``prometheus_client`` multiprocess mode.
+
+Output follows the Prometheus text exposition format (version 0.0.4).
+Request metrics are labelled by Flask endpoint name (``marketplace.list_items``)
+rather than by path to keep label cardinality bounded.
+
+``GET /metrics`` needs ``Authorization: Bearer <METRICS_TOKEN>``. Without a
+token configured it is only served in DEBUG and answers 404 otherwise.
+"""
+from __future__ import annotations
+
+import atexit
+import glob
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+_pid = os.getpid()
+_last_write = 0.0
+REGISTRY: Dict[str, 'Metric'] = {}
+
+
+def _reset_after_fork() -> None:
+    """Values inherited through fork() belong to the parent process."""
+    global _pid, _last_write
+    if _pid != os.getpid():
+        _pid, _last_write = os.getpid(), 0.0
+        for metric in REGISTRY.values():
+            metric.values.clear()
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY[name] = self
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            _reset_after_fork()
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            _reset_after_fork()
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            _reset_after_fork()
+            self.values[key] = float(value)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            _reset_after_fork()
+            # [per-bucket counts..., +Inf count, sum]
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+HTTP_REQUESTS = Counter('munlink_http_requests_total', 'HTTP requests handled.', ('endpoint', 'method', 'status'))
+HTTP_DURATION = Histogram('munlink_http_request_duration_seconds', 'HTTP request latency.', ('endpoint', 'method'))
+HTTP_IN_FLIGHT = Gauge('munlink_http_requests_in_flight', 'HTTP requests currently being handled.', ('endpoint',))
+HTTP_EXCEPTIONS = Counter('munlink_http_exceptions_total', 'Unhandled exceptions raised by views.', ('endpoint',))
+DB_CHECKOUTS = Counter('munlink_db_pool_checkouts_total', 'Connections checked out of the DB pool.')
+DB_CHECKOUT_SECONDS = Histogram('munlink_db_pool_checkout_seconds',
+                                'Time to obtain a DB connection from the pool, including waits.',
+                                buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+DB_CHECKOUT_ERRORS = Counter('munlink_db_pool_checkout_errors_total', 'Failed DB pool checkouts (e.g. pool timeout).')
+DB_IN_USE = Gauge('munlink_db_pool_connections_in_use', 'DB connections currently checked out.')
+DB_OVERFLOW = Gauge('munlink_db_pool_overflow_connections', 'Open DB connections beyond pool_size.')
+DB_OVERFLOW_CHECKOUTS = Counter('munlink_db_pool_overflow_checkouts_total',
+                                'Checkouts made while the pool was beyond pool_size.')
+DB_PINGS = Counter('munlink_db_pool_liveness_pings_total', 'Liveness pings of idle DB connections.', ('outcome',))
+PDF_SECONDS = Histogram('munlink_pdf_generation_seconds', 'Document PDF generation time.',
+                        buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+EMAIL_SECONDS = Histogram('munlink_email_send_seconds', 'SMTP send time per message.', ('outcome',),
+                          buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+
+# --- snapshots and aggregation -------------------------------------------
+
+def snapshot() -> dict:
+    with _lock:
+        _reset_after_fork()
+        return {
+            name: {json.dumps(list(key)): (list(value) if isinstance(value, list) else value)
+                   for key, value in metric.values.items()}
+            for name, metric in REGISTRY.items()
+        }
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory: str) -> None:
+    """Atomically replace this process's snapshot file."""
+    os.makedirs(directory, exist_ok=True)
+    pid = os.getpid()
+    path = os.path.join(directory, f'metrics-{pid}.json')
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump({'pid': pid, 'written_at': time.time(), 'metrics': snapshot()}, fh, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def maybe_write_snapshot(app) -> None:
+    global _last_write
+    directory = app.config.get('METRICS_DIR')
+    if not directory:
+        return
+    now = time.monotonic()
+    if now - _last_write < float(app.config.get('METRICS_WRITE_INTERVAL', 2)):
+        return
+    _last_write = now
+    try:
+        write_snapshot(directory)
+    except OSError:
+        app.logger.exception('Could not write metrics snapshot to %s', directory)
+
+
+def collect(directory: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+    """Merge this process's live values with other processes' snapshots."""
+    merged: Dict[str, Dict[str, object]] = {}
+    sources = [snapshot()]
+    if directory:
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            try:
+                with open(path, encoding='utf-8') as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            pid = data.get('pid')
+            if pid == os.getpid():
+                continue  # live values already included
+            live = _alive(pid) if isinstance(pid, int) else False
+            metrics = data.get('metrics') or {}
+            sources.append({
+                name: values for name, values in metrics.items()
+                if name in REGISTRY and (live or REGISTRY[name].kind != 'gauge')
+            })
+    for source in sources:
+        for name, values in source.items():
+            target = merged.setdefault(name, {})
+            for key, value in values.items():
+                if isinstance(value, list):
+                    current = target.get(key)
+                    target[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    target[key] = target.get(key, 0.0) + value
+    return merged
+
+
+# --- exposition ------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value)) + '.0'
+
+
+def render(merged: Dict[str, Dict[str, object]]) -> str:
+    lines: List[str] = []
+    for name, metric in REGISTRY.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key in sorted(merged.get(name, {})):
+            value = merged[name][key]
+            labelvalues = json.loads(key)
+            if metric.kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f'{name}_bucket{_labels(metric.labelnames, labelvalues, le)} {_number(cumulative)}')
+                lines.append(f'{name}_sum{_labels(metric.labelnames, labelvalues)} {_number(value[-1])}')
+                lines.append(f'{name}_count{_labels(metric.labelnames, labelvalues)} {_number(cumulative)}')
+            else:
+                lines.append(f'{name}{_labels(metric.labelnames, labelvalues)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Flask and SQLAlchemy hooks -------------------------------------------
+
+def _endpoint() -> str:
+    return request.endpoint or 'unmatched'
+
+
+def _before_request():
+    g._metrics_started = time.perf_counter()
+    g._metrics_endpoint = _endpoint()
+    HTTP_IN_FLIGHT.inc(endpoint=g._metrics_endpoint)
+
+
+def _after_request(response):
+    started = g.pop('_metrics_started', None)
+    endpoint = g.get('_metrics_endpoint') or _endpoint()
+    if started is not None:
+        HTTP_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+
+def _teardown_request(exc):
+    endpoint = g.pop('_metrics_endpoint', None)
+    if endpoint is None:
+        return
+    if exc is not None:
+        HTTP_EXCEPTIONS.inc(endpoint=endpoint)
+        if g.pop('_metrics_started', None) is not None:
+            # after_request did not run
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=500)
+    HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+    maybe_write_snapshot(current_app)
+
+
+def instrument_engine(engine) -> None:
+    """Count pool checkouts and time how long getting a connection takes.
+
+    The checkout/checkin listeners are registered on the engine, so they carry
+    over to the new pool after ``engine.dispose()``. Pool events have no hook
+    before a checkout starts, so the wait is timed around
+    ``Engine.raw_connection`` (which every ``Connection`` goes through) on the
+    engine object itself rather than on a pool that can be replaced.
+    """
+    if getattr(engine, '_munlink_metrics', False):
+        return
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        except Exception:
+            DB_CHECKOUT_ERRORS.inc()
+            raise
+        finally:
+            DB_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+    engine.raw_connection = timed_raw_connection
+    engine._munlink_metrics = True
+    event.listen(engine, 'checkout', lambda *args: (DB_CHECKOUTS.inc(), DB_IN_USE.inc()))
+    event.listen(engine, 'checkin', lambda *args: DB_IN_USE.dec())
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        if not current_app.debug:
+            return Response('not found\n', status=404, mimetype='text/plain')
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'),
+                                 f'Bearer {token}'.encode('utf-8')):
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    body = render(collect(current_app.config.get('METRICS_DIR') or None))
+    return Response(body, content_type=CONTENT_TYPE)
+
+
+def init_metrics(app) -> None:
+    """Register request hooks, pool instrumentation and ``GET /metrics``."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
+    with app.app_context():
+        instrument_engine(app.extensions['sqlalchemy'].engine)
+    if app.config.get('METRICS_DIR'):
+        atexit.register(lambda: _write_at_exit(app.config['METRICS_DIR']))
+
+
+def _write_at_exit(directory: str) -> None:
+    try:
+        write_snapshot(directory)
+    except OSError:
+        pass
@@ -0,0 +1,240 @@
+"""Opt-in profiling of individual production requests.
+
+A request is profiled when either
+
+* an admin sends ``X-Profile: 1`` (stack sampling) or ``X-Profile: cprofile``
+  with a valid admin JWT, or
+* it is picked by ``PROFILE_SAMPLE_RATE`` (0..1), optionally restricted to the
+  endpoints listed in ``PROFILE_ENDPOINTS`` (e.g.
+  ``admin.admin_export_entity,admin.generate_document_request_pdf``).
+
+Stack sampling walks the request thread's frames every
+``PROFILE_INTERVAL_MS`` from a helper thread and writes the result in the
+collapsed-stack format (``a;b;c 12``) read by flamegraph.pl, speedscope and
+inferno. ``cprofile`` writes a pstats dump (snakeviz, flameprof).
+
+Profiles are saved in ``PROFILE_DIR`` (outside the upload folder, never served
+statically) next to a small JSON description; only the newest
+``PROFILE_MAX_FILES`` are kept. Admins list and download them through
+``/api/admin/system/profiles``. The profile name is returned to the caller in
+the ``X-Profile-Id`` response header.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from flask import current_app, g, request
+
+
+_API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_NAME = re.compile(r'^[\w.-]+\.(folded|prof)$')
+ADMIN_ROLES = ('admin', 'municipal_admin')
+
+
+class StackSampler:
+    """Sample one thread's stack on an interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f'{stack} {count}\n')
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = os.path.abspath(code.co_filename)
+    if filename.startswith(_API_ROOT):
+        filename = os.path.relpath(filename, _API_ROOT)
+    else:
+        filename = '/'.join(filename.split(os.sep)[-2:])
+    # ';' separates frames in the collapsed format
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+def profile_dir(app=None) -> str:
+    app = app or current_app
+    return str(app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles'))
+
+
+def _is_admin_request() -> bool:
+    from flask_jwt_extended import get_jwt, verify_jwt_in_request
+    try:
+        verify_jwt_in_request(optional=True)
+        return (get_jwt() or {}).get('role') in ADMIN_ROLES
+    except Exception:
+        return False
+
+
+def _requested_mode() -> Optional[Tuple[str, str]]:
+    """``(mode, trigger)`` when this request should be profiled."""
+    header = request.headers.get('X-Profile', '').strip().lower()
+    if header and header not in ('0', 'false', 'off') and _is_admin_request():
+        return 'cprofile' if header == 'cprofile' else 'sample', 'header'
+    rate = float(current_app.config.get('PROFILE_SAMPLE_RATE') or 0)
+    if rate <= 0:
+        return None
+    endpoints = current_app.config.get('PROFILE_ENDPOINTS') or ''
+    allowed = {e.strip() for e in endpoints.split(',') if e.strip()}
+    if allowed and request.endpoint not in allowed:
+        return None
+    if random.random() < rate:
+        return 'sample', 'sampling'
+    return None
+
+
+def _start_profile():
+    selected = _requested_mode()
+    if selected is None:
+        return
+    mode, trigger = selected
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. coverage) already owns sys.setprofile
+            return
+    else:
+        interval = float(current_app.config.get('PROFILE_INTERVAL_MS', 5)) / 1000
+        profiler = StackSampler(threading.get_ident(), interval)
+        profiler.start()
+    g._profile = {'mode': mode, 'trigger': trigger, 'profiler': profiler, 'started': time.perf_counter()}
+
+
+def _stop(profile) -> None:
+    profiler = profile['profiler']
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+
+
+def _finish_profile(response):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return response
+    _stop(profile)
+    try:
+        name = save_profile(profile, response.status_code)
+        response.headers['X-Profile-Id'] = name
+    except OSError:
+        current_app.logger.exception('Could not save request profile')
+    return response
+
+
+def _abandon_profile(exc):
+    profile = g.pop('_profile', None)
+    if profile is not None:
+        _stop(profile)
+
+
+def save_profile(profile: dict, status: int) -> str:
+    directory = profile_dir()
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    duration_ms = (time.perf_counter() - profile['started']) * 1000
+    created = datetime.now(timezone.utc)
+    endpoint = request.endpoint or 'unmatched'
+    ext = 'prof' if profile['mode'] == 'cprofile' else 'folded'
+    safe_endpoint = re.sub(r'[^\w.-]', '_', endpoint)
+    stem = f"{created.strftime('%Y%m%dT%H%M%S%f')}-{safe_endpoint}-{os.getpid()}"
+    name = f'{stem}.{ext}'
+    profiler = profile['profiler']
+    if isinstance(profiler, cProfile.Profile):
+        profiler.dump_stats(os.path.join(directory, name))
+    else:
+        profiler.dump(os.path.join(directory, name))
+    meta = {
+        'name': name,
+        'mode': profile['mode'],
+        'trigger': profile['trigger'],
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': status,
+        'duration_ms': round(duration_ms, 2),
+        'samples': getattr(profiler, 'samples', None),
+        'created_at': created.isoformat(),
+    }
+    with open(os.path.join(directory, f'{stem}.json'), 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh)
+    _prune(directory, int(current_app.config.get('PROFILE_MAX_FILES', 100)))
+    return name
+
+
+def _prune(directory: str, keep: int) -> None:
+    metas = sorted(f for f in os.listdir(directory) if f.endswith('.json'))
+    for meta in metas[:max(len(metas) - keep, 0)]:
+        stem = meta[:-len('.json')]
+        for ext in ('.json', '.folded', '.prof'):
+            try:
+                os.remove(os.path.join(directory, stem + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 50) -> List[dict]:
+    """Descriptions of the most recent profiles, newest first."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for meta in sorted((f for f in os.listdir(directory) if f.endswith('.json')), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, meta), encoding='utf-8') as fh:
+                out.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Absolute path of a saved profile, or None for unknown/unsafe names."""
+    if not _NAME.match(name or ''):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def init_profiler(app) -> None:
+    if not app.config.get('PROFILER_ENABLED', True):
+        return
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
@@ -1,5 +1,7 @@
-"""QR code generation utilities for document validation."""
-import qrcode
+"""QR code generation utilities for document validation.
+
+qrcode (and Pillow behind it) is imported on first use to keep app start-up light.
+"""
 import json
 import os
 from datetime import datetime
@@ -39,6 +41,8 @@ def generate_qr_code_image(qr_data, size=300):
     # qr_data is now a simple string URL
     qr_string = str(qr_data)
     
+    import qrcode
+
     # Create QR code instance
     qr = qrcode.QRCode(
         version=1,
@@ -75,6 +79,8 @@ def save_qr_code_file(qr_data, file_path):
     # qr_data is now a simple string URL
     qr_string = str(qr_data)
     
+    import qrcode
+
     # Create QR code instance
     qr = qrcode.QRCode(
         version=1,
@@ -1,6 +1,7 @@
 """Utilities for generating claim tickets (QR + code + token) for pickup.
 
 Reuses existing DocumentRequest.qr_code (string path) and qr_data (JSON dict).
+qrcode/Pillow and cryptography are imported on first use, not at app start-up.
 """
 from __future__ import annotations
 
@@ -8,15 +9,16 @@ import os
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import TYPE_CHECKING, Tuple, Dict, Any
 import base64
 import hashlib
 
 import bcrypt
-import qrcode
 import jwt
 from flask import current_app
-from cryptography.fernet import Fernet, InvalidToken
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
 
 
 ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # no O/0/I/1
@@ -87,6 +89,8 @@ def build_qr_png(data: str, request_id: int, municipality_slug: str) -> Tuple[Pa
     out_dir.mkdir(parents=True, exist_ok=True)
     png_path = out_dir / f"{request_id}.png"
 
+    import qrcode
+
     qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=10, border=4)
     qr.add_data(data)
     qr.make(fit=True)
@@ -124,6 +128,8 @@ def _get_fernet() -> Fernet:
     If CLAIM_CODE_ENC_KEY is provided and already looks like a valid Fernet key
     (urlsafe base64 32 bytes), we use it directly; otherwise derive from secret.
     """
+    from cryptography.fernet import Fernet
+
     key = current_app.config.get("CLAIM_CODE_ENC_KEY") or current_app.config.get("JWT_SECRET_KEY") or "change-me"
     # Try to interpret as base64 key first
     fernet_key: bytes
@@ -152,6 +158,8 @@ def decrypt_code(token: str) -> str:
     """
     if not token:
         return ""
+    from cryptography.fernet import InvalidToken
+
     f = _get_fernet()
     try:
         plain = f.decrypt(token.encode("utf-8"))
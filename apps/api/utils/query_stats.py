@@ -0,0 +1,147 @@
+"""Per-request SQL query counting and slow-query logging.
+
+Engine ``before/after_cursor_execute`` hooks time every statement. Inside a
+request the count and total DB time are accumulated on ``g`` and returned as
+response headers::
+
+    X-Query-Count: 7
+    Server-Timing: db;dur=12.4;desc="7 queries", app;dur=31.0
+
+Statements slower than ``SLOW_QUERY_MS`` are logged to the
+``munlink.slow_query`` logger as one JSON object per line with the
+normalized SQL (literals replaced by ``?``), the duration and the first
+application frame that issued the query.
+
+``count_queries()`` is also usable on its own, e.g. to hold an endpoint to a
+query budget in tests.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+slow_log = logging.getLogger('munlink.slow_query')
+
+_API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+_listeners_installed = False
+# Active count_queries() collectors (test/diagnostic use)
+_collectors: List[list] = []
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace literals so similar queries group together."""
+    sql = _STRING.sub('?', statement)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def call_site() -> Optional[str]:
+    """``path:line in function`` of the innermost application frame."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_API_ROOT) and filename != _THIS_FILE and '/tests/' not in filename:
+            return f'{os.path.relpath(filename, _API_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    for collected in _collectors:
+        collected.append(statement)
+    if not has_app_context() or not current_app.config.get('QUERY_STATS_ENABLED', True):
+        return
+    if has_request_context():
+        stats = g.get('_query_stats')
+        if stats is None:
+            stats = g._query_stats = {'count': 0, 'ms': 0.0}
+        stats['count'] += 1
+        stats['ms'] += elapsed_ms
+    threshold = current_app.config.get('SLOW_QUERY_MS', 200)
+    if threshold is not None and elapsed_ms >= float(threshold):
+        entry = {
+            'event': 'slow_query',
+            'ms': round(elapsed_ms, 2),
+            'sql': normalize_sql(statement),
+            'call_site': call_site(),
+            'executemany': bool(executemany),
+        }
+        if has_request_context():
+            entry.update(method=request.method, path=request.path, endpoint=request.endpoint)
+        slow_log.warning(json.dumps(entry, default=str))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    connection = context.connection
+    if connection is not None:
+        starts = connection.info.get('_query_start')
+        if starts:
+            starts.pop()
+
+
+def _start_timer():
+    g._request_started = time.perf_counter()
+
+
+def _add_headers(response):
+    if not current_app.config.get('QUERY_STATS_ENABLED', True):
+        return response
+    stats = g.get('_query_stats') or {'count': 0, 'ms': 0.0}
+    timing = [f'db;dur={stats["ms"]:.1f};desc="{stats["count"]} queries"']
+    started = g.get('_request_started')
+    if started is not None:
+        timing.append(f'app;dur={(time.perf_counter() - started) * 1000:.1f}')
+    response.headers['X-Query-Count'] = str(stats['count'])
+    response.headers.add('Server-Timing', ', '.join(timing))
+    return response
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed inside the block (any thread)."""
+    collected: list = []
+    _collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        _collectors.remove(collected)
+
+
+def init_query_stats(app) -> None:
+    """Install the engine timing hooks (once per process) and the response headers."""
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+    app.before_request(_start_timer)
+    app.after_request(_add_headers)
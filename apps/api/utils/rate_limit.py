@@ -0,0 +1,230 @@
+"""Sliding-window rate limiting for authentication endpoints.
+
+Attempts are recorded per key (e.g. ``login:ip:1.2.3.4``) and rejected once
+more than ``limit`` hits fall inside the trailing ``window`` seconds. Checks
+run before any database lookup or bcrypt work so credential-stuffing bursts
+are cheap to turn away.
+
+Two storage backends are available:
+
+- ``memory`` (default): per-process deques guarded by a lock.
+- ``sqlite``: a small local SQLite file shared by every worker on the host,
+  so limits hold across gunicorn workers without an external service.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, jsonify, request
+
+
+def parse_limit(spec: str) -> Tuple[int, int]:
+    """Parse a ``"<count>/<seconds>"`` spec such as ``"10/300"``."""
+    count, _, seconds = str(spec).partition('/')
+    return int(count), int(seconds or 60)
+
+
+class MemoryBackend:
+    """Per-process sliding window storage."""
+
+    def __init__(self):
+        self._hits: Dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> Tuple[bool, int]:
+        with self._lock:
+            hits = self._hits[key]
+            cutoff = now - window
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+            if len(hits) >= limit:
+                return False, max(1, int(hits[0] + window - now) + 1)
+            hits.append(now)
+            return True, 0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def prune(self, max_window: int, now: float) -> None:
+        with self._lock:
+            cutoff = now - max_window
+            for key in [k for k, v in self._hits.items() if not v or v[-1] <= cutoff]:
+                del self._hits[key]
+
+
+class SQLiteBackend:
+    """Sliding window storage in a local SQLite file shared across workers."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_hits (key TEXT NOT NULL, ts REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_limit_key_ts ON rate_limit_hits (key, ts)')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> Tuple[bool, int]:
+        conn = self._conn()
+        cutoff = now - window
+        # BEGIN IMMEDIATE serializes concurrent writers so check-and-record is atomic
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM rate_limit_hits WHERE key = ? AND ts <= ?', (key, cutoff))
+            count, oldest = conn.execute(
+                'SELECT COUNT(*), MIN(ts) FROM rate_limit_hits WHERE key = ?', (key,)
+            ).fetchone()
+            if count >= limit:
+                conn.execute('COMMIT')
+                return False, max(1, int(oldest + window - now) + 1)
+            conn.execute('INSERT INTO rate_limit_hits (key, ts) VALUES (?, ?)', (key, now))
+            conn.execute('COMMIT')
+            return True, 0
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def reset(self, key: str) -> None:
+        self._conn().execute('DELETE FROM rate_limit_hits WHERE key = ?', (key,))
+
+    def prune(self, max_window: int, now: float) -> None:
+        self._conn().execute('DELETE FROM rate_limit_hits WHERE ts <= ?', (now - max_window,))
+
+
+class RateLimiter:
+    """Sliding-window limiter with monitoring counters."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, backend=None, enabled: bool = True):
+        self.backend = backend or MemoryBackend()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {'allowed': 0, 'blocked': 0})
+        self._max_window = 0
+        self._calls = 0
+
+    def hit(self, scope: str, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        """Record an attempt for ``scope:key``; return (allowed, retry_after_seconds)."""
+        if not self.enabled or limit <= 0:
+            return True, 0
+        now = time.time()
+        try:
+            allowed, retry_after = self.backend.hit(f'{scope}:{key}', limit, window, now)
+        except Exception:
+            # Storage problems must never lock users out
+            return True, 0
+        with self._lock:
+            self._counters[scope]['allowed' if allowed else 'blocked'] += 1
+            self._max_window = max(self._max_window, window)
+            self._calls += 1
+            prune = self._calls % self.PRUNE_EVERY == 0
+        if prune:
+            try:
+                self.backend.prune(self._max_window, now)
+            except Exception:
+                pass
+        return allowed, retry_after
+
+    def reset(self, scope: str, key: str) -> None:
+        try:
+            self.backend.reset(f'{scope}:{key}')
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            scopes = {k: dict(v) for k, v in self._counters.items()}
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'scopes': scopes,
+            'allowed_total': sum(v['allowed'] for v in scopes.values()),
+            'blocked_total': sum(v['blocked'] for v in scopes.values()),
+        }
+
+
+def init_rate_limiter(app) -> RateLimiter:
+    """Create the limiter for this app from config and register it as an extension."""
+    backend_name = (app.config.get('RATE_LIMIT_BACKEND') or 'memory').lower()
+    if backend_name == 'sqlite':
+        backend = SQLiteBackend(app.config.get('RATE_LIMIT_STORAGE_PATH'))
+    else:
+        backend = MemoryBackend()
+    limiter = RateLimiter(backend, enabled=bool(app.config.get('RATE_LIMIT_ENABLED', True)))
+    app.extensions['rate_limiter'] = limiter
+    return limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        limiter = init_rate_limiter(current_app)
+    return limiter
+
+
+def client_ip() -> str:
+    """Client address as seen by our own proxies.
+
+    Clients can send any X-Forwarded-For they like, so only the hops appended
+    by the ``RATE_LIMIT_TRUSTED_PROXIES`` proxies in front of the app (Render's
+    load balancer: 1) are believed: the entry that many places from the end.
+    With the default of 0 the header is ignored and the peer address is used.
+    """
+    trusted = int(current_app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0))
+    hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+    if trusted > 0 and len(hops) >= trusted:
+        return hops[-trusted]
+    return request.remote_addr or 'unknown'
+
+
+def check_rate_limits(action: str, account: Optional[str] = None) -> Optional[int]:
+    """Apply per-IP and per-account limits for ``action``.
+
+    Limits come from ``<ACTION>_RATE_LIMIT_IP`` and ``<ACTION>_RATE_LIMIT_ACCOUNT``
+    config keys. Returns the retry-after seconds when the attempt is blocked,
+    otherwise None.
+    """
+    limiter = get_rate_limiter()
+    if not limiter.enabled:
+        return None
+    prefix = action.upper()
+    checks = [('ip', client_ip(), current_app.config.get(f'{prefix}_RATE_LIMIT_IP'))]
+    if account:
+        checks.append(('account', account.strip().lower(), current_app.config.get(f'{prefix}_RATE_LIMIT_ACCOUNT')))
+    for kind, key, spec in checks:
+        if not spec:
+            continue
+        limit, window = parse_limit(spec)
+        allowed, retry_after = limiter.hit(f'{action}:{kind}', key, limit, window)
+        if not allowed:
+            return retry_after
+    return None
+
+
+def reset_account_limit(action: str, account: str) -> None:
+    """Clear the per-account window, e.g. after a successful login."""
+    get_rate_limiter().reset(f'{action}:account', account.strip().lower())
+
+
+def rate_limited_response(retry_after: int):
+    resp = jsonify({'error': 'Too many attempts. Please try again later.', 'retry_after': retry_after})
+    resp.status_code = 429
+    resp.headers['Retry-After'] = str(retry_after)
+    return resp
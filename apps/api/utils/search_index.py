@@ -0,0 +1,294 @@
+"""Typo-tolerant keyword search for issues and announcements.
+
+Text is folded (lower-case, accents stripped, common Filipino/English
+spelling variants merged, e.g. ph/f/p, c/k/s, v/b, z/s, ch/ts, doubled
+letters) and split into word trigrams. Each indexed row gets a
+``search_documents`` entry and one ``search_trigrams`` posting per distinct
+trigram (see ``models/search.py``).
+
+A query matches a document when enough of the query's trigrams appear in it
+(``SEARCH_MIN_SIMILARITY``), so "kalsada"/"calsada" or "pilipinas"/"filipinas"
+find each other, and a single typo still leaves most trigrams intact.
+
+The index is maintained incrementally from a session ``after_flush`` hook in
+the same transaction as the write; ``rebuild_search_index`` backfills it.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import time
+import unicodedata
+import weakref
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, func, inspect as sa_inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+try:
+    from apps.api import db
+    from apps.api.models.announcement import Announcement
+    from apps.api.models.issue import Issue
+    from apps.api.models.search import SearchDocument, SearchTrigram
+except ImportError:
+    from __init__ import db
+    from models.announcement import Announcement
+    from models.issue import Issue
+    from models.search import SearchDocument, SearchTrigram
+
+
+# entity_type -> (model, indexed text fields)
+SEARCHABLE = {
+    'issue': (Issue, ('issue_number', 'title', 'description')),
+    'announcement': (Announcement, ('title', 'content')),
+}
+_MODEL_TYPES = {model: entity_type for entity_type, (model, _) in SEARCHABLE.items()}
+
+MAX_QUERY_TRIGRAMS = 64
+
+_FOLD_RULES = [(re.compile(pattern), repl) for pattern, repl in (
+    (r'ph', 'f'),
+    (r'qu', 'k'),
+    (r'ch', 'ts'),
+    (r'c(?=[eiy])', 's'),
+    (r'c', 'k'),
+    (r'f', 'p'),
+    (r'v', 'b'),
+    (r'z', 's'),
+    (r'x', 'ks'),
+    (r'll(?=[aeiou])', 'ly'),
+    (r'ee', 'i'),
+    (r'oo', 'u'),
+    (r'([a-z])\1+', r'\1'),
+)]
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+_docs = SearchDocument.__table__
+_grams = SearchTrigram.__table__
+_index_ready: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_listeners_installed = False
+
+
+def fold(text: str | None) -> str:
+    """Normalise text so common spelling variants compare equal."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = ' '.join(_WORD_RE.findall(text))
+    for pattern, repl in _FOLD_RULES:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def trigrams(text: str | None) -> set[str]:
+    """Padded word trigrams of folded text (same scheme as pg_trgm)."""
+    grams: set[str] = set()
+    for word in fold(text).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _document_text(obj, fields) -> str:
+    return ' '.join(str(getattr(obj, f) or '') for f in fields)
+
+
+def _content_hash(grams: set[str], municipality_id) -> str:
+    raw = f"{municipality_id}|" + ' '.join(sorted(grams))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _enabled() -> bool:
+    if has_app_context():
+        return bool(current_app.config.get('SEARCH_INDEX_ENABLED', True))
+    return True
+
+
+def _index_available(connection) -> bool:
+    """Whether the index tables exist (missing ones are re-checked every 60s)."""
+    engine = connection.engine
+    checked = _index_ready.get(engine)
+    if checked is True:
+        return True
+    if checked is not None and time.monotonic() - checked < 60:
+        return False
+    ready = sa_inspect(connection).has_table('search_trigrams')
+    _index_ready[engine] = True if ready else time.monotonic()
+    return ready
+
+
+def index_documents(connection, entries, deleted=()) -> int:
+    """Upsert index entries and drop deleted ones.
+
+    ``entries`` are ``(entity_type, entity_id, municipality_id, text)``;
+    ``deleted`` are ``(entity_type, entity_id)``. Unchanged documents (same
+    trigram set and municipality) are skipped. Returns documents written.
+    """
+    written = 0
+    by_type: dict[str, list] = {}
+    for entry in entries:
+        by_type.setdefault(entry[0], []).append(entry)
+
+    for entity_type, group in by_type.items():
+        ids = [e[1] for e in group]
+        existing = {
+            row.entity_id: row
+            for row in connection.execute(
+                select(_docs.c.id, _docs.c.entity_id, _docs.c.content_hash)
+                .where(_docs.c.entity_type == entity_type, _docs.c.entity_id.in_(ids))
+            )
+        }
+        postings = []
+        for _, entity_id, municipality_id, text in group:
+            grams = trigrams(text)
+            digest = _content_hash(grams, municipality_id)
+            current = existing.get(entity_id)
+            if current is not None and current.content_hash == digest:
+                continue
+            if current is not None:
+                doc_id = current.id
+                connection.execute(delete(_grams).where(_grams.c.document_id == doc_id))
+                connection.execute(
+                    update(_docs).where(_docs.c.id == doc_id)
+                    .values(content_hash=digest, municipality_id=municipality_id, updated_at=func.now())
+                )
+            else:
+                doc_id = connection.execute(
+                    insert(_docs).values(
+                        entity_type=entity_type, entity_id=entity_id,
+                        municipality_id=municipality_id, content_hash=digest,
+                    )
+                ).inserted_primary_key[0]
+            postings.extend(
+                {'document_id': doc_id, 'trigram': g, 'entity_type': entity_type, 'municipality_id': municipality_id}
+                for g in grams
+            )
+            written += 1
+        if postings:
+            connection.execute(insert(_grams), postings)
+
+    for entity_type in {t for t, _ in deleted}:
+        ids = [i for t, i in deleted if t == entity_type]
+        doc_ids = select(_docs.c.id).where(_docs.c.entity_type == entity_type, _docs.c.entity_id.in_(ids))
+        connection.execute(delete(_grams).where(_grams.c.document_id.in_(doc_ids)))
+        connection.execute(delete(_docs).where(_docs.c.entity_type == entity_type, _docs.c.entity_id.in_(ids)))
+    return written
+
+
+def _after_flush(session, flush_context):
+    if not _enabled():
+        return
+    entries, deleted = [], []
+    for obj in list(session.new) + list(session.dirty):
+        entity_type = _MODEL_TYPES.get(type(obj))
+        if entity_type is None:
+            continue
+        fields = SEARCHABLE[entity_type][1]
+        if obj not in session.new:
+            state = sa_inspect(obj)
+            if not any(state.attrs[f].history.has_changes() for f in fields + ('municipality_id',)):
+                continue
+        entries.append((entity_type, obj.id, obj.municipality_id, _document_text(obj, fields)))
+    for obj in session.deleted:
+        entity_type = _MODEL_TYPES.get(type(obj))
+        if entity_type is not None:
+            deleted.append((entity_type, obj.id))
+    if not entries and not deleted:
+        return
+    connection = session.connection()
+    if _index_available(connection):
+        index_documents(connection, entries, deleted)
+
+
+def init_search_index(app) -> None:
+    """Install the incremental indexing hook (once per process)."""
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Session, 'after_flush', _after_flush)
+        _listeners_installed = True
+
+
+def _hits(entity_type: str, q: str | None, municipality_id: int | None, min_similarity: float | None):
+    """Grouped ``(entity_id, shared)`` select of the documents matching ``q``, or None."""
+    grams = sorted(trigrams(q))[:MAX_QUERY_TRIGRAMS]
+    if not grams:
+        return None, 0
+    if min_similarity is None:
+        min_similarity = float(current_app.config.get('SEARCH_MIN_SIMILARITY', 0.5))
+    needed = max(1, math.ceil(min_similarity * len(grams)))
+
+    stmt = (
+        select(_docs.c.entity_id, func.count().label('shared'))
+        .select_from(_grams.join(_docs, _docs.c.id == _grams.c.document_id))
+        .where(_grams.c.entity_type == entity_type, _grams.c.trigram.in_(grams))
+    )
+    if municipality_id:
+        stmt = stmt.where(_grams.c.municipality_id == municipality_id)
+    return stmt.group_by(_docs.c.entity_id).having(func.count() >= needed), len(grams)
+
+
+def search_entity_ids(entity_type: str, q: str | None, municipality_id: int | None = None,
+                      limit: int | None = None, min_similarity: float | None = None):
+    """Best matches for ``q`` as ``[(entity_id, score)]``, highest score first.
+
+    Returns None when ``q`` has nothing searchable.
+    """
+    stmt, total = _hits(entity_type, q, municipality_id, min_similarity)
+    if stmt is None:
+        return None
+    if limit is None:
+        limit = int(current_app.config.get('SEARCH_MAX_CANDIDATES', 500))
+    stmt = stmt.order_by(stmt.selected_columns.shared.desc(), _docs.c.entity_id.desc()).limit(limit)
+    return [(row.entity_id, row.shared / total) for row in db.session.execute(stmt)]
+
+
+def apply_text_search(query, entity_type: str, q: str | None, municipality_id: int | None = None):
+    """Restrict a model query to search hits, ordered by score.
+
+    The hits are joined into ``query`` rather than fetched first, so the
+    caller's filters and pagination see every match, not a capped candidate
+    list. Returns ``(query, ranked)``; ``ranked`` is False if ``q`` was empty
+    so the caller keeps its default ordering.
+    """
+    stmt, _ = _hits(entity_type, q, municipality_id, None)
+    if stmt is None:
+        return query, False
+    model = SEARCHABLE[entity_type][0]
+    hits = stmt.subquery('search_hits')
+    return (
+        query.join(hits, hits.c.entity_id == model.id)
+        .order_by(hits.c.shared.desc(), model.id.desc())
+    ), True
+
+
+def rebuild_search_index(entity_types=None, batch_size: int = 500) -> dict:
+    """(Re)index every searchable row and drop documents for deleted rows."""
+    counts = {}
+    for entity_type in entity_types or SEARCHABLE:
+        model, fields = SEARCHABLE[entity_type]
+        written, last_id = 0, 0
+        while True:
+            rows = (
+                model.query.filter(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            entries = [(entity_type, r.id, r.municipality_id, _document_text(r, fields)) for r in rows]
+            written += index_documents(db.session.connection(), entries)
+            last_id = rows[-1].id
+            db.session.commit()
+        orphans = db.session.execute(
+            select(_docs.c.entity_id)
+            .where(_docs.c.entity_type == entity_type)
+            .where(~_docs.c.entity_id.in_(select(model.id)))
+        ).scalars().all()
+        if orphans:
+            index_documents(db.session.connection(), [], [(entity_type, i) for i in orphans])
+            db.session.commit()
+        counts[entity_type] = {'indexed': written, 'removed': len(orphans)}
+    return counts
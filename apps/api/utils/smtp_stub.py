@@ -0,0 +1,135 @@
+"""Minimal local SMTP server for tests and development.
+
+Accepts any AUTH PLAIN credentials and records delivered messages in memory
+instead of relaying them. Run standalone to catch mail while developing:
+
+  python apps/api/utils/smtp_stub.py --port 1025
+
+then set SMTP_SERVER=127.0.0.1 and SMTP_PORT=1025.
+"""
+from __future__ import annotations
+
+import socketserver
+import threading
+from email import message_from_string
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write((line + '\r\n').encode('utf-8'))
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        stub: SMTPStub = self.server.stub
+        with stub.lock:
+            stub.connections += 1
+        self._reply('220 munlink-smtp-stub ready')
+        mail_from, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            cmd = line.split(' ', 1)[0].upper()
+            if cmd in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-munlink-smtp-stub\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n')
+                self.wfile.flush()
+            elif cmd == 'AUTH':
+                self._reply('235 Authentication successful')
+            elif cmd == 'MAIL':
+                mail_from, rcpts = line.split(':', 1)[1].strip().split(' ')[0].strip('<>'), []
+                self._reply('250 OK')
+            elif cmd == 'RCPT':
+                rcpts.append(line.split(':', 1)[1].strip().strip('<>'))
+                self._reply('250 OK')
+            elif cmd == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    if data_line.startswith(b'..'):
+                        data_line = data_line[1:]
+                    lines.append(data_line.decode('utf-8', 'replace'))
+                raw_msg = ''.join(lines)
+                with stub.lock:
+                    stub.messages.append({
+                        'from': mail_from,
+                        'to': list(rcpts),
+                        'subject': message_from_string(raw_msg).get('Subject'),
+                        'raw': raw_msg,
+                    })
+                self._reply('250 OK: queued')
+            elif cmd == 'RSET':
+                mail_from, rcpts = None, []
+                self._reply('250 OK')
+            elif cmd == 'NOOP':
+                self._reply('250 OK')
+            elif cmd == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPStub:
+    """Threaded SMTP stub; use as a context manager or call start()/stop()."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages: list[dict] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> 'SMTPStub':
+        self._server = _Server((self.host, self.port), _SMTPHandler)
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'SMTPStub':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Run a local SMTP stub that prints received mail')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+
+    stub = SMTPStub(args.host, args.port).start()
+    print(f"SMTP stub listening on {args.host}:{stub.port} (Ctrl+C to stop)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            with stub.lock:
+                new = stub.messages[seen:]
+                seen = len(stub.messages)
+            for m in new:
+                print(f"--- to={m['to']} subject={m['subject']!r}")
+    except KeyboardInterrupt:
+        stub.stop()
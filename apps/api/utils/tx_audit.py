@@ -11,9 +11,11 @@ from typing import Iterable, Optional, Dict, Any
 try:
     from apps.api import db
     from apps.api.models.marketplace import Transaction, Item, TransactionAuditLog
+    from apps.api.utils import audit_writer
 except Exception:  # pragma: no cover - fallback for direct execution
     from __init__ import db
     from models.marketplace import Transaction, Item, TransactionAuditLog
+    from utils import audit_writer
 
 
 class TransitionError(Exception):
@@ -46,25 +48,30 @@ def log_tx_action(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
-) -> TransactionAuditLog:
+) -> Optional[TransactionAuditLog]:
     """Append an audit log row to the transaction.
 
-    Commit is not performed here; caller should commit within their
-    request transaction to keep changes atomic.
+    Inside a request the row is buffered and bulk-inserted at request
+    teardown unless the request session rolls back; no extra commit is
+    needed. Outside a request the row is added to the session and the
+    caller commits.
     """
-    log = TransactionAuditLog(
-        transaction_id=transaction.id,
-        actor_id=actor_id,
-        actor_role=actor_role,
-        action=action,
-        from_status=from_status,
-        to_status=to_status,
-        notes=notes,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        metadata_json=metadata or {},
-        created_at=datetime.utcnow(),
-    )
+    row = {
+        'transaction_id': transaction.id,
+        'actor_id': actor_id,
+        'actor_role': actor_role,
+        'action': action,
+        'from_status': from_status,
+        'to_status': to_status,
+        'notes': notes,
+        'ip_address': ip_address,
+        'user_agent': (user_agent or '')[:255] or None,
+        'metadata_json': metadata or {},
+        'created_at': datetime.utcnow(),
+    }
+    if audit_writer.record(TransactionAuditLog, row):
+        return None
+    log = TransactionAuditLog(**row)
     db.session.add(log)
     return log
 
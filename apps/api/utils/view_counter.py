@@ -0,0 +1,185 @@
+"""Coalesced view counters for marketplace items.
+
+``record_view`` never touches the database: views are added to an
+in-process counter (or, with ``VIEW_COUNT_SPOOL_PATH`` set, appended to a
+local log file shared by every worker on the host). A background worker
+calls ``flush_views`` every ``VIEW_COUNT_FLUSH_INTERVAL`` seconds, which
+applies all pending views with one executemany
+``UPDATE items SET view_count = view_count + :n WHERE id = :id``.
+
+Counts may lag by one flush interval. In-memory counts still pending when the
+process exits are flushed by an ``atexit`` hook; the spool file survives
+crashes and is picked up by the next flush on any worker.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import bindparam, func, update
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    from apps.api import db
+    from apps.api.models.marketplace import Item
+    from apps.api.utils.background import ensure_worker, try_lock
+except ImportError:
+    from __init__ import db
+    from models.marketplace import Item
+    from utils.background import ensure_worker, try_lock
+
+
+WORKER_NAME = 'view-counter'
+
+_lock = threading.Lock()
+_pending: Counter = Counter()
+_pid = os.getpid()
+_exit_hooks = set()
+
+
+def _local() -> Counter:
+    """This process's counter; a copy inherited through fork() is discarded."""
+    global _pending, _pid
+    if _pid != os.getpid():
+        _pending, _pid = Counter(), os.getpid()
+    return _pending
+
+
+def _append(path: str, item_id: int) -> None:
+    data = f'{int(item_id)}\n'.encode('ascii')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+            # The flusher may have rotated the file between open and lock
+            try:
+                current = os.stat(path).st_ino == os.fstat(fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                os.write(fd, data)
+                return
+        finally:
+            os.close(fd)
+
+
+def record_view(item_id: int) -> None:
+    """Count one view of ``item_id``; written to the database on the next flush."""
+    app = current_app._get_current_object()
+    spool = app.config.get('VIEW_COUNT_SPOOL_PATH')
+    written = False
+    if spool:
+        try:
+            _append(spool, item_id)
+            written = True
+        except OSError:
+            app.logger.exception('View count spool write failed; counting in memory')
+    if not written:
+        with _lock:
+            _local()[int(item_id)] += 1
+    if app.config.get('VIEW_COUNT_WORKER', True):
+        ensure_worker(app, WORKER_NAME, float(app.config.get('VIEW_COUNT_FLUSH_INTERVAL', 10)), flush_views)
+        if app.name not in _exit_hooks:
+            _exit_hooks.add(app.name)
+            atexit.register(_flush_at_exit, app)
+
+
+def pending_views(item_id: int) -> int:
+    """Views of ``item_id`` counted in this process but not yet flushed."""
+    with _lock:
+        return _local().get(int(item_id), 0)
+
+
+def _read_spool(path: str) -> Counter:
+    counts: Counter = Counter()
+    work = f'{path}.flushing'
+    if not os.path.exists(work):
+        try:
+            os.replace(path, work)
+        except FileNotFoundError:
+            return counts
+    fd = os.open(work, os.O_RDONLY)
+    try:
+        if fcntl is not None:
+            # Wait out writers that opened the file before it was rotated
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        with os.fdopen(os.dup(fd), 'r', encoding='ascii', errors='ignore') as fh:
+            for line in fh:
+                line = line.strip()
+                if line.isdigit():
+                    counts[int(line)] += 1
+    finally:
+        os.close(fd)
+    return counts
+
+
+def apply_counts(connection, counts: Dict[int, int]) -> int:
+    """One batched UPDATE adding ``counts[id]`` to each item's view_count."""
+    rows = [{'b_id': item_id, 'b_n': n} for item_id, n in sorted(counts.items()) if n]
+    if not rows:
+        return 0
+    table = Item.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam('b_id'))
+        .values(view_count=func.coalesce(table.c.view_count, 0) + bindparam('b_n'))
+    )
+    connection.execute(stmt, rows)
+    return len(rows)
+
+
+def flush_views(spool_path: Optional[str] = None) -> int:
+    """Write pending views to the database; returns the number of items updated.
+
+    In-memory counts that fail to write are put back for the next flush; a
+    spool file that fails stays on disk (as ``<path>.flushing``) and is retried.
+    The spool is read, applied and removed under ``<path>.lock``; while another
+    worker holds it, this flush only writes the in-memory counts.
+    """
+    global _pending
+    spool_path = spool_path if spool_path is not None else current_app.config.get('VIEW_COUNT_SPOOL_PATH')
+    with _lock:
+        local = _local()
+        _pending = Counter()
+    if not spool_path:
+        return _apply(local)
+    os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+    with try_lock(f'{spool_path}.lock') as locked:
+        return _apply(local, spool_path if locked else None)
+
+
+def _apply(local: Counter, spool_path: Optional[str] = None) -> int:
+    spooled = _read_spool(spool_path) if spool_path else Counter()
+    counts = local + spooled
+    if not counts:
+        return 0
+    try:
+        with db.engine.begin() as conn:
+            updated = apply_counts(conn, counts)
+    except Exception:
+        with _lock:
+            _local().update(local)
+        raise
+    if spooled:
+        os.unlink(f'{spool_path}.flushing')
+    return updated
+
+
+def _flush_at_exit(app) -> None:
+    if not _local():
+        return
+    try:
+        with app.app_context():
+            flush_views(spool_path='')
+    except Exception:
+        pass
@@ -0,0 +1,10 @@
+"""
+MunLink Region III - WSGI entry point
+Builds the app once per worker process: gunicorn wsgi:app
+"""
+try:
+    from apps.api.app import get_app
+except ImportError:
+    from app import get_app
+
+app = get_app()